@@ -1,7 +1,11 @@
-from threading import Thread
+from threading import Thread, Lock, BoundedSemaphore
 #from multiprocessing import Process as Thread
+from concurrent.futures import Future
 from enum import IntEnum
+import asyncio
+import time
 from PyCIP.CIPModule.connection_manager_class import ConnectionManager
+from PyCIP.CIPModule.attribute_cache import AttributeCache
 from PyCIP.DataTypesModule import *
 from collections import OrderedDict
 from PyCIP.Tools.signaling import Signaler, SignalerM2M
@@ -10,53 +14,102 @@ import struct
 
 class Basic_CIP():
 
-    def __init__(self, transportLayer, **kwargs):
+    def __init__(self, transportLayer, window_size=8, **kwargs):
         self.trans = transportLayer
         self.sequence_number = 1
         self.connected = False
         self.OT_connection_id = None
         self.TO_connection_id = None
         self.active = True
-        self.transport_messenger = Signaler()
-        self.cip_messenger = SignalerM2M()
-        self._cip_manager_thread = Thread(target=self._CIP_manager, args=[self.trans], name="cip_layer")
-        self._cip_manager_thread.start()
+        # MessageStructs are only recycled when the transport runs pooled
+        self.cip_messenger = SignalerM2M(pooled=getattr(transportLayer, 'pool', None) != None)
+        # in flight requests made with submit_explicit, receipt -> (future, deadline)
+        self.window_size = window_size
+        self._window = BoundedSemaphore(window_size)
+        self._pending = {}
+        self._pending_lock = Lock()
+
+        reactor = getattr(transportLayer, 'reactor', None)
+        if reactor != None:
+            # a ReactorSession, replies are handled on the reactor thread rather than one thread per layer
+            self.transport_messenger = Signaler(self._transport_message)
+            self._cip_manager_thread = None
+            reactor.call_every(0.1, self._sweep)
+        else:
+            self.transport_messenger = Signaler()
+            self._cip_manager_thread = Thread(target=self._CIP_manager, args=[self.trans], name="cip_layer")
+            self._cip_manager_thread.start()
 
     def _CIP_manager(self, trans):
+        next_sweep = time.time() + 0.1
         while self.active and self.trans.connected:
             message_structure = self.transport_messenger.get_message(0.1)
-            if message_structure == None:
-                continue
-            packet = message_structure.message
-
-            signal_id = 0
-            # UnConnected Explicit
-            if (packet.CPF[0].Type_ID == CPF_Codes.NullAddress
-            and packet.CPF[1].Type_ID == CPF_Codes.UnconnectedData):
-                message_response = MessageRouterResponseStruct_UCMM()
-                message_response.import_data(packet.data)
-                packet.CIP = message_response
-                packet.data = packet.data[packet.CIP.sizeof():]
-                signal_id = packet.encapsulation_header.Sender_Context()
-                self.transport_messenger.unregister(message_structure.signal_id)
-
-            # Connected Explicit
-            elif(packet.CPF[0].Type_ID == CPF_Codes.ConnectedAddress
-            and packet.CPF[1].Type_ID == CPF_Codes.ConnectedData):
-                message_response = MessageRouterResponseStruct()
-                message_response.import_data(packet.data)
-                packet.CIP = message_response
-                packet.data = packet.data[packet.CIP.sizeof():]
-                signal_id = message_response.Sequence_Count
-
-            # Connected Implicit
-            elif(packet.CPF[0].Type_ID == CPF_Codes.SequencedAddress
-            and packet.CPF[1].Type_ID == CPF_Codes.ConnectedData):
-                print("Connected Implicit Not Supported Yet")
-                continue
-            self.cip_messenger.send_message(signal_id, packet)
+            if self._pending and time.time() > next_sweep:
+                next_sweep = time.time() + 0.1
+                self._expire_pending()
+            if message_structure != None:
+                self._transport_message(message_structure)
 
         return None
+
+    def _sweep(self):
+        if not (self.active and self.trans.connected):
+            return False
+        if self._pending:
+            self._expire_pending()
+
+    def _transport_message(self, message_structure):
+        packet = message_structure.message
+        received_id = message_structure.signal_id
+        self.transport_messenger.release(message_structure)
+
+        signal_id = 0
+        # UnConnected Explicit
+        if (packet.CPF[0].Type_ID == CPF_Codes.NullAddress
+        and packet.CPF[1].Type_ID == CPF_Codes.UnconnectedData):
+            message_response = MessageRouterResponseStruct_UCMM()
+            size = message_response.import_data(packet.data)
+            packet.CIP = message_response
+            packet.data = packet.data[size:]
+            signal_id = packet.encapsulation_header.Sender_Context()
+            self.transport_messenger.unregister(received_id)
+
+        # Connected Explicit
+        elif(packet.CPF[0].Type_ID == CPF_Codes.ConnectedAddress
+        and packet.CPF[1].Type_ID == CPF_Codes.ConnectedData):
+            message_response = MessageRouterResponseStruct()
+            size = message_response.import_data(packet.data)
+            packet.CIP = message_response
+            packet.data = packet.data[size:]
+            signal_id = message_response.Sequence_Count
+
+        # Connected Implicit, the data goes as is to register_implicit, never to a pending request
+        elif(packet.CPF[0].Type_ID == CPF_Codes.SequencedAddress
+        and packet.CPF[1].Type_ID == CPF_Codes.ConnectedData):
+            signal_id = packet.CPF[0].Connection_Identifier()
+            if signal_id in self.cip_messenger.signal_message_table:
+                self.cip_messenger.send_message(signal_id, packet)
+            return
+
+        with self._pending_lock:
+            pending = self._pending.pop(signal_id, None)
+        if pending != None:
+            self._window.release()
+            pending[0].set_result(packet)
+        elif int(signal_id) in self.cip_messenger.signal_message_table:
+            self.cip_messenger.send_message(signal_id, packet)
+
+    def _expire_pending(self):
+        # requests without a reply resolve to None, as receive() does on time out
+        now = time.time()
+        with self._pending_lock:
+            expired = [receipt for receipt, (_, deadline, _) in self._pending.items() if deadline < now]
+            expired = [self._pending.pop(receipt) for receipt in expired]
+        for future, _, registration in expired:
+            if registration != None:
+                self.transport_messenger.unregister(registration)
+            self._window.release()
+            future.set_result(None)
     def get_next_sender_context(self):
         return self.trans.get_next_sender_context()
 
@@ -70,14 +123,16 @@ class Basic_CIP():
         self.OT_connection_id = None
         self.TO_connection_id = None
 
+    def _next_sequence_number(self):
+        self.sequence_number = (self.sequence_number + 1) & 0xFFFF
+        return self.sequence_number
+
     def explicit_message(self, service, EPath, data=None, receive=True):
-        packet = bytearray()
+        sequence_number = None
         if self.connected:
-            self.sequence_number += 1
-            sequence_number = self.sequence_number
-            packet += struct.pack('H', sequence_number)
+            sequence_number = self._next_sequence_number()
 
-        packet += explicit_request(service, EPath, data=data)
+        packet = explicit_request(service, EPath, data=data, sequence_count=sequence_number)
 
         if receive:
             receive_id = self.TO_connection_id if self.TO_connection_id else self.trans.get_next_sender_context()
@@ -96,20 +151,114 @@ class Basic_CIP():
 
         return receipt
 
+    def register_implicit(self, TO_connection_id):
+        '''
+            queue the T->O frames of an implicit connection for receive(TO_connection_id)
+        '''
+        self.transport_messenger.register(TO_connection_id)
+        self.cip_messenger.register(TO_connection_id)
+
     def receive(self, receive_id, time_out=5):
         message = self.cip_messenger.get_message(receive_id, time_out)
         if message:
-            return message.message
+            packet = message.message
+            self.cip_messenger.release(message)
+            return packet
         else:
             return None
 
+    def submit_explicit(self, service, EPath, data=None, time_out=5):
+        '''
+            send a request without waiting for the reply, returns a concurrent.futures.Future
+            resolving to the response TransportPacket (None on time out).
+            Blocks while window_size requests are already outstanding.
+        '''
+        self._window.acquire()
+        return self._submit(service, EPath, data, time_out)
+
+    async def submit_explicit_async(self, service, EPath, data=None, time_out=5):
+        '''
+            awaitable version of submit_explicit, waits for a free window slot without blocking the loop
+        '''
+        while not self._window.acquire(blocking=False):
+            with self._pending_lock:
+                oldest = next(iter(self._pending.values()), None)
+            if oldest != None:
+                await asyncio.wait([asyncio.wrap_future(oldest[0])])
+            else:
+                await asyncio.sleep(0)
+        return await asyncio.wrap_future(self._submit(service, EPath, data, time_out))
+
+    def _submit(self, service, EPath, data, time_out):
+        # the caller holds a window slot, on failure it is given back with everything registered
+        future = Future()
+        pending = None
+        # unconnected requests register their own sender context, the connection id stays registered
+        registration = None
+        try:
+            with self._pending_lock:
+                if self.connected:
+                    receive_id = self.TO_connection_id
+                    receipt = self._next_sequence_number()
+                    request = explicit_request(service, EPath, data=data, sequence_count=receipt)
+                else:
+                    receive_id = self.trans.get_next_sender_context()
+                    receipt = registration = receive_id
+                    request = explicit_request(service, EPath, data=data)
+                pending = self._pending[receipt] = (future, time.time() + time_out, registration)
+            self.transport_messenger.register(receive_id)
+
+            self.trans.send_encap(request, self.OT_connection_id, receive_id)
+        except BaseException:
+            with self._pending_lock:
+                # unless a reply or the expiry sweep already took the entry and its slot
+                owned = pending == None or self._pending.pop(receipt, None) is pending
+            if registration != None:
+                self.transport_messenger.unregister(registration)
+            if owned:
+                self._window.release()
+            raise
+        return future
+
 class ReplyService(BaseBitFieldStruct):
+    _fixed_layout = True
+
     def __init__(self):
         self.RequestResponse = BaseBitField(1)
         self.Service = BaseBitField(7)
 
+class MessageRouterReply(BaseStructureAutoKeys):
+    '''
+        nearly every reply has Size_of_Additional_Status 0, those are decoded
+        from their fixed prefix with one unpack_from. Replies carrying
+        additional status take the generic field by field import.
+        import_data returns the offset of the reply data from offset.
+    '''
+    _fixed_layout = True
+    _prefix = struct.Struct('<BBBB')
+
+    def import_data(self, bytes, offset=0, key_filter=None):
+        prefix = self._prefix
+        if key_filter is None and not self._pending and len(bytes) - offset >= prefix.size:
+            *sequence, service, reserved, status, extended = prefix.unpack_from(bytes, offset)
+            if extended == 0:
+                fields = self.__dict__
+                if sequence:
+                    fields['Sequence_Count']._value = sequence[0]
+                reply_service = fields['Reply_Service']
+                reply_service.RequestResponse._value = service >> 7
+                reply_service.Service._value = service & 0x7F
+                fields['Reserved']._value = reserved
+                fields['General_Status']._value = status
+                fields['Size_of_Additional_Status']._value = 0
+                if fields['Additional_Status']:
+                    fields['Additional_Status'].clear()
+                return prefix.size
+        return super().import_data(bytes, offset, key_filter)
+
 #vol1 ver 3.18 2-4.2
-class MessageRouterResponseStruct(BaseStructureAutoKeys):
+class MessageRouterResponseStruct(MessageRouterReply):
+    _prefix = struct.Struct('<HBBBB')
 
     def __init__(self):
         self.Sequence_Count = UINT()
@@ -120,7 +269,7 @@ class MessageRouterResponseStruct(BaseStructureAutoKeys):
         self.Additional_Status = ARRAY(WORD, self.Size_of_Additional_Status)
 
 #vol1 ver 3.18 2-4.2
-class MessageRouterResponseStruct_UCMM(BaseStructureAutoKeys):
+class MessageRouterResponseStruct_UCMM(MessageRouterReply):
 
     def __init__(self):
         self.Reply_Service = ReplyService()
@@ -129,23 +278,116 @@ class MessageRouterResponseStruct_UCMM(BaseStructureAutoKeys):
         self.Size_of_Additional_Status = USINT()
         self.Additional_Status = ARRAY(WORD, self.Size_of_Additional_Status)
 
-def explicit_request(service, EPath, data=None):
-    request = bytearray()
-    request.append(service)
-    EPath_bytes = EPath.export_data()
-    request.append(len(EPath_bytes)//2)
-    request += EPath_bytes
+def explicit_request(service, EPath, data=None, sequence_count=None):
+    '''
+        encoded request in a single buffer, connected messages lead with their sequence count
+    '''
+    if not isinstance(EPath, CompiledEPATH):
+        EPath = CompiledEPATH(EPath.export_data())
+    start = 0 if sequence_count is None else 2
+    path_size = EPath.sizeof()
+    offset = start + 2 + path_size
+    request = bytearray(offset + (len(data) if data is not None else 0))
+    if sequence_count is not None:
+        struct.pack_into('<H', request, 0, sequence_count)
+    request[start] = service
+    request[start + 1] = path_size // 2
+    EPath.export_into(request, start + 2)
     if data is not None:
-        request += data
+        request[offset:] = data
     return request
 
+# vol1 ver 3.18 A-4.10, Multiple Service Packet addressed to the Message Router
+MULTIPLE_SERVICE_OVERHEAD = 6 + 2   # service, path size, 4 byte path + connected sequence count
+
+def message_router_path():
+    return compile_path(2, 1)
+
+def multiple_service_request(requests):
+    '''
+        pack already encoded explicit requests into Multiple Service Packet request data
+    '''
+    data = bytearray(UINT().export_data(len(requests)))
+    offset = 2 + 2 * len(requests)
+    for request in requests:
+        data += UINT().export_data(offset)
+        offset += len(request)
+    for request in requests:
+        data += request
+    return data
+
+def batch_requests(requests, max_size, max_services=None):
+    '''
+        split encoded requests into groups whose Multiple Service Packet fits max_size bytes
+    '''
+    batches = []
+    batch = []
+    size = MULTIPLE_SERVICE_OVERHEAD + 2
+    for request in requests:
+        request_size = 2 + len(request)
+        if batch and (size + request_size > max_size or len(batch) == max_services):
+            batches.append(batch)
+            batch = []
+            size = MULTIPLE_SERVICE_OVERHEAD + 2
+        batch.append(request)
+        size += request_size
+    if batch:
+        batches.append(batch)
+    return batches
+
+def split_multiple_service_reply(packet, count):
+    '''
+        split a Multiple Service Packet reply into one TransportPacket per embedded reply,
+        each with its own CIP header and General_Status
+    '''
+    def sub_packet(data, CIP):
+        sub = TransportPacket(packet.transport_meta_data, packet.encapsulation_header, packet.command_specific,
+                              packet.CPF, data=data, CIP=CIP)
+        sub.response_id = packet.response_id
+        return sub
+
+    if packet == None:
+        return [None] * count
+    # 0x1E: embedded service error, the individual replies are still present
+    if packet.CIP.General_Status not in (0, 0x1E):
+        return [sub_packet(bytes(), packet.CIP) for _ in range(count)]
+
+    # the reply comes from the network, a count or offset table that does not
+    # add up resolves the replies concerned to None rather than raising
+    data = packet.data
+    length = len(data)
+    if length < 2:
+        return [None] * count
+    number_of_replies = unpack_int(data, 0, 2)
+    table_end = 2 + 2 * number_of_replies
+    if number_of_replies != count or length < table_end:
+        return [None] * count
+    offsets = [unpack_int(data, 2 + 2 * i, 2) for i in range(count)] + [length]
+
+    replies = []
+    for i in range(count):
+        start, end = offsets[i], offsets[i + 1]
+        if start < table_end or (i and start <= offsets[i - 1]) or end > length or end - start < 4:
+            replies.append(None)
+            continue
+        response = MessageRouterResponseStruct_UCMM()
+        size = response.import_data(data[:end], start)
+        if start + size > end:
+            replies.append(None)
+            continue
+        replies.append(sub_packet(data[start + size:end], response))
+    return replies
+
 
 class CIP_Manager():
 
-    def __init__(self, transport, *EPath):
+    def __init__(self, transport, *EPath, window_size=8, cache=None):
         self.trans = transport
         self.path = EPath
-        self.primary_connection = Basic_CIP(transport)
+        self.window_size = window_size
+        # optional AttributeCache for get_attr_single/get_attr_all
+        self.cache = cache
+        self.primary_connection = Basic_CIP(transport, window_size=window_size)
         self.current_connection = self.primary_connection
         self.connection_manager = ConnectionManager(self.primary_connection)
         self.e_connected_connection = None
@@ -156,14 +398,12 @@ class CIP_Manager():
 
     def forward_open(self, EPath=None, **kwargs):
         if EPath == None:
-            self.path = EPATH()
-            self.path.append(LogicalSegment(LogicalType.ClassID, LogicalFormat.bit_8, 2))
-            self.path.append(LogicalSegment(LogicalType.InstanceID, LogicalFormat.bit_8, 1))
+            self.path = compile_path(2, 1)
         else:
             self.path = EPath
         self._fwd_rsp = self.connection_manager.forward_open(self.path, **kwargs)
         if self._fwd_rsp:
-            self.e_connected_connection = Basic_CIP(self.trans)
+            self.e_connected_connection = Basic_CIP(self.trans, window_size=self.window_size)
             self.e_connected_connection.set_connection(self._fwd_rsp.OT_connection_ID, self._fwd_rsp.TO_connection_ID)
             self.current_connection = self.e_connected_connection
             return self._fwd_rsp
@@ -171,9 +411,7 @@ class CIP_Manager():
 
     def forward_close(self, EPath=None, **kwargs):
         if EPath == None:
-            self.path = EPATH()
-            self.path.append(LogicalSegment(LogicalType.ClassID, LogicalFormat.bit_8, 2))
-            self.path.append(LogicalSegment(LogicalType.InstanceID, LogicalFormat.bit_8, 1))
+            self.path = compile_path(2, 1)
         else:
             self.path = EPath
         fwd_rsp = self.connection_manager.forward_close(self.path, **kwargs)
@@ -198,36 +436,114 @@ class CIP_Manager():
 
         return connection.receive(receipt)
 
+    def _submit_connection(self, service, request_path, data, route, try_connected):
+        if self._connected(try_connected):
+            return self.e_connected_connection, service, request_path, data
+        elif route:
+            message = explicit_request(service, request_path, data=data)
+            e_path, packet = self.connection_manager.unconnected_send_request(message, route)
+            return self.primary_connection, CIPServiceCode.unconnected_Send, e_path, packet
+        return self.primary_connection, service, request_path, data
+
+    def submit_explicit(self, service, request_path, data=None, route=None, try_connected=True):
+        '''
+            pipelined explicit_message, returns a concurrent.futures.Future of the response.
+            Up to window_size requests are kept in flight per connection.
+        '''
+        connection, *request = self._submit_connection(service, request_path, data, route, try_connected)
+        return connection.submit_explicit(*request)
+
+    async def submit_explicit_async(self, service, request_path, data=None, route=None, try_connected=True):
+        connection, *request = self._submit_connection(service, request_path, data, route, try_connected)
+        return await connection.submit_explicit_async(*request)
+
+    def _connected(self, try_connected):
+        return bool(try_connected and self.e_connected_connection and self.e_connected_connection.connected)
+
+    def _connection_size(self, try_connected):
+        if self._connected(try_connected):
+            return int(self.connection_manager.struct_fwd_open_send.OT_connection_params) & 0x1FF
+        return 504
+
+    def multiple_service(self, requests, try_connected=True, route=None, max_size=None, max_services=None):
+        '''
+            send (service, EPath, data) requests packed into as few Multiple Service Packets as fit
+            max_size (default the connection size), returns one TransportPacket per request in order,
+            None where no reply was received
+        '''
+        if max_size == None:
+            max_size = self._connection_size(try_connected)
+        if route and not self._connected(try_connected):
+            # the packets go out inside an Unconnected Send, which counts against max_size too
+            max_size -= self.connection_manager.unconnected_send_overhead(route)
+        encoded = [explicit_request(service, path, data=data) for service, path, data in requests]
+        batches = batch_requests(encoded, max_size, max_services)
+
+        futures = [self.submit_explicit(CIPServiceCode.multiple_service_packet, message_router_path(),
+                                        data=multiple_service_request(batch), route=route, try_connected=try_connected)
+                   for batch in batches]
+        results = []
+        for future, batch in zip(futures, batches):
+            results += split_multiple_service_reply(future.result(), len(batch))
+        return results
+
+    def get_attrs(self, attributes, try_connected=True, route=None, max_size=None, max_services=None):
+        '''
+            get_attr_single for many (class, instance, attribute) tuples batched with Multiple Service Packets
+        '''
+        requests = []
+        for class_int, instance_int, attribute_int in attributes:
+            path = compile_path(class_int, instance_int, attribute_int)
+            requests.append((CIPServiceCode.get_att_single, path, None))
+        return self.multiple_service(requests, try_connected, route, max_size, max_services)
+
+    def set_attrs(self, attributes, try_connected=True, route=None, max_size=None, max_services=None):
+        '''
+            set_attr_single for many (class, instance, attribute, data) tuples batched with Multiple Service Packets
+        '''
+        requests = []
+        for class_int, instance_int, attribute_int, data in attributes:
+            path = compile_path(class_int, instance_int, attribute_int)
+            requests.append((CIPServiceCode.set_att_single, path, data))
+        results = self.multiple_service(requests, try_connected, route, max_size, max_services)
+        for (class_int, instance_int, attribute_int, _), rsp in zip(attributes, results):
+            self._invalidate(rsp, class_int, instance_int, attribute_int, route)
+        return results
+
     def get_attr_single(self, class_int, instance_int, attribute_int, try_connected=True, route=None):
-        path = EPATH()
-        path.append(LogicalSegment(LogicalType.ClassID, LogicalFormat.bit_8, class_int))
-        path.append(LogicalSegment(LogicalType.InstanceID, LogicalFormat.bit_8, instance_int))
-        path.append(LogicalSegment(LogicalType.AttributeID, LogicalFormat.bit_8, attribute_int))
+        path = compile_path(class_int, instance_int, attribute_int)
 
-        return self.explicit_message(CIPServiceCode.get_att_single, path, try_connected=try_connected, route=route)
+        fetch = lambda: self.explicit_message(CIPServiceCode.get_att_single, path, try_connected=try_connected, route=route)
+        if self.cache:
+            return self.cache.get(self.cache.key(class_int, instance_int, attribute_int, route), fetch)
+        return fetch()
 
 
     def get_attr_all(self, class_int, instance_int, try_connected=True, route=None):
-        path = EPATH()
-        path.append(LogicalSegment(LogicalType.ClassID, LogicalFormat.bit_8, class_int))
-        path.append(LogicalSegment(LogicalType.InstanceID, LogicalFormat.bit_8, instance_int))
+        path = compile_path(class_int, instance_int)
 
-        return self.explicit_message(CIPServiceCode.get_att_all, path, try_connected=try_connected, route=route)
+        fetch = lambda: self.explicit_message(CIPServiceCode.get_att_all, path, try_connected=try_connected, route=route)
+        if self.cache:
+            return self.cache.get(self.cache.key(class_int, instance_int, route=route), fetch)
+        return fetch()
 
     def set_attr_single(self, class_int, instance_int, attribute_int, data, try_connected=True, route=None):
-        path = EPATH()
-        path.append(LogicalSegment(LogicalType.ClassID, LogicalFormat.bit_8, class_int))
-        path.append(LogicalSegment(LogicalType.InstanceID, LogicalFormat.bit_8, instance_int))
-        path.append(LogicalSegment(LogicalType.AttributeID, LogicalFormat.bit_8, attribute_int))
+        path = compile_path(class_int, instance_int, attribute_int)
 
-        return self.explicit_message(CIPServiceCode.set_att_single, path, try_connected=try_connected, route=route)
+        rsp = self.explicit_message(CIPServiceCode.set_att_single, path, data=data, try_connected=try_connected, route=route)
+        self._invalidate(rsp, class_int, instance_int, attribute_int, route)
+        return rsp
 
     def set_attr_all(self, class_int, instance_int, attribute_int, data, try_connected=True, route=None):
-        path = EPATH()
-        path.append(LogicalSegment(LogicalType.ClassID, LogicalFormat.bit_8, class_int))
-        path.append(LogicalSegment(LogicalType.InstanceID, LogicalFormat.bit_8, instance_int))
+        path = compile_path(class_int, instance_int)
+
+        rsp = self.explicit_message(CIPServiceCode.set_att_all, path, data=data, try_connected=try_connected, route=route)
+        self._invalidate(rsp, class_int, instance_int, None, route)
+        return rsp
 
-        return self.explicit_message(CIPServiceCode.set_att_single, path, try_connected=try_connected, route=route)
+    def _invalidate(self, rsp, class_int, instance_int, attribute_int, route):
+        if self.cache and rsp and rsp.CIP.General_Status == 0:
+            self.cache.invalidate(class_int, instance_int, attribute_int, route)
 
 
 class RoutingType(IntEnum):
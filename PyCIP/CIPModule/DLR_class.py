@@ -68,6 +68,9 @@ class DLR_Object():
             DLR_3_gat:(1,2,3,4,5,6,7,8,10,11,12,13,14,15,16)
         }
 
+        # lazy decodes only the attributes that are read, see CIPDataStructure
+        self.lazy = kwargs.get('lazy', False)
+        self._structs = {}
         self.transport = transport
         self.update()
 
@@ -79,9 +82,12 @@ class DLR_Object():
         rsp = self.transport.get_attr_all(71, 1)
         if rsp.CIP.General_Status == 0:
             data_len = len(rsp.data)
-            filter = self.dict_of_versions[data_len]
-            st = self.master_struct.get_struct()
-            self.struct = CIPDataStructure(*[st[i-1] for i in filter])
+            if data_len not in self._structs:
+                filter = self.dict_of_versions[data_len]
+                st = self.master_struct.get_struct()
+                self._structs[data_len] = CIPDataStructure(*[st[i-1] for i in filter])
+                self._structs[data_len].lazy = self.lazy
+            self.struct = self._structs[data_len]
             self.struct.import_data(rsp.data)
 
     def __str__(self):
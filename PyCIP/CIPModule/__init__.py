@@ -1,4 +1,6 @@
 from PyCIP.CIPModule.CIP import CIP_Manager, Basic_CIP, RoutingType
 from PyCIP.CIPModule.CIP_classes import Identity_Object, Assembly_Object
-from PyCIP.CIPModule.connection_manager_class import ConnectionManager
+from PyCIP.CIPModule.connection_manager_class import ConnectionManager, transport_trigger, connection_parameters
 from PyCIP.CIPModule.DLR_class import DLR_Object
+from PyCIP.CIPModule.attribute_cache import AttributeCache
+from PyCIP.CIPModule.implicit_io import IOConnection, IOScheduler
@@ -0,0 +1,110 @@
+from collections import OrderedDict
+from concurrent.futures import Future
+from threading import Lock
+import time
+
+
+class AttributeCache():
+    '''
+        Optional response cache for CIP_Manager get_attr_single/get_attr_all.
+
+        Entries live for a per-class TTL and the least recently used entry is
+        evicted past max_entries. Concurrent callers asking for the same key
+        share one in-flight request. Only replies with General_Status 0 are kept.
+
+        Every caller is handed the same TransportPacket, so its release() does
+        nothing, a pooled originator does not get these packets back.
+
+        keys are (route, class, instance, attribute), attribute is None for get_attr_all
+    '''
+
+    def __init__(self, default_ttl=1.0, class_ttl=None, max_entries=1024):
+        self.default_ttl = default_ttl
+        self.class_ttl = dict(class_ttl) if class_ttl else {}
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self._entries = OrderedDict()
+        self._in_flight = {}
+        self._lock = Lock()
+
+    @staticmethod
+    def key(class_int, instance_int, attribute_int=None, route=None):
+        if route:
+            route = bytes(route.export_data()) if hasattr(route, 'export_data') else b''.join(route)
+        return (route, class_int, instance_int, attribute_int)
+
+    def ttl(self, class_int):
+        return self.class_ttl.get(class_int, self.default_ttl)
+
+    def get(self, key, fetch):
+        '''
+            return the cached response for key, otherwise call fetch() once for all concurrent callers
+        '''
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry != None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            future = self._in_flight.get(key)
+            owner = future == None
+            if owner:
+                self.misses += 1
+                future = self._in_flight[key] = Future()
+            else:
+                self.shared += 1
+        if not owner:
+            return future.result()
+
+        try:
+            response = fetch()
+        except BaseException as e:
+            with self._lock:
+                if self._in_flight.get(key) is future:
+                    del self._in_flight[key]
+            future.set_exception(e)
+            raise
+
+        if response:
+            # shared with other callers and later hits, no one of them may recycle it
+            response.pool = None
+        ttl = self.ttl(key[1])
+        with self._lock:
+            # an invalidate while the request was in flight leaves nothing to store
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+                if response and response.CIP.General_Status == 0 and ttl > 0:
+                    # the payload is a view of a whole receive buffer, keep only its bytes
+                    if isinstance(response.data, memoryview):
+                        response.data = bytes(response.data)
+                    self._entries[key] = (time.time() + ttl, response)
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+        future.set_result(response)
+        return response
+
+    def invalidate(self, class_int, instance_int, attribute_int=None, route=None):
+        '''
+            drop the entry for the attribute and the get_attr_all entry of its instance,
+            attribute_int None drops every attribute of the instance
+        '''
+        route_key = self.key(class_int, instance_int, route=route)[0]
+        with self._lock:
+            for key in list(self._entries) + list(self._in_flight):
+                if key[:3] != (route_key, class_int, instance_int):
+                    continue
+                if attribute_int == None or key[3] in (None, attribute_int):
+                    self._entries.pop(key, None)
+                    self._in_flight.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._in_flight.clear()
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'shared': self.shared, 'entries': len(self._entries)}
@@ -2,12 +2,34 @@ from collections import OrderedDict
 import random
 from PyCIP.DataTypesModule.DataParsers import *
 from PyCIP.DataTypesModule.DataTypes import *
-from PyCIP.DataTypesModule.EPATH import LogicalSegment
+from PyCIP.DataTypesModule.CPF import CPF_Codes
+from PyCIP.DataTypesModule.EPATH import LogicalSegment, NetworkSegment, compile_path
+from PyCIP.DataTypesModule.Constants import NetworkSegmentType, ProductionTrigger, ConnectionType
+
+
+def transport_trigger(transport_class=1, production_trigger=ProductionTrigger.Cyclic, server=False):
+    '''
+        Transport Type/Trigger byte of a forward open, the originator is the client of I/O connections
+    '''
+    return (0x80 if server else 0) | (0x07 & production_trigger) << 4 | (0x0F & transport_class)
+
+def connection_parameters(size, connection_type=ConnectionType.PointToPoint, priority=0, variable=False,
+                          redundant_owner=False):
+    '''
+        16 bit network connection parameters, size in bytes including the sequence count and run/idle header
+    '''
+    if size > 0x1FF:
+        raise ValueError("connection size above 511 bytes needs a large forward open")
+    return (redundant_owner << 15) | (0x03 & connection_type) << 13 | (0x03 & priority) << 10 | (variable << 9) | size
 
 class ConnectionManager():
 
     def __init__(self, transport, **kwargs):
         self.trans = transport
+        # (ip, port) from the sockaddr info items of the last forward open reply, None if not sent.
+        # TO_sockaddr names the multicast group a target produces to
+        self.OT_sockaddr = None
+        self.TO_sockaddr = None
 
         #vol 1 3.18 3-5.4
         self.unconnected_send_struct_header = CIPDataStructure(
@@ -62,11 +84,14 @@ class ConnectionManager():
                                                         ('path_len','USINT')
                                                     )
     def unconnected_send(self, data, route):
+        e_path, packet = self.unconnected_send_request(data, route)
+        receipt = self.trans.explicit_message(CIPServiceCode.unconnected_Send, e_path, data=packet)
+        return receipt
+
+    def unconnected_send_request(self, data, route):
 
         packet = bytearray()
-        e_path = EPATH()
-        e_path.append(LogicalSegment(LogicalType.ClassID, LogicalFormat.bit_8, 6))
-        e_path.append(LogicalSegment( LogicalType.InstanceID, LogicalFormat.bit_8, 1))
+        e_path = compile_path(6, 1)
 
         header = self.unconnected_send_struct_header
         header.Time_tick = 100
@@ -79,33 +104,42 @@ class ConnectionManager():
             packet += bytes([0])
 
         footer = self.unconnected_send_struct_footer
-        if hasattr(route, 'export_data'):
-            port_path = route.export_data()
-            footer.Route_Path_Size = route.byte_size // 2
-            footer.Reserved = 0
-        else:
-            port_path = bytes()
-            for item in route:
-                port_path += item
-            footer.Route_Path_Size = len(port_path)//2
-            footer.Reserved = 0
+        port_path = self._route_path(route)
+        footer.Route_Path_Size = len(port_path) // 2
+        footer.Reserved = 0
 
         packet += footer.export_data()
         packet += port_path
+        return e_path, packet
 
-        receipt = self.trans.explicit_message(CIPServiceCode.unconnected_Send, e_path, data=packet)
-        return receipt
+    def unconnected_send_overhead(self, route):
+        '''
+            bytes an Unconnected Send over route adds around the embedded request:
+            service, path size and 4 byte path, timing and size, the pad, route path size and reserved
+        '''
+        return 2 + 4 + 4 + 1 + 2 + len(self._route_path(route))
+
+    def _route_path(self, route):
+        if hasattr(route, 'export_data'):
+            return route.export_data()
+        port_path = bytes()
+        for item in route:
+            port_path += item
+        return port_path
 
 
     def forward_open(self, EPath, tick=10, time_out=1, OT_connection_ID=None, TO_connection_ID=None, connection_serial=None,
                      O_vendor_ID=88, O_serial=12345678, time_out_multiplier=0, reserved_1=0, reserved_2=0, reserved_3=0, OT_RPI=0x03E7FC18,
-                     OT_connection_params=0x43FF, TO_RPI=0x03E7FC18, TO_connection_params=0x43FF, trigger=0xa3):
+                     OT_connection_params=0x43FF, TO_RPI=0x03E7FC18, TO_connection_params=0x43FF, trigger=0xa3,
+                     production_inhibit_ms=None):
 
-        message_router_path = EPATH()
-        message_router_path.append(LogicalSegment(LogicalType.ClassID, LogicalFormat.bit_8, 6))
-        message_router_path.append(LogicalSegment(LogicalType.InstanceID, LogicalFormat.bit_8, 1))
+        message_router_path = compile_path(6, 1)
 
         connection_path_bytes = EPath.export_data()
+        if production_inhibit_ms != None:
+            # the network segment leads the connection path
+            connection_path_bytes = (NetworkSegment(NetworkSegmentType.ProductionInhibitTime, production_inhibit_ms).export_data()
+                                     + connection_path_bytes)
 
         self.struct_fwd_open_send.tick = tick
         self.struct_fwd_open_send.time_out = time_out
@@ -131,15 +165,38 @@ class ConnectionManager():
         response = self.trans.receive(receipt)
         if response and response.CIP.General_Status == 0:
             self.struct_fwd_open_rsp.import_data(response.data)
+            OT_sockaddr = response.CPF.item(CPF_Codes.OTSockaddrInfo)
+            TO_sockaddr = response.CPF.item(CPF_Codes.TOSockaddrInfo)
+            self.OT_sockaddr = OT_sockaddr.address if OT_sockaddr != None else None
+            self.TO_sockaddr = TO_sockaddr.address if TO_sockaddr != None else None
             return self.struct_fwd_open_rsp
         return False
 
 
+    def forward_open_io(self, EPath, OT_RPI_us, TO_RPI_us, OT_size, TO_size, transport_class=1,
+                        production_trigger=ProductionTrigger.Cyclic, production_inhibit_ms=None, multicast=False,
+                        run_idle_header=True, priority=0, **kwargs):
+        '''
+            forward open of an implicit connection, sizes are those of the application data.
+            For change of state and application triggered connections the RPI is the heartbeat,
+            production_inhibit_ms the least time the target leaves between two productions
+        '''
+        header_size = 2 if transport_class == 1 else 0
+        OT_size += header_size + (4 if run_idle_header else 0)
+        TO_size += header_size
+        return self.forward_open(EPath,
+                                 OT_RPI=OT_RPI_us,
+                                 OT_connection_params=connection_parameters(OT_size, ConnectionType.PointToPoint, priority),
+                                 TO_RPI=TO_RPI_us,
+                                 TO_connection_params=connection_parameters(TO_size, ConnectionType.Multicast if multicast
+                                                                            else ConnectionType.PointToPoint, priority),
+                                 trigger=transport_trigger(transport_class, production_trigger),
+                                 production_inhibit_ms=production_inhibit_ms,
+                                 **kwargs)
+
     def forward_close(self, EPath, tick=6, time_out=0x28, connection_serial=None, O_vendor_ID=88, O_serial=12345678):
 
-        message_router_path = EPATH()
-        message_router_path.append(LogicalSegment(LogicalType.ClassID, LogicalFormat.bit_8, 6))
-        message_router_path.append(LogicalSegment(LogicalType.InstanceID, LogicalFormat.bit_8, 1))
+        message_router_path = compile_path(6, 1)
 
         connection_path_bytes = EPath.export_data()
 
@@ -0,0 +1,264 @@
+import heapq
+import itertools
+import logging
+import struct
+import time
+from threading import Thread, Condition, Lock
+from PyCIP.DataTypesModule import CPF_Items, CPF_SequencedAddress, CPF_ConnectedData, ProductionTrigger
+
+logger = logging.getLogger(__name__)
+
+_UDINT = struct.Struct('<I')
+_UINT = struct.Struct('<H')
+# Item_count, SequencedAddress type and length, then the Connection_Identifier
+_ENCAP_SEQUENCE_OFFSET = 2 + 4 + 4
+_DATA_ITEM_OFFSET = 2 + 4 + 8
+
+
+class IOConnection():
+    '''
+        Producing side of a class 0/1 implicit connection. The O->T frame, a
+        CPF_SequencedAddress and a CPF_ConnectedData item, is encoded once
+        into a template, each production only writes the sequence numbers.
+
+        The encapsulation sequence number counts every frame sent, the class 1
+        sequence count only new data given with set_data. run_idle_header
+        adds the 32 bit run/idle header most targets expect O->T.
+
+        Change of state connections produce when set_data is given data that
+        differs from the frame, application triggered ones on trigger(). Both
+        leave at least inhibit_us between productions and send the unchanged
+        frame again as a heartbeat once an RPI has passed without one.
+    '''
+
+    def __init__(self, transport, connection_id, rpi_us, size, transport_class=1, run_idle_header=True,
+                 production_trigger=ProductionTrigger.Cyclic, inhibit_us=0):
+        self.transport = transport
+        self.connection_id = connection_id
+        self.rpi_ns = rpi_us * 1000
+        self.transport_class = transport_class
+        self.run_idle_header = run_idle_header
+        self.production_trigger = production_trigger
+        self.inhibit_ns = inhibit_us * 1000
+        self.run = True
+        self.encap_sequence = 0
+        self.sequence_count = 0
+        self.last_sent_ns = None
+
+        # production statistics, lateness is the time between the deadline and the send
+        self.sent = 0
+        self.overruns = 0
+        self.late_total_ns = 0
+        self.late_max_ns = 0
+        # set_data calls of a change of state connection that left the data as it was
+        self.unchanged = 0
+        # productions the transport refused, the connection stays scheduled
+        self.send_errors = 0
+
+        self._lock = Lock()
+        self._scheduled = None
+        self._scheduler = None
+        self._triggered = False
+        header_size = (2 if transport_class == 1 else 0) + (4 if run_idle_header else 0)
+        CPF = CPF_Items()
+        CPF.append(CPF_SequencedAddress(Connection_Identifier=connection_id, Encapsulation_Sequence_Number=0))
+        CPF.append(CPF_ConnectedData(Length=header_size + size))
+        self.frame = bytearray(CPF.sizeof() + header_size + size)
+        CPF.export_into(self.frame)
+        self._data_offset = _DATA_ITEM_OFFSET + 4 + header_size
+        self._write_header()
+
+    @classmethod
+    def from_forward_open(cls, transport, response, size, **kwargs):
+        '''
+            producer for the O->T side of a ConnectionManager.forward_open reply, at the granted OT_API
+        '''
+        return cls(transport, response.OT_connection_ID, response.OT_API, size, **kwargs)
+
+    @property
+    def data(self):
+        return memoryview(self.frame)[self._data_offset:]
+
+    def set_data(self, data):
+        '''
+            new application data for the next productions, the size is fixed by the connection.
+            Returns False when a change of state connection already sends that data
+        '''
+        if len(data) != len(self.frame) - self._data_offset:
+            raise ValueError("connection data is %d bytes, got %d" % (len(self.frame) - self._data_offset, len(data)))
+        change_of_state = self.production_trigger == ProductionTrigger.ChangeOfState
+        with self._lock:
+            if change_of_state and self.data == data:
+                self.unchanged += 1
+                return False
+            self.frame[self._data_offset:] = data
+            self.sequence_count = (self.sequence_count + 1) & 0xFFFF
+            self._write_header()
+        if change_of_state:
+            self.trigger()
+        return True
+
+    def trigger(self):
+        '''
+            produce as soon as the inhibit time allows, right away without an IOScheduler
+        '''
+        if self._scheduler != None:
+            self._scheduler.trigger(self)
+        else:
+            self.produce()
+
+    def set_run(self, run):
+        with self._lock:
+            self.run = run
+            self._write_header()
+
+    def _write_header(self):
+        offset = _DATA_ITEM_OFFSET + 4
+        if self.transport_class == 1:
+            _UINT.pack_into(self.frame, offset, self.sequence_count)
+            offset += 2
+        if self.run_idle_header:
+            _UDINT.pack_into(self.frame, offset, 1 if self.run else 0)
+
+    def produce(self):
+        with self._lock:
+            self.encap_sequence = (self.encap_sequence + 1) & 0xFFFFFFFF
+            _UDINT.pack_into(self.frame, _ENCAP_SEQUENCE_OFFSET, self.encap_sequence)
+            self.transport._send_IO(self.frame)
+        self.last_sent_ns = time.monotonic_ns()
+        self.sent += 1
+
+    def reset_stats(self):
+        self.sent = self.overruns = self.late_total_ns = self.late_max_ns = self.unchanged = self.send_errors = 0
+
+    def stats(self):
+        return {'sent': self.sent, 'overruns': self.overruns, 'unchanged': self.unchanged, 'send_errors': self.send_errors,
+                'late_mean_us': self.late_total_ns / self.sent / 1000 if self.sent else 0.0,
+                'late_max_us': self.late_max_ns / 1000}
+
+
+class IOScheduler():
+    '''
+        One thread producing the O->T frames of any number of IOConnections at
+        their RPI. Deadlines lie on an absolute time.monotonic_ns() timeline and
+        advance by exactly one RPI, so sleep overshoot never accumulates. A
+        connection a whole RPI behind skips the lost periods and counts them
+        as overruns. Change of state and application triggered connections
+        are due an RPI after their last production, or when triggered.
+
+        The thread sleeps until the earliest deadline. spin_ns opts into busy
+        waiting the last spin_ns before it for tighter jitter, at the price of
+        keeping a core busy (200000 gives a p99 of a few hundred us at a 1 ms RPI).
+    '''
+
+    def __init__(self, spin_ns=0):
+        self.spin_ns = spin_ns
+        self.active = False
+        self.thread = None
+        self._heap = []
+        self._order = itertools.count()
+        self._cond = Condition()
+
+    def add(self, connection, start_ns=None):
+        if start_ns == None:
+            start_ns = time.monotonic_ns()
+        with self._cond:
+            connection._scheduler = self
+            token = connection._scheduled = object()
+            heapq.heappush(self._heap, [start_ns, next(self._order), connection, token])
+            self._cond.notify()
+        return connection
+
+    def remove(self, connection):
+        # the heap entry is dropped when it comes up
+        connection._scheduled = None
+        connection._scheduler = None
+
+    def trigger(self, connection):
+        '''
+            move the next production of connection forward to now, or to the end of its inhibit time
+        '''
+        with self._cond:
+            if connection._triggered or connection._scheduled == None:
+                # the pending production sends the newest data anyway
+                return
+            due = time.monotonic_ns()
+            if connection.last_sent_ns != None:
+                due = max(due, connection.last_sent_ns + connection.inhibit_ns)
+            connection._triggered = True
+            # a new token drops the heartbeat entry
+            token = connection._scheduled = object()
+            heapq.heappush(self._heap, [due, next(self._order), connection, token])
+            self._cond.notify()
+
+    def start(self):
+        self.active = True
+        if self.thread == None or not self.thread.is_alive():
+            self.thread = Thread(target=self._run, name="io_scheduler", daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        with self._cond:
+            self.active = False
+            self._cond.notify()
+
+    def _run(self):
+        heap = self._heap
+        due_now = []
+        while self.active:
+            with self._cond:
+                if not heap:
+                    self._cond.wait()
+                    continue
+                horizon = time.monotonic_ns() + self.spin_ns
+                delay = heap[0][0] - horizon
+                if delay > 0:
+                    # woken early by add or stop, the earliest deadline is looked up again
+                    self._cond.wait(delay / 1e9)
+                    continue
+                # everything due within the spin window goes out in one pass
+                while heap and heap[0][0] <= horizon:
+                    entry = heapq.heappop(heap)
+                    if entry[2]._scheduled is entry[3]:
+                        due_now.append(entry)
+
+            for entry in due_now:
+                due, _, connection, token = entry
+                now = time.monotonic_ns()
+                while now < due:
+                    now = time.monotonic_ns()
+                # cleared first, a trigger during the production is not lost
+                with self._cond:
+                    connection._triggered = False
+                try:
+                    connection.produce()
+                except OSError:
+                    # e.g. ConnectionRefusedError after an ICMP port unreachable, the target may come back
+                    connection.send_errors += 1
+                except Exception:
+                    connection.send_errors += 1
+                    logger.exception("production of connection %08X failed", connection.connection_id)
+
+                rpi = connection.rpi_ns
+                late = now - due
+                connection.late_total_ns += late
+                if late > connection.late_max_ns:
+                    connection.late_max_ns = late
+                if connection.production_trigger:
+                    # heartbeat an RPI after this production
+                    entry[0] = now + rpi
+                    continue
+                due += rpi
+                if now >= due:
+                    # a whole RPI behind, those productions are lost rather than sent back to back
+                    missed = (now - due) // rpi + 1
+                    connection.overruns += missed
+                    due += missed * rpi
+                entry[0] = due
+
+            with self._cond:
+                for entry in due_now:
+                    if entry[2]._scheduled is entry[3]:
+                        entry[1] = next(self._order)
+                        heapq.heappush(heap, entry)
+            due_now.clear()
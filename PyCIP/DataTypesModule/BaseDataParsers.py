@@ -1,8 +1,10 @@
 from abc import ABCMeta, abstractmethod
 from  PyCIP. DataTypesModule.NumericTypes import *
+import struct
 
 class VirtualBaseData():
     __metaclass__ = ABCMeta
+    __slots__ = ()
 
     @abstractmethod
     def import_data(self, bytes, offset=0):
@@ -16,6 +18,12 @@ class VirtualBaseData():
             must return the internal state in bytes
         '''
         pass
+    def export_into(self, buf, offset=0):
+        '''
+            write the internal state into buf at offset, return the offset after it.
+            buf must already hold sizeof() bytes from offset
+        '''
+        return copy_into(buf, offset, self.export_data())
     @abstractmethod
     def sizeof(self):
         '''
@@ -44,6 +52,12 @@ class VirtualBaseStructure():
             must return the internal state in bytes
         '''
         pass
+    def export_into(self, buf, offset=0):
+        '''
+            write the internal state into buf at offset, return the offset after it.
+            buf must already hold sizeof() bytes from offset
+        '''
+        return copy_into(buf, offset, self.export_data())
     @abstractmethod
     def sizeof(self):
         '''
@@ -98,7 +112,37 @@ class VirtualBaseStructure():
 
 
 
+_struct_formats = {(1, False): 'B', (1, True): 'b', (2, False): 'H', (2, True): 'h',
+                   (4, False): 'I', (4, True): 'i', (8, False): 'Q', (8, True): 'q'}
+
+_int_codecs = {(size, signed, endian): struct.Struct(('<' if endian == 'little' else '>') + code)
+               for (size, signed), code in _struct_formats.items() for endian in ('little', 'big')}
+
+def unpack_int(data, offset, byte_size, signed=False, endian='little'):
+    '''
+        read an integer at offset without slicing data, works on bytes, bytearray and memoryview.
+        Short data reads whatever is left like int.from_bytes on a slice
+    '''
+    try:
+        return _int_codecs[byte_size, signed, endian].unpack_from(data, offset)[0]
+    except (KeyError, struct.error):
+        return int.from_bytes(data[offset: offset + byte_size], endian, signed=bool(signed))
+
+def copy_into(buf, offset, data):
+    end = offset + len(data)
+    buf[offset:end] = data
+    return end
+
+def unpack_string(data, offset, byte_size, encoding='iso-8859-1'):
+    '''
+        decode a string at offset straight from the buffer of data
+    '''
+    return str(memoryview(data)[offset: offset + byte_size], encoding)
+
+
 class BaseData(VirtualBaseData, NumberInt, NumberComp, NumberBasic):
+    # scalars are allocated for every field of every frame, keep them free of a __dict__
+    __slots__ = ('_value', '_endian')
 
     _byte_size = 0
     _signed    = None
@@ -116,10 +160,13 @@ class BaseData(VirtualBaseData, NumberInt, NumberComp, NumberBasic):
         self._value = val
 
     def import_data(self, data, offset=0, endian=None):
-        section = data[offset: offset + self._byte_size]
         if endian is None:
             endian = self._endian
-        self._value = int.from_bytes(section, endian, signed=self._signed)
+        try:
+            self._value = _int_codecs[self._byte_size, self._signed, endian].unpack_from(data, offset)[0]
+        except (KeyError, struct.error):
+            # short data or no codec for the size
+            self._value = int.from_bytes(data[offset: offset + self._byte_size], endian, signed=self._signed)
         return self._byte_size
 
     def export_data(self, value=None, endian=None):
@@ -129,6 +176,14 @@ class BaseData(VirtualBaseData, NumberInt, NumberComp, NumberBasic):
             endian = self._endian
         return int(value).to_bytes(self._byte_size, endian, signed=self._signed)
 
+    def export_into(self, buf, offset=0):
+        try:
+            codec = _int_codecs[self._byte_size, self._signed, self._endian]
+        except KeyError:
+            return copy_into(buf, offset, self.export_data())
+        codec.pack_into(buf, offset, int(self._value))
+        return offset + self._byte_size
+
     def sizeof(self):
         return self._byte_size
 
@@ -143,9 +198,113 @@ class BaseData(VirtualBaseData, NumberInt, NumberComp, NumberBasic):
     def __bytes__(self):
         return bytes(self.export_data())
 
+def compile_codec(structure):
+    '''
+        one struct.Struct for a structure made only of fixed width BaseData fields
+        sharing the same endian, None when the layout can not be compiled
+    '''
+    formats = []
+    endian = None
+    for parser in structure.values():
+        if (not isinstance(parser, BaseData)
+            or type(parser).import_data is not BaseData.import_data
+            or type(parser).export_data is not BaseData.export_data):
+            return None
+        code = _struct_formats.get((parser._byte_size, bool(parser._signed)))
+        if code is None or endian not in (None, parser._endian):
+            return None
+        endian = parser._endian
+        formats.append(code)
+    if not formats:
+        return None
+    return struct.Struct(('<' if endian == 'little' else '>') + ''.join(formats))
+
+
+def field_size(parser):
+    '''
+        size of a field known without decoding it, None for variable length fields
+    '''
+    if isinstance(parser, BaseData):
+        if type(parser).import_data is BaseData.import_data and parser._byte_size:
+            return parser._byte_size
+        return None
+    if isinstance(parser, BaseStructure):
+        codec = parser._codec()
+        if codec is not None:
+            return codec.size
+        if isinstance(parser, list):
+            # ARRAY of a constant number of fixed size elements
+            count = getattr(parser, '_size', None)
+            if type(count) is not int:
+                return None
+            element = field_size(parser._data_type()) if count else 0
+            return element * count if element is not None else None
+        if not parser._fixed_layout:
+            return None
+        size = 0
+        for field in parser.values():
+            field = field_size(field)
+            if field is None:
+                return None
+            size += field
+        return size
+    return None
+
+def compile_layout(structure):
+    '''
+        offset table of a structure for lazy decoding. Each field, plus the end of
+        the structure, is placed at a fixed distance after the end of the last
+        variable length field before it (anchor -1 is the start of the structure).
+        depends lists the fields an ARRAY takes its size from.
+    '''
+    values = structure.values()
+    anchors, distances, depends = [], [], []
+    anchor = -1
+    distance = 0
+    for parser in values:
+        anchors.append(anchor)
+        distances.append(distance)
+        size_parser = getattr(parser, '_size', None)
+        depends.append(tuple([i for i, other in enumerate(values) if other is size_parser]))
+        size = field_size(parser)
+        if size is None:
+            anchor = len(anchors) - 1
+            distance = 0
+        else:
+            distance += size
+    anchors.append(anchor)
+    distances.append(distance)
+    return tuple(anchors), tuple(distances), tuple(depends)
+
+
 class BaseStructure(VirtualBaseStructure):
+    # classes whose fields are the same for every instance may set True, their
+    # struct.Struct codec and lazy layout are then worked out once for the class
+    _fixed_layout = False
+    # keys not decoded yet by a lazy import
+    _pending = None
+
+    def _codec(self):
+        cls = type(self)
+        try:
+            return cls.__dict__['_struct_codec']
+        except KeyError:
+            pass
+        codec = compile_codec(self) if self._fixed_layout else None
+        cls._struct_codec = codec
+        cls._struct_keys = tuple(self.keys()) if codec else None
+        return codec
 
     def import_data(self, bytes, offset=0, key_filter=None):
+        if self._pending:
+            self._restore()
+        codec = self._codec()
+        if codec is not None and key_filter is None and len(bytes) - offset >= codec.size:
+            fields = self.__dict__
+            for key, value in zip(self._struct_keys, codec.unpack_from(bytes, offset)):
+                fields[key]._value = value
+            return codec.size
+
         length = len(bytes)
         start_offset = offset
         for parser, i in zip(self, range(len(self))):
@@ -157,6 +316,13 @@ class BaseStructure(VirtualBaseStructure):
         return offset - start_offset
 
     def export_data(self, key_filter=None):
+        if self._pending:
+            self._resolve()
+        codec = self._codec()
+        if codec is not None and key_filter is None:
+            fields = self.__dict__
+            return codec.pack(*[int(fields[key]._value) for key in self._struct_keys])
+
         output_stream = bytearray()
         for parser, i in zip(self, range(len(self))):
             if key_filter and i not in key_filter:
@@ -164,7 +330,29 @@ class BaseStructure(VirtualBaseStructure):
             output_stream += parser.export_data()
         return output_stream
 
+    def export_into(self, buf, offset=0):
+        if type(self).export_data is not BaseStructure.export_data:
+            # a structure with its own encoding
+            return copy_into(buf, offset, self.export_data())
+        if self._pending:
+            self._resolve()
+        codec = self._codec()
+        if codec is not None:
+            fields = self.__dict__
+            codec.pack_into(buf, offset, *[int(fields[key]._value) for key in self._struct_keys])
+            return offset + codec.size
+        for parser in self:
+            offset = parser.export_into(buf, offset)
+        return offset
+
     def sizeof(self):
+        if self._pending:
+            return self._lazy_size
+        codec = self._codec()
+        if codec is not None:
+            return codec.size
+        # a sum over the fields, each field knows its own size. Not cached, a field
+        # can be given a new value without the structure holding it knowing
         size = 0
         for item in self:
             size += item.sizeof()
@@ -178,6 +366,8 @@ class BaseStructure(VirtualBaseStructure):
         pass
 
     def items(self):
+        if self._pending:
+            self._resolve()
         try:
             return self._items
         except:
@@ -191,6 +381,8 @@ class BaseStructure(VirtualBaseStructure):
         return self._items
 
     def values(self):
+        if self._pending:
+            self._resolve()
         try:
             return self._values
         except:
@@ -198,6 +390,8 @@ class BaseStructure(VirtualBaseStructure):
         return self._values
 
     def dict(self):
+        if self._pending:
+            self._resolve()
         try:
             return self._dict
         except:
@@ -212,6 +406,8 @@ class BaseStructure(VirtualBaseStructure):
             attr = item
         elif isinstance(item, int):
             attr = self.keys()[item]
+        if self._pending and attr in self._pending:
+            return self._decode(attr)
         return self.__dict__[attr]
 
 
@@ -262,6 +458,16 @@ class BaseStructure(VirtualBaseStructure):
 
 
 class BaseStructureAutoKeys(BaseStructure):
+    '''
+        lazy = True makes import_data only record the buffer, each field is
+        decoded the first time it is read. Fields at a fixed distance from the
+        start or from a variable length field are found from an offset table
+        compiled once per class, variable length fields are decoded when a
+        later field or the total size needs them. The imported buffer must not
+        change while fields are pending. Structures that compile to a single
+        struct.Struct are always decoded at once, that is already one call.
+    '''
+    lazy = False
 
     def keys(self):
         try:
@@ -281,9 +487,86 @@ class BaseStructureAutoKeys(BaseStructure):
 
     def __setattr__(self, key, value):
         if hasattr(value, 'sizeof'):
+            if self._pending:
+                self._resolve()
             self.add_key(key)
         super().__setattr__(key, value)
 
+    def __getattr__(self, key):
+        # only called for missing attributes, fields pending a lazy import are not in __dict__
+        pending = self.__dict__.get('_pending')
+        if pending and key in pending:
+            return self._decode(key)
+        raise AttributeError(key)
+
+    def import_data(self, bytes, offset=0, key_filter=None):
+        if not self.lazy or key_filter is not None or self._codec() is not None:
+            return super().import_data(bytes, offset, key_filter)
+
+        if self._pending:
+            self._restore()
+        if type(self).__dict__.get('_struct_layout') is not None:
+            layout = type(self)._struct_layout
+        else:
+            layout = compile_layout(self)
+            if self._fixed_layout:
+                type(self)._struct_layout = layout
+
+        fields = self.__dict__
+        keys = self.keys()
+        fields.update(_lazy_fields=self.values(), _lazy_layout=layout, _lazy_data=bytes, _lazy_offset=offset,
+                      _lazy_ends={}, _pending={key: index for index, key in enumerate(keys)})
+        for key in keys:
+            del fields[key]
+
+        size = self._field_offset(len(keys)) - offset
+        if offset + size > len(bytes):
+            # short data, decode what is there the usual way
+            self._restore()
+            return super().import_data(bytes, offset)
+        self._lazy_size = size
+        return size
+
+    def _field_offset(self, index):
+        anchors, distances, _ = self._lazy_layout
+        anchor = anchors[index]
+        if anchor < 0:
+            return self._lazy_offset + distances[index]
+        if anchor not in self._lazy_ends:
+            self._decode(self.keys()[anchor])
+        return self._lazy_ends[anchor] + distances[index]
+
+    def _decode(self, key):
+        # key stays pending until it is stored, decoding the fields it depends on
+        # must not find _pending empty and drop the buffer under it
+        data = self._lazy_data
+        index = self._pending[key]
+        for dependency in self._lazy_layout[2][index]:
+            dependency_key = self.keys()[dependency]
+            if dependency_key in self._pending:
+                self._decode(dependency_key)
+        parser = self._lazy_fields[index]
+        offset = self._field_offset(index)
+        self._lazy_ends[index] = offset + parser.import_data(data, offset)
+        self.__dict__[key] = parser
+        del self._pending[key]
+        if not self._pending:
+            self._lazy_data = None
+        return parser
+
+    def _resolve(self):
+        for key in list(self._pending):
+            if key in self._pending:
+                self._decode(key)
+        self._lazy_data = None
+
+    def _restore(self):
+        # put the parsers back undecoded, they are about to be overwritten
+        for key, index in self._pending.items():
+            self.__dict__[key] = self._lazy_fields[index]
+        self._pending = None
+        self._lazy_data = None
+
 def print_structure(structure, output=print, depth=0):
     struct = structure.data_dump()
 
@@ -1,64 +1,96 @@
-from PyCIP.DataTypesModule.BaseDataParsers import BaseData, BaseStructure, VirtualBaseStructure
+from PyCIP.DataTypesModule.BaseDataParsers import BaseData, BaseStructure, VirtualBaseStructure, _struct_formats, \
+    unpack_int, unpack_string, copy_into
+
+try:
+    import numpy as _numpy
+except ImportError:
+    _numpy = None
 
 class BOOL(BaseData):
+    __slots__ = ()
     _byte_size = 1
     _signed = 0
 
 class SINT(BaseData):
+    __slots__ = ()
     _byte_size = 1
     _signed = 1
 
 class INT(BaseData):
+    __slots__ = ()
     _byte_size = 2
     _signed = 1
 
 class DINT(BaseData):
+    __slots__ = ()
     _byte_size = 4
     _signed = 1
 
 class LINT(BaseData):
+    __slots__ = ()
     _byte_size = 8
     _signed = 1
 
 class USINT(BaseData):
+    __slots__ = ()
     _byte_size = 1
     _signed = 0
 
 class UINT(BaseData):
+    __slots__ = ()
     _byte_size = 2
     _signed = 0
 
 class UDINT(BaseData):
+    __slots__ = ()
     _byte_size = 4
     _signed = 0
 
 class ULINT(BaseData):
+    __slots__ = ()
     _byte_size = 8
     _signed = 0
 
 class BYTE(BaseData):
+    __slots__ = ()
     _byte_size = 1
     _signed = 0
 
 class WORD(BaseData):
+    __slots__ = ()
     _byte_size = 2
     _signed = 0
 
 class DWORD(BaseData):
+    __slots__ = ()
     _byte_size = 4
     _signed = 0
 
 class LWORD(BaseData):
+    __slots__ = ()
     _byte_size = 8
     _signed = 0
 
 
 class ARRAY(list, BaseStructure):
-
-    def __init__(self, data_type, size=None):
+    '''
+        vectorized=True keeps arrays of fixed width numbers (USINT..LWORD or any
+        BaseData with a _dtype) in one numpy array decoded with frombuffer.
+        Elements are handed out as data type objects reading and writing their
+        place in the array, so arr[0](99) changes the array as it does the list.
+        Falls back to the list of parsers when numpy is not installed or the
+        type is not numeric.
+    '''
+    _fixed_layout = False
+
+    def __init__(self, data_type, size=None, vectorized=False):
         self._data_type = data_type
         self._size = size
-        if self._size:
+        self._dtype = array_dtype(data_type) if vectorized else None
+        self._ndarray = None
+        if self._dtype is not None:
+            self._ndarray = _numpy.zeros(int(self._size) if self._size else 0, self._dtype)
+        elif self._size:
             for _ in range(self._size):
                 self.append(self._data_type())
 
@@ -69,6 +101,12 @@ class ARRAY(list, BaseStructure):
         if size is None:
             size = int(self._size)
 
+        if self._dtype is not None:
+            count = min(size, (length - offset) // self._dtype.itemsize)
+            # copy, the source is usually a receive buffer that will be reused
+            self._ndarray = _numpy.frombuffer(data, self._dtype, count, offset).copy()
+            return self._ndarray.nbytes
+
         index = 0
         while offset <= length:
             if index >= size:
@@ -84,87 +122,236 @@ class ARRAY(list, BaseStructure):
 
         return offset - start_offset
 
+    def export_data(self, key_filter=None):
+        if self._ndarray is not None and key_filter is None:
+            return self._ndarray.tobytes()
+        return super().export_data(key_filter)
+
+    def export_into(self, buf, offset=0):
+        if self._ndarray is not None:
+            return copy_into(buf, offset, memoryview(self._ndarray).cast('B'))
+        for parser in list.__iter__(self):
+            offset = parser.export_into(buf, offset)
+        return offset
+
+    def sizeof(self):
+        if self._ndarray is not None:
+            return self._ndarray.nbytes
+        return super().sizeof()
+
+    @property
+    def ndarray(self):
+        return self._ndarray
+
     def keys(self):
         return range(0, len(self))
 
+    def items(self):
+        if self._ndarray is not None:
+            return list(zip(self.keys(), self))
+        return super().items()
+
+    def values(self):
+        if self._ndarray is not None:
+            return tuple(self)
+        return super().values()
+
+    def __len__(self):
+        if self._ndarray is not None:
+            return len(self._ndarray)
+        return list.__len__(self)
+
+    def __iter__(self):
+        if self._ndarray is not None:
+            return iter([self._element(index) for index in range(len(self._ndarray))])
+        return list.__iter__(self)
+
+    def __getitem__(self, index):
+        if self._ndarray is not None:
+            if isinstance(index, slice):
+                return [self._element(i) for i in range(*index.indices(len(self._ndarray)))]
+            if index < 0:
+                index += len(self._ndarray)
+            if not 0 <= index < len(self._ndarray):
+                raise IndexError("ARRAY index out of range")
+            return self._element(index)
+        return list.__getitem__(self, index)
+
+    def __setitem__(self, index, value):
+        if self._ndarray is not None:
+            # numpy casts to the element dtype, floats stay floats
+            if isinstance(index, slice):
+                self._ndarray[index] = [_raw_value(item) for item in value]
+            else:
+                self._ndarray[index] = _raw_value(value)
+        else:
+            list.__setitem__(self, index, value)
+
+    def _element(self, index):
+        element_type = _array_element_type(self._data_type)
+        element = element_type.__new__(element_type)
+        element._array = self
+        element._index = index
+        element._endian = 'little' if self._dtype.byteorder in '<=|' else 'big'
+        return element
+
+
+def _raw_value(value):
+    return value() if isinstance(value, BaseData) else value
+
+
+class _ArrayElement():
+    '''
+        element of a vectorized ARRAY, its value is its place in the numpy array
+    '''
+    __slots__ = ()
+
+    @property
+    def _value(self):
+        return self._array._ndarray[self._index].item()
+
+    @_value.setter
+    def _value(self, value):
+        self._array._ndarray[self._index] = value
+
+
+_element_types = {}
+
+def _array_element_type(data_type):
+    element_type = _element_types.get(data_type)
+    if element_type is None:
+        element_type = _element_types[data_type] = type(data_type.__name__, (_ArrayElement, data_type),
+                                                        {'__slots__': ('_array', '_index')})
+    return element_type
+
+
+def array_dtype(data_type):
+    '''
+        numpy dtype for a fixed width BaseData type, None if it can not be vectorized
+    '''
+    if _numpy is None or not issubclass(data_type, BaseData):
+        return None
+    code = getattr(data_type, '_dtype', None)
+    if code is None:
+        if (data_type.import_data is not BaseData.import_data
+            or data_type.export_data is not BaseData.export_data):
+            return None
+        code = _struct_formats.get((data_type._byte_size, bool(data_type._signed)))
+        if code is None:
+            return None
+    endian = data_type()._endian
+    return _numpy.dtype(('<' if endian == 'little' else '>') + code)
+
 
 class STRING(BaseData):
+    # _byte_size follows every import, export and assignment so sizeof never has to encode
+    __slots__ = ('_char_size', '_byte_size')
 
     def __init__(self, char_size=1):
         self._char_size = char_size
         self._byte_size = 0
-        self._value
+        self._value = None
+        self._endian = 'little'
 
-    def import_data(self, data, offset=0):
-        start_offset = offset
-        section = data[offset: offset + 2]
-        offset += 2
-        string_size =  int.from_bytes(section, 'little', signed=0 )
-        section = data[offset: offset + (self._char_size * string_size)]
+    def _encode(self, string):
+        if self._char_size > 1:
+            return string.encode('utf-8')
+        return string.encode('iso-8859-1')
+
+    def _encoded_size(self, string):
+        if string is None:
+            return 0
+        size = len(string) if self._char_size == 1 else len(self._encode(string))
+        return 2 + size + (len(string) % 2)
 
-        self._byte_size = offset + (self._char_size * string_size)
+    @property
+    def internal_data(self):
+        return self._value
 
-        if(string_size % 2):
-            self._byte_size += 1
+    @internal_data.setter
+    def internal_data(self, val):
+        self._value = val
+        self._byte_size = self._encoded_size(val)
+
+    def import_data(self, data, offset=0):
+        string_size = unpack_int(data, offset, 2)
+        byte_size = self._char_size * string_size
 
         if self._char_size == 1:
-            self._value = section.decode('iso-8859-1')
+            self._value = unpack_string(data, offset + 2, byte_size, 'iso-8859-1')
         elif self._char_size > 1:
-            self._value =  bytes.decode('utf-8')
-        self._byte_size = offset - start_offset
+            self._value = unpack_string(data, offset + 2, byte_size, 'utf-8')
+
+        self._byte_size = 2 + byte_size + (string_size % 2)
         return self._byte_size
 
     def export_data(self, string=None):
-        if string is None:
+        # exporting some other string must not change the size of the held one
+        own = string is None
+        if own:
             string = self._value
         length = len(string)
-        out = USINT().export_data(length)
-
-        if self._char_size == 1:
-            out += string.encode('iso-8859-1')
-        elif self._char_size > 1:
-            out += string.encode('utf-8')
+        # the length is a UINT, as import_data reads it
+        out = UINT().export_data(length)
+        out += self._encode(string)
 
         if(length % 2):
             out += bytes(1)
-        self._byte_size = len(out)
+        if own:
+            self._byte_size = len(out)
         return out
 
     def sizeof(self):
-        self.export_data()
         return self._byte_size
 
+    def __call__(self, value=None):
+        if value is not None:
+            self.internal_data = value
+        return self._value
+
 
 class SHORTSTRING(BaseData):
+    __slots__ = ('_char_size', '_byte_size')
 
     def __init__(self):
         self._char_size = 1
         self._byte_size = 0
         self._value = None
+        self._endian = 'little'
+
+    @property
+    def internal_data(self):
+        return self._value
+
+    @internal_data.setter
+    def internal_data(self, val):
+        self._value = val
+        self._byte_size = 0 if val is None else 1 + len(val)
 
     def import_data(self, data, offset=0):
-        start_offset = offset
-        section = data[offset: offset + 1]
-        offset += 1
-        string_size =  int.from_bytes(section, 'little', signed=0 )
-        section = data[offset: offset + (self._char_size * string_size)]
-        self.byte_size = offset + (self._char_size * string_size)
-
-        self._value = section.decode('iso-8859-1')
-        self._byte_size =  offset - start_offset
+        string_size = unpack_int(data, offset, 1)
+        self._value = unpack_string(data, offset + 1, self._char_size * string_size)
+        self._byte_size = 1 + self._char_size * string_size
         return self._byte_size
 
     def export_data(self, string=None):
-        if string is None:
+        # exporting some other string must not change the size of the held one
+        own = string is None
+        if own:
             string = self._value
         length = len(string)
         out = USINT().export_data(length)
         out += string.encode('iso-8859-1')
         #if(length % 2):
         #    out += bytes(1)
-        self._byte_size = len(out)
+        if own:
+            self._byte_size = len(out)
         return out
 
     def sizeof(self):
-        self.export_data()
         return self._byte_size
+
+    def __call__(self, value=None):
+        if value is not None:
+            self.internal_data = value
+        return self._value
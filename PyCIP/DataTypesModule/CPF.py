@@ -1,7 +1,9 @@
 from abc import abstractmethod, ABCMeta
-from PyCIP.DataTypesModule.BaseDataParsers import BaseStructureAutoKeys
+from PyCIP.DataTypesModule.BaseDataParsers import BaseStructureAutoKeys, unpack_int
 from PyCIP.DataTypesModule.BaseDataTypes import *
+from PyCIP.DataTypesModule.SpecialDataTypes import IPAddress
 from enum import IntEnum
+import socket
 
 class CPF_Codes(IntEnum):
 
@@ -15,6 +17,8 @@ class CPF_Codes(IntEnum):
     TOSockaddrInfo    = 0x8001
 
 class CPFCode(UINT):
+    __slots__ = ()
+
     def __str__(self):
         try:
             return str(CPF_Codes(self._value)).split('.')[1]
@@ -22,6 +26,7 @@ class CPFCode(UINT):
             return str(self._value)
 
 class CPF_Item(BaseStructureAutoKeys):
+    _fixed_layout = True
     type_id = None
     def __init__(self, length=0):
         self.Type_ID = CPFCode(self.type_id)
@@ -54,22 +59,59 @@ class CPF_ConnectedData(CPF_Item):
         super().__init__(Length)
 
 
+class CPF_SockaddrInfo(CPF_Item):
+    '''
+        sockaddr of an implicit connection, in network byte order. A forward
+        open reply carries TOSockaddrInfo when the target produces to a
+        multicast group
+    '''
+    def __init__(self, Length=16, sin_family=socket.AF_INET, sin_port=2222, sin_addr=None):
+        super().__init__(Length)
+        self.sin_family = INT(sin_family, endian='big')
+        self.sin_port   = UINT(sin_port, endian='big')
+        self.sin_addr   = IPAddress(sin_addr, endian='big')
+        self.sin_zero   = ARRAY(USINT, 8)
+        for zero in self.sin_zero:
+            zero(0)
+
+    @property
+    def address(self):
+        return (str(self.sin_addr), self.sin_port())
+
+class CPF_OTSockaddrInfo(CPF_SockaddrInfo):
+    type_id = CPF_Codes.OTSockaddrInfo
+
+class CPF_TOSockaddrInfo(CPF_SockaddrInfo):
+    type_id = CPF_Codes.TOSockaddrInfo
+
+
+def _CPF_types(cls):
+    for subclass in cls.__subclasses__():
+        if subclass.type_id != None:
+            yield subclass
+        yield from _CPF_types(subclass)
+
+
 class CPF_Items(list, BaseStructure):
-    _CPF_dict = { CPF_object.type_id:CPF_object for CPF_object in CPF_Item.__subclasses__() }
+    _fixed_layout = False
+    # FreeList the items are taken from when the originator runs pooled
+    item_pool = None
+    _CPF_dict = { CPF_object.type_id:CPF_object for CPF_object in _CPF_types(CPF_Item) }
 
     def __init__(self):
         self.Item_count = UINT(0)
 
     def import_data(self, data, offset=0):
+        start = offset
         offset += self.Item_count.import_data(data, offset)
-        CPF_type = UINT()
+        pool = self.item_pool
 
         for _ in range(self.Item_count):
-            CPF_type.import_data(data, offset)
-            CPF_Item_obj = self._CPF_dict[CPF_type]()
+            CPF_type = self._CPF_dict[unpack_int(data, offset, 2)]
+            CPF_Item_obj = CPF_type() if pool == None else pool.get(CPF_type)
             offset += CPF_Item_obj.import_data(data, offset)
             self.append(CPF_Item_obj)
-        return self.sizeof()
+        return offset - start
 
     def export_data(self):
         self.Item_count(len(self))
@@ -78,6 +120,22 @@ class CPF_Items(list, BaseStructure):
             bytes_out += CPF.export_data()
         return bytes_out
 
+    def export_into(self, buf, offset=0):
+        self.Item_count(len(self))
+        offset = self.Item_count.export_into(buf, offset)
+        for CPF in self:
+            offset = CPF.export_into(buf, offset)
+        return offset
+
+    def item(self, type_id):
+        '''
+            the first item of type_id, None if there is none
+        '''
+        for CPF in self:
+            if CPF.Type_ID == type_id:
+                return CPF
+        return None
+
     def keys(self):
         return ['Item_count'] + list(range(0, len(self)))
 
@@ -6,6 +6,7 @@ class CIPServiceCode(IntEnum):
     set_att_single = 0x10
     get_att_all    = 0x01
     set_att_all    = 0x02
+    multiple_service_packet = 0x0A
     unconnected_Send = 0x52
     forward_open   = 0x54
     forward_close  = 0x4E
@@ -42,4 +43,21 @@ class LogicalFormat(IntEnum):
 class DataSubType(IntEnum):
 
     SimpleData = 0
-    ANSI       = 9
\ No newline at end of file
+    ANSI       = 9
+class NetworkSegmentType(IntEnum):
+
+    Schedule              = 0x01
+    FixedTag              = 0x02
+    ProductionInhibitTime = 0x03
+
+class ProductionTrigger(IntEnum):
+
+    Cyclic        = 0
+    ChangeOfState = 1
+    Application   = 2
+
+class ConnectionType(IntEnum):
+
+    Null         = 0
+    Multicast    = 1
+    PointToPoint = 2
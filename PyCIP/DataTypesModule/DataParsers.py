@@ -3,6 +3,7 @@ import struct
 import socket
 import abc
 from PyCIP.DataTypesModule.EPATH import EPATH
+from PyCIP.DataTypesModule.BaseDataParsers import unpack_int, unpack_string, copy_into, _struct_formats
 
 class CIPDataStructureVirtual(object):
     __metaclass__ = abc.ABCMeta
@@ -44,13 +45,22 @@ class CIPDataStructureVirtual(object):
         return '\n'.join(self.pprint())
 
 class CIPDataStructure(CIPDataStructureVirtual):
+    '''
+        the definition is compiled to a CIPStructurePlan on first use, shared by
+        every structure with the same definition.
+
+        lazy = True makes import_data only record the buffer, fields are decoded
+        the first time they are looked up (see CIPLazyFields)
+    '''
     global_structure = OrderedDict()
+    lazy = False
 
     def __init__(self, *data_tuple, **initial_values):
         self.structure = OrderedDict(self.global_structure)
         self.structure.update(data_tuple)
         self._keys = list(self.structure.keys())
         self._struct_list = tuple(self.structure.items())
+        self._plan = None
         self.byte_size = 0
         self.data = {}
         self.set_values(initial_values)
@@ -58,6 +68,10 @@ class CIPDataStructure(CIPDataStructureVirtual):
     def __getattr__(self, item):
         if item in self.structure:
             return self.data[item]
+        if item == 'byte_size' and isinstance(self.__dict__.get('data'), CIPLazyFields):
+            # the size of a lazy import is only worked out when asked for
+            self.byte_size = self.data.field_offset(len(self._keys)) - self.data.offset
+            return self.byte_size
 
     def __setattr__(self, key, value):
         if 'structure' in self.__dict__:
@@ -97,55 +111,41 @@ class CIPDataStructure(CIPDataStructureVirtual):
     def keys(self):
         return self._keys
 
+    def compiled_plan(self):
+        plan = self.__dict__.get('_plan')
+        if plan is None:
+            plan = self._plan = CIPStructurePlan.compile(self._struct_list)
+        return plan
+
     def import_data(self, bytes, offset=0):
-        start_offset = offset
-        for key, val in self.structure.items():
-            try:
-                # see if string representation of type is used
-                if isinstance(val, str):
-                    val = CIPDataTypes[val]
-                # check to see if object need instantiating
-                if val.__class__ == type:
-                    val = val()
-                # see if the type can parse
-                self.data[key] = val.import_data(bytes, offset)
-                offset += val.byte_size
-            except (AttributeError, KeyError):
-                sub_struct = val
-                # otherwise if not a base unit type see if it is an array with length defined by a previous element
-                if isinstance(val[0], str):
-                    size = self.data[val[0]]
-                    sub_struct = [(i, val[1]) for i in range(size)]
-                 # otherwise if not a base unit type see if it is an array with length defined as int
-                elif isinstance(val[0], int):
-                    sub_struct = [(i, val[1]) for i in range(val[0])]
-                # send new sub struct down as a new struct
-                if isinstance(sub_struct, (list, tuple)):
-                    self.data[key] = CIPDataStructure(*sub_struct)
-                    offset += self.data[key].import_data(bytes, offset).byte_size
-        self.byte_size = offset - start_offset
+        plan = self.compiled_plan()
+        if self.lazy:
+            self.__dict__.pop('byte_size', None)
+            self.data = CIPLazyFields(self, bytes, offset)
+            return self
+
+        if isinstance(self.data, CIPLazyFields):
+            self.data = {}
+        self.byte_size = plan.import_all(self, bytes, offset) - offset
         return self
 
     def export_data(self):
-        data_out = bytearray()
-        for key, val in self.structure.items():
-            if isinstance(val, str):
-                val = CIPDataTypes[val]
-            try:
-                data_out += self.data[key].export_data()
-                continue
-            except AttributeError:
-                pass
-            try:
-                data_out += val.export_data(self.data[key])
-                continue
-            except AttributeError:
-                pass
-            raise TypeError("No parser for " + key)
+        data_out = self.compiled_plan().export_all(self)
         self.byte_size = len(data_out)
         return data_out
 
+    def export_into(self, buf, offset=0):
+        return self.compiled_plan().export_into(self, buf, offset)
+
+    def sizeof(self):
+        size = self.compiled_plan().byte_size
+        if size is None:
+            size = len(self.export_data())
+        return size
+
     def get_dict(self):
+        if isinstance(self.data, CIPLazyFields):
+            self.data.decode_all()
         return self.data
 
     def pprint(self):
@@ -164,6 +164,272 @@ class CIPDataStructure(CIPDataStructureVirtual):
 
 
 
+class CIPLazyFields(dict):
+    '''
+        field values of a lazily imported CIPDataStructure. A missing key is
+        decoded from the recorded buffer on lookup, the offset comes from the
+        structure's offset table and the end of the variable length field it
+        follows, which is decoded first if need be.
+    '''
+
+    def __init__(self, structure, bytes, offset):
+        super().__init__()
+        self.structure = structure
+        self.bytes = bytes
+        self.offset = offset
+        self.ends = {}
+
+    def __missing__(self, key):
+        index = self.structure._plan.index[key]
+        self.decode(index)
+        return self.get(key)
+
+    def decode(self, index):
+        structure = self.structure
+        key = structure._keys[index]
+        offset = self.field_offset(index)
+        # a value set by hand before it was decoded is kept
+        value = dict.get(self, key, self)
+        self.ends[index] = offset + structure._plan.import_field(structure, index, self.bytes, offset)
+        if value is not self:
+            self[key] = value
+
+    def field_offset(self, index):
+        anchors, distances = self.structure._plan.layout
+        anchor = anchors[index]
+        if anchor < 0:
+            return self.offset + distances[index]
+        if anchor not in self.ends:
+            self.decode(anchor)
+        return self.ends[anchor] + distances[index]
+
+    def decode_all(self):
+        for index, key in enumerate(self.structure._keys):
+            if key not in self:
+                self.decode(index)
+
+
+_PARSER, _NEW_PARSER, _STRUCT, _ARRAY = range(4)
+_compiled_plans = {}
+
+def _definition_key(val):
+    if isinstance(val, (list, tuple)):
+        return tuple([_definition_key(item) for item in val])
+    return val
+
+class CIPStructurePlan():
+    '''
+        decode/encode plan of a CIPDataStructure definition, compiled once.
+
+        String types are resolved to their parser objects, runs of neighbouring
+        fixed size integers are read and written with one struct.Struct, nested
+        structures carry their own plan and arrays (length prefixed by an earlier
+        field or of constant length) keep the compiled element plus one plan
+        per element count seen.
+    '''
+
+    def __init__(self, struct_list, fields=None):
+        self.struct_list = tuple(struct_list)
+        self.structure = OrderedDict(self.struct_list)
+        self.keys = list(self.structure.keys())
+        self.index = {key: i for i, key in enumerate(self.keys)}
+        # (kind, parser/plan/(count, element field), fixed byte size or None)
+        self.fields = fields if fields != None else [self.compile_field(val) for val in self.structure.values()]
+        self.steps = self._compile_steps()
+        self.layout = self._compile_layout()
+        sizes = [field[2] for field in self.fields]
+        self.byte_size = None if None in sizes else sum(sizes)
+        self._array_plans = {}
+
+    @classmethod
+    def compile(cls, struct_list):
+        '''
+            the plan of a definition, compiled on first use
+        '''
+        try:
+            key = _definition_key(struct_list)
+            return _compiled_plans[key]
+        except KeyError:
+            plan = _compiled_plans[key] = cls(struct_list)
+            return plan
+        except TypeError:
+            # something unhashable in the definition, no sharing
+            return cls(struct_list)
+
+    @staticmethod
+    def compile_field(val):
+        if isinstance(val, str):
+            val = CIPDataTypes[val]
+        if isinstance(val, (list, tuple)):
+            if isinstance(val[0], (str, int)):
+                element = CIPStructurePlan.compile_field(val[1])
+                size = None
+                if isinstance(val[0], int) and element[2] != None:
+                    size = val[0] * element[2]
+                return _ARRAY, (val[0], element), size
+            plan = CIPStructurePlan(val)
+            return _STRUCT, plan, plan.byte_size
+        if val.__class__ == type:
+            size = getattr(val, 'byte_size', None)
+            return _NEW_PARSER, val, size if isinstance(size, int) else None
+        if hasattr(val, 'import_data'):
+            size = getattr(type(val), 'byte_size', None)
+            return _PARSER, val, size if isinstance(size, int) else None
+        raise TypeError("No parser for %r" % (val,))
+
+    def _compile_steps(self):
+        # ('run', struct.Struct, keys, indexes) or ('field', index)
+        steps = []
+        run = []
+
+        def close_run():
+            if len(run) > 1:
+                codec = struct.Struct('<' + ''.join([code for _, code in run]))
+                indexes = tuple([index for index, _ in run])
+                steps.append(('run', codec, tuple([self.keys[i] for i in indexes]), indexes))
+            elif run:
+                steps.append(('field', run[0][0]))
+            del run[:]
+
+        for index, (kind, parser, size) in enumerate(self.fields):
+            code = None
+            if kind == _PARSER and type(parser).import_data is BaseDataParser.import_data:
+                code = _struct_formats.get((size, bool(parser.signed)))
+            if code != None:
+                run.append((index, code))
+                continue
+            close_run()
+            steps.append(('field', index))
+        close_run()
+        return tuple(steps)
+
+    def _compile_layout(self):
+        '''
+            offset table, every field (and the end) sits a fixed distance after the
+            end of the last variable length field before it, -1 being the start
+        '''
+        anchors, distances = [], []
+        anchor = -1
+        distance = 0
+        for index, (_, _, size) in enumerate(self.fields):
+            anchors.append(anchor)
+            distances.append(distance)
+            if size != None:
+                distance += size
+            else:
+                anchor = index
+                distance = 0
+        anchors.append(anchor)
+        distances.append(distance)
+        return tuple(anchors), tuple(distances)
+
+    def array_plan(self, index, count):
+        plan = self._array_plans.get((index, count))
+        if plan is None:
+            element = self.fields[index][1][1]
+            plan = CIPStructurePlan([(i, self.struct_list[index][1][1]) for i in range(count)], [element] * count)
+            self._array_plans[(index, count)] = plan
+        return plan
+
+    def new(self, lazy=False):
+        '''
+            a CIPDataStructure following this plan, without re-reading the definition
+        '''
+        structure = CIPDataStructure.__new__(CIPDataStructure)
+        structure.__dict__.update(structure=self.structure, _keys=self.keys, _struct_list=self.struct_list,
+                                  _plan=self, byte_size=0, data={})
+        if lazy:
+            structure.lazy = True
+        return structure
+
+    def import_all(self, structure, bytes, offset):
+        data = structure.data
+        for step in self.steps:
+            if step[0] == 'run':
+                codec = step[1]
+                try:
+                    data.update(zip(step[2], codec.unpack_from(bytes, offset)))
+                    offset += codec.size
+                    continue
+                except struct.error:
+                    # short data, take the fields one by one
+                    indexes = step[3]
+            else:
+                indexes = step[1:]
+            for index in indexes:
+                offset += self.import_field(structure, index, bytes, offset)
+        return offset
+
+    def import_field(self, structure, index, bytes, offset):
+        kind, parser, _ = self.fields[index]
+        key = self.keys[index]
+        if kind == _PARSER:
+            structure.data[key] = parser.import_data(bytes, offset)
+            return parser.byte_size
+        if kind == _NEW_PARSER:
+            parser = parser()
+            structure.data[key] = parser.import_data(bytes, offset)
+            return parser.byte_size
+        if kind == _STRUCT:
+            sub = parser.new(structure.lazy)
+        else:
+            count = parser[0]
+            if isinstance(count, str):
+                count = structure.data[count]
+            sub = self.array_plan(index, count).new(structure.lazy)
+        structure.data[key] = sub
+        return sub.import_data(bytes, offset).byte_size
+
+    def export_all(self, structure):
+        data = structure.data
+        data_out = bytearray()
+        for step in self.steps:
+            if step[0] == 'run':
+                try:
+                    data_out += step[1].pack(*[data[key] for key in step[2]])
+                    continue
+                except (struct.error, TypeError):
+                    indexes = step[3]
+            else:
+                indexes = step[1:]
+            for index in indexes:
+                data_out += self.export_field(structure, index)
+        return data_out
+
+    def export_into(self, structure, buf, offset):
+        data = structure.data
+        for step in self.steps:
+            if step[0] == 'run':
+                try:
+                    step[1].pack_into(buf, offset, *[data[key] for key in step[2]])
+                    offset += step[1].size
+                    continue
+                except (struct.error, TypeError):
+                    indexes = step[3]
+            else:
+                indexes = step[1:]
+            for index in indexes:
+                value = data[self.keys[index]]
+                if isinstance(value, CIPDataStructure):
+                    offset = value.export_into(buf, offset)
+                else:
+                    offset = copy_into(buf, offset, self.export_field(structure, index))
+        return offset
+
+    def export_field(self, structure, index):
+        key = self.keys[index]
+        value = structure.data[key]
+        try:
+            return value.export_data()
+        except AttributeError:
+            pass
+        try:
+            return self.fields[index][1].export_data(value)
+        except AttributeError:
+            pass
+        raise TypeError("No parser for " + key)
+
+
 def not_none(primary, secondary):
     return primary if primary != None else secondary
 
@@ -171,8 +437,7 @@ def not_none(primary, secondary):
 class BaseDataParser():
 
     def import_data(self, data, offset=0, endian='little'):
-        section = data[offset: offset + self.byte_size]
-        return int.from_bytes(section, endian, signed=self.signed )
+        return unpack_int(data, offset, self.byte_size, self.signed, endian)
 
     def export_data(self, value, endian='little'):
         return value.to_bytes(self.byte_size, endian, signed=self.signed)
@@ -194,20 +459,15 @@ class StringDataParser():
         self.byte_size = 0
 
     def import_data(self, data, offset=0):
-        section = data[offset: offset + 2]
-        offset += 2
-        string_size =  int.from_bytes(section, 'little', signed=0 )
-        section = data[offset: offset + (self.char_size * string_size)]
-
-        self.byte_size = offset + (self.char_size * string_size)
+        string_size = unpack_int(data, offset, 2)
+        byte_size = self.char_size * string_size
 
-        if(string_size % 2):
-            self.byte_size += 1
+        self.byte_size = 2 + byte_size + (string_size % 2)
 
         if self.char_size == 1:
-            return section.decode('iso-8859-1')
+            return unpack_string(data, offset + 2, byte_size, 'iso-8859-1')
         elif self.char_size > 1:
-            return bytes.decode('utf-8')
+            return unpack_string(data, offset + 2, byte_size, 'utf-8')
         else:
             return u'Error: Incorrect character size defined'
 
@@ -231,15 +491,9 @@ class ShortStringDataParser():
         self.char_size = 1
 
     def import_data(self, data, offset=0):
-        section = data[offset: offset + 1]
-        offset += 1
-        string_size =  int.from_bytes(section, 'little', signed=0 )
-        section = data[offset: offset + (self.char_size * string_size)]
-        self.byte_size = offset + (self.char_size * string_size)
-
-        string_parsed = section.decode('iso-8859-1')
-        #utf_encoded = string_parsed.encode('utf-8')
-        return string_parsed
+        string_size = unpack_int(data, offset, 1)
+        self.byte_size = 1 + self.char_size * string_size
+        return unpack_string(data, offset + 1, self.char_size * string_size)
 
 class MAC_CIP(BaseDataParser):
     byte_size = 6
@@ -266,11 +520,11 @@ class MAC_CIP(BaseDataParser):
             return "%02x:%02x:%02x:%02x:%02x:%02x" % (0,0,0,0,0,0)
 
 class IPAddress_CIP(BaseDataParser):
+    byte_size = 4
 
     def __init__(self):
         self.val = None
         self.parser = UDINT_CIP()
-        self.byte_size = None
 
     def export_data(self, value=None, endian='little'):
         self.val = not_none(value, self.val)
@@ -3,6 +3,8 @@ import struct
 from PyCIP.DataTypesModule.Constants import *
 
 class TransportPacket():
+    __slots__ = ('response_id', 'transport_meta_data', 'encapsulation_header', 'command_specific',
+                 'CPF', 'CIP', 'offset', 'data', 'pool')
 
     def __init__(self, transport_meta_data=None, encapsulation_header=None, command_specific=None, CPF=None, data=None, CIP=None):
         self.response_id = None
@@ -13,6 +15,16 @@ class TransportPacket():
         self.CIP = CIP
         self.offset = 0
         self.data = data
+        # FramePool the packet came from when the originator runs pooled
+        self.pool = None
+
+    def release(self):
+        '''
+            hand the packet and its parsed parts back to the pool for the next frames,
+            nothing may use them afterwards. Does nothing for packets not from a pool
+        '''
+        if self.pool != None:
+            self.pool.release(self)
 
     def show_data_hex(self):
         return ' '.join(format(x, '02x') for x in self.data)
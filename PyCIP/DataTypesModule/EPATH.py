@@ -1,6 +1,7 @@
 from PyCIP.DataTypesModule.Constants import *
 
 import struct
+from functools import lru_cache
 
 from PyCIP.DataTypesModule import BaseDataParsers
 
@@ -40,7 +41,7 @@ class PortSegment(SegType):
             link_address = [link_address]
         data_out += bytes(link_address)
         if len(data_out) % 2:
-            data_out += bytearray(0)
+            data_out += bytearray(1)
         self.bytes_object = data_out
         return data_out
 
@@ -89,14 +90,15 @@ class LogicalSegment(SegType):
         if logical_type == LogicalType.ExtendedLogical:
             if extended == None : raise ValueError("No extended value provided")
             data_out.append(extended)
+        # padded EPATH, 16 and 32 bit values are word aligned with a pad byte
         if format == LogicalFormat.bit_8:
             data_out += struct.pack('B', value)
         elif format == LogicalFormat.bit_16:
-            data_out += struct.pack('H', value)
+            data_out += struct.pack('<xH', value)
         elif format == LogicalFormat.bit_32:
             if (logical_type in (LogicalType.InstanceID, LogicalType.ConnectionPoint)
             or extended in (1, 3, 5, 6)):
-                data_out += struct.pack('I', value)
+                data_out += struct.pack('<xI', value)
             else:
                 raise ValueError("Invalid logical extended type for 32 bit format")
         else:
@@ -161,6 +163,38 @@ class DataSegment(SegType):
                                                self.length)
         return "DataSegment NULL"
 
+class NetworkSegment(SegType):
+    type_code = SegmentType.NetworkSegment
+
+    def __init__(self, type=None, value=None, bytes_object=None):
+        self.type = type
+        self.value = value
+        self.bytes_object = bytes_object
+
+        if self.type != None and self.value != None:
+            self.bytes_object = self.export_data(self.type, self.value)
+
+    def build(self, type, value):
+        # only the subtypes with a single data byte, ProductionInhibitTime in ms
+        temp_byte = (0x07 & SegmentType.NetworkSegment) << 5
+        temp_byte |= 0x1F & type
+        data_out = struct.pack('BB', temp_byte, value)
+        self.bytes_object = data_out
+        return data_out
+
+    def export_data(self, type=None, value=None):
+        self.type   = not_none(type, self.type)
+        self.value  = not_none(value, self.value)
+        return self.build(self.type, self.value)
+
+    def import_data(self, data, offset=0):
+        self.bytes_object = data
+
+    def __str__(self):
+        if self.type != None and self.value != None:
+            return "Network: Type %s, value %s" % (str(NetworkSegmentType(self.type)).split('.')[1], self.value)
+        return "NetworkSegment NULL"
+
 
 class KeySegment_v4(BaseDataParsers.BaseStructureAutoKeys):
     version = 4
@@ -188,6 +222,14 @@ class EPATH(list):
             data_out += e_item.export_data()
         return data_out
 
+    def export_into(self, buf, offset=0):
+        for e_item in self:
+            offset = BaseDataParsers.copy_into(buf, offset, e_item.export_data())
+        return offset
+
+    def sizeof(self):
+        return len(self.export_data())
+
     def import_data(self, data, length, offset=0):
         index = offset
         while index < length + offset:
@@ -204,4 +246,55 @@ class EPATH(list):
         return index - offset
 
 def not_none(primary, secondary):
-    return primary if primary != None else secondary
\ No newline at end of file
+    return primary if primary != None else secondary
+
+
+class CompiledEPATH(bytes):
+    '''
+        immutable, already encoded EPATH as returned by compile_path/compile_route,
+        usable anywhere an EPATH is exported
+    '''
+
+    @property
+    def byte_size(self):
+        return len(self)
+
+    def export_data(self):
+        return self
+
+    def export_into(self, buf, offset=0):
+        return BaseDataParsers.copy_into(buf, offset, self)
+
+    def sizeof(self):
+        return len(self)
+
+def logical_format(value):
+    # smallest logical format able to hold value
+    if value <= 0xFF:
+        return LogicalFormat.bit_8
+    if value <= 0xFFFF:
+        return LogicalFormat.bit_16
+    return LogicalFormat.bit_32
+
+@lru_cache(maxsize=4096)
+def compile_path(class_int, instance_int=None, attribute_int=None):
+    '''
+        encoded class/instance/attribute request path, memoized so repeated requests are a dictionary lookup
+    '''
+    path = EPATH()
+    path.append(LogicalSegment(LogicalType.ClassID, logical_format(class_int), class_int))
+    if instance_int != None:
+        path.append(LogicalSegment(LogicalType.InstanceID, logical_format(instance_int), instance_int))
+    if attribute_int != None:
+        path.append(LogicalSegment(LogicalType.AttributeID, logical_format(attribute_int), attribute_int))
+    return CompiledEPATH(path.export_data())
+
+@lru_cache(maxsize=256)
+def compile_route(*port_links):
+    '''
+        encoded route path from (port, link_address) pairs, link_address may be an int or a tuple of ints
+    '''
+    path = EPATH()
+    for port, link_address in port_links:
+        path.append(PortSegment(port, list(link_address) if isinstance(link_address, tuple) else link_address))
+    return CompiledEPATH(path.export_data())
@@ -1,6 +1,8 @@
 
 
 class NumberBasic():
+    __slots__ = ()
+
 
     def __add__(self, *args, **kwargs):
         try:
@@ -172,6 +174,8 @@ class NumberBasic():
             raise NotImplementedError
 
 class NumberRight():
+    __slots__ = ()
+
 
     def __radd__(self, *args, **kwargs):
         try:
@@ -258,6 +262,8 @@ class NumberRight():
             raise NotImplementedError
 
 class NumberMag():
+    __slots__ = ()
+
 
     def __neg__(self, *args, **kwargs):
         try:
@@ -284,6 +290,8 @@ class NumberMag():
             raise NotImplementedError
 
 class NumberComplex():
+    __slots__ = ()
+
     def __complex__(self, *args, **kwargs):
         try:
             return self.internal_data.__complex__(*args, **kwargs)
@@ -291,6 +299,8 @@ class NumberComplex():
             raise NotImplementedError
 
 class NumberInt():
+    __slots__ = ()
+
     def __int__(self, *args, **kwargs):
         try:
             return self.internal_data.__int__(*args, **kwargs)
@@ -307,6 +317,8 @@ class NumberInt():
         return self.internal_data.__hash__()
 
 class NumberFloat():
+    __slots__ = ()
+
     def __float__(self, *args, **kwargs):
         try:
             return self.internal_data.__float__(*args, **kwargs)
@@ -314,6 +326,8 @@ class NumberFloat():
             raise NotImplementedError
 
 class NumberRound():
+    __slots__ = ()
+
     def __round__(self, *args, **kwargs):
         try:
             return self.internal_data.__round__(*args, **kwargs)
@@ -321,6 +335,8 @@ class NumberRound():
             raise NotImplementedError
 
 class NumberIndex():
+    __slots__ = ()
+
     def __index__(self, *args, **kwargs):
         try:
             return self.internal_data.__index__(*args, **kwargs)
@@ -331,6 +347,8 @@ class NumberIndex():
         return self.internal_data.__hash__()
 
 class NumberComp():
+    __slots__ = ()
+
     def __lt__(self, *args, **kwargs):
         try:
             return self.internal_data.__lt__(*args, **kwargs)
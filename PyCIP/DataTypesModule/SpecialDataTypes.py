@@ -5,6 +5,7 @@ import struct
 import math
 
 class IPAddress(UDINT):
+    __slots__ = ()
 
     def __init__(self, value=None, endian='little'):
         self._value = value
@@ -30,39 +31,56 @@ class MACAddress(ARRAY):
         return self.__str__()
 
 class Revision(BaseStructureAutoKeys):
+    _fixed_layout = True
 
     def __init__(self):
         self.Major = USINT()
         self.Minor = USINT()
 
 class BaseBitFieldStruct(BaseStructureAutoKeys):
+    '''
+        bit fields packed into one little endian word from the least significant
+        bit, last field first. The shift and mask of every field are worked out
+        once per class when it sets _fixed_layout, import and export touch the
+        word once.
+    '''
+
+    def bit_layout(self):
+        '''
+            (byte size, ((key, shift, mask), ...))
+        '''
+        layout = type(self).__dict__.get('_bit_layout')
+        if layout is not None:
+            return layout
+        fields = []
+        shift = 0
+        for key in reversed(self.keys()):
+            parser = self.__dict__[key]
+            fields.append((key, shift, parser._mask))
+            shift += parser.bit_sizeof()
+        layout = (shift // 8 + (1 if shift % 8 else 0), tuple(fields))
+        if self._fixed_layout:
+            type(self)._bit_layout = layout
+        return layout
 
     def import_data(self, bytes, offset=0):
-        length = len(bytes)
-        start_offset = offset
-        bit_offset = 0
-        for parser in reversed(self):
-            bit_offset += parser.import_data(bytes, offset, bit_offset)
-            offset += bit_offset // 8
-            bit_offset = bit_offset % 8
-            if length <= offset:
-                break
-        return offset + math.ceil(bit_offset/8.0) - start_offset
+        size, fields = self.bit_layout()
+        word = unpack_int(bytes, offset, size)
+        parsers = self.__dict__
+        for key, shift, mask in fields:
+            parsers[key]._value = (word >> shift) & mask
+        return min(size, len(bytes) - offset)
 
     def export_data(self):
-        output = int()
-        for parser in reversed(self):
-            val = parser.export_data()
-            output <<= parser.bit_size()
-            output |= val
-        output_stream = output.to_bytes(self.sizeof(), 'little')
-        return output_stream
+        size, fields = self.bit_layout()
+        parsers = self.__dict__
+        word = 0
+        for key, shift, mask in fields:
+            word |= (parsers[key]._value & mask) << shift
+        return word.to_bytes(size, 'little')
 
     def sizeof(self):
-        size = 0
-        for item in self:
-            size += item.bit_sizeof()
-        return size // 8 + (1 if size % 8 else 0)
+        return self.bit_layout()[0]
 
     def __setattr__(self, key, value):
         if isinstance(value, BaseBitField):
@@ -76,14 +94,14 @@ class BaseBitField(VirtualBaseData):
         self._mask = 0b00000001 << bit_size
         self._mask -= 1
         self._byte_size = math.ceil(bit_size/8.0)
+        self._value = 0
         self._endian = endian
 
 
     def import_data(self, bytes, offset=0, bit_offset=0, endian=None):
-        section = bytes[offset: offset + self._byte_size]
         if endian is None:
             endian = self._endian
-        value = int.from_bytes(section, endian, signed=False)
+        value = unpack_int(bytes, offset, self._byte_size, False, endian)
         value = value >> bit_offset
         self._value = value & self._mask
         return self._bit_size
@@ -6,7 +6,7 @@ from PyCIP.DataTypesModule.DataParsers import CIPDataStructure, CIPDataTypes,\
     LINT_CIP, USINT_CIP, UINT_CIP, UDINT_CIP, ULINT_CIP, BYTE_CIP, WORD_CIP, DWORD_CIP, LWORD_CIP
 
 from PyCIP.DataTypesModule.CPF import CPF_Codes, CPF_Items, CPF_Item, CPF_NullAddress, CPF_ConnectedAddress, CPF_SequencedAddress,\
-                                CPF_UnconnectedData, CPF_ConnectedData
+                                CPF_UnconnectedData, CPF_ConnectedData, CPF_SockaddrInfo, CPF_OTSockaddrInfo, CPF_TOSockaddrInfo
 
 from PyCIP.DataTypesModule.BaseDataParsers import *
 from PyCIP.DataTypesModule.BaseDataTypes import *
@@ -0,0 +1,178 @@
+import asyncio
+from PyCIP.ENIPModule.ENIP import ENIP_Originator
+from .ENIPDataStructures import *
+from .ENIPStream import EncapsulationStreamBuffer
+from PyCIP.Tools import exceptions
+
+
+class _StreamProtocol(asyncio.BufferedProtocol):
+
+    def __init__(self, originator):
+        self.originator = originator
+
+    def connection_made(self, transport):
+        self.originator._connection_made(transport)
+
+    def get_buffer(self, sizehint):
+        return self.originator.TCP_rcv_buffer.get_buffer(sizehint)
+
+    def buffer_updated(self, nbytes):
+        self.originator._buffer_updated(nbytes)
+
+    def connection_lost(self, exc):
+        self.originator._connection_lost(exc)
+
+
+class _DatagramProtocol(asyncio.DatagramProtocol):
+
+    def __init__(self, originator):
+        self.originator = originator
+
+    def datagram_received(self, data, addr):
+        self.originator._datagram_received(data)
+
+
+class AsyncENIPOriginator(ENIP_Originator):
+    '''
+        ENIP originator driven by an asyncio event loop instead of a polling thread.
+        The loop only wakes when a socket is readable or a packet is queued, so
+        any number of originators can share a single loop.
+
+        send_encap may be called from any thread (e.g. Basic_CIP), packets are
+        handed to the loop with call_soon_threadsafe.
+    '''
+
+    def __init__(self, target_port=44818, loop=None, pooled=False, udp_rcvbuf=1 << 21, track_sequence=True):
+        super().__init__(None, target_port, pooled=pooled, udp_rcvbuf=udp_rcvbuf, track_sequence=track_sequence)
+        self.loop = loop
+        self.manage_connection = False
+        self.stream_transport = None
+        self.datagram_transport = None
+        self.TCP_rcv_buffer = EncapsulationStreamBuffer()
+        self._stream_socket = None
+        self._datagram_socket = None
+        self._session_waiter = None
+        self._keep_alive_handle = None
+
+    def start(self):
+        # nothing to spin up, the event loop drives the connection
+        self.manage_connection = True
+
+    def stop(self):
+        self.manage_connection = False
+        self.session_handle = None
+        self._detach_io_receiver()
+        if self._keep_alive_handle != None:
+            self._keep_alive_handle.cancel()
+            self._keep_alive_handle = None
+        for transport in (self.stream_transport, self.datagram_transport):
+            if transport != None:
+                transport.close()
+
+    async def create_class_2_3(self, target_ip, target_port=44818, time_out=3):
+        if self.target != None:
+            raise exceptions.IncorrectState("IP address already set, use another layer object for different targets")
+        self.target = target_ip
+        self.port = target_port
+        self.loop = asyncio.get_running_loop()
+        await asyncio.wait_for(self.loop.create_connection(lambda: _StreamProtocol(self), target_ip, target_port),
+                               time_out)
+
+    async def create_class_0_1(self, target_ip, target_port=2222):
+        self.loop = asyncio.get_running_loop()
+        transport, _ = await self.loop.create_datagram_endpoint(lambda: _DatagramProtocol(self),
+                                                                remote_addr=(target_ip, target_port))
+        self.datagram_transport = transport
+        self._datagram_socket = transport.get_extra_info('socket')
+        # asyncio reads the datagrams itself, only the buffer size applies
+        self._configure_datagram_socket(self._datagram_socket)
+        self._endpoint(self._datagram_socket, 'udp')
+
+    async def register_session(self, target_ip=None, time_out=5.0):
+        if target_ip != None:
+            await self.create_class_2_3(target_ip)
+
+        self._session_waiter = self.loop.create_future()
+        command_specific = RegisterSession(Protocol_version=1, Options_flags=0)
+        command_specific_bytes = command_specific.export_data()
+        encap_header = ENIPEncapsulationHeader(ENIPCommandCode.RegisterSession,
+                                               len(command_specific_bytes),
+                                               0,
+                                               0,
+                                               self.internal_sender_context,
+                                               0,
+                                               )
+        self._send_encap(encap_header.export_data(), command_specific_bytes)
+
+        try:
+            await asyncio.wait_for(self._session_waiter, time_out)
+        except asyncio.TimeoutError:
+            self.stop()
+            return False
+        return True
+
+    async def unregister_session(self):
+        encap_header = ENIPEncapsulationHeader(ENIPCommandCode.UnRegisterSession, 0, 0, 0, 0, 0)
+        self._send_encap(encap_header.export_data())
+        self.stop()
+
+    def _send_encap(self, *packet_parts):
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is self.loop:
+            self._write(packet_parts)
+        else:
+            self.loop.call_soon_threadsafe(self._write, packet_parts)
+
+    def _write(self, packet_parts):
+        if self.stream_transport != None and not self.stream_transport.is_closing():
+            self.stream_transport.writelines(packet_parts)
+
+    def _send_IO(self, packet):
+        if self.io_receiver != None:
+            return super()._send_IO(packet)
+        if self.datagram_transport != None:
+            # copied, producers reuse their frame buffer before the loop gets to it
+            self.loop.call_soon_threadsafe(self.datagram_transport.sendto, bytes(packet))
+
+    def _keep_alive(self):
+        # keep alive the connection from timing out
+        if self.manage_connection and self.session_handle != None:
+            self.NOP()
+        self._keep_alive_handle = self.loop.call_later(self.keep_alive_rate_s * 0.9, self._keep_alive)
+
+    def _connection_made(self, transport):
+        self.stream_transport = transport
+        self._stream_socket = transport.get_extra_info('socket')
+        self._endpoint(self._stream_socket, 'tcp')
+        self.start()
+        self._keep_alive_handle = self.loop.call_later(self.keep_alive_rate_s * 0.5, self._keep_alive)
+
+    def _buffer_updated(self, nbytes):
+        buffer = self.TCP_rcv_buffer
+        buffer.buffer_updated(nbytes)
+        # all data from tcp stream will be encapsulated
+        for frame in buffer.frames():
+            self._import_encapsulated_rcv(frame, self._stream_socket)
+
+        if self.internal_buffer:
+            self._ENIP_context_packet_mgmt()
+            waiter = self._session_waiter
+            if self.session_handle != None and waiter != None and not waiter.done():
+                waiter.set_result(self.session_handle)
+            if not self.manage_connection:
+                self.stop()
+
+    def _datagram_received(self, data):
+        self._import_IO_rcv(data, self._datagram_socket)
+
+    def _connection_lost(self, exc):
+        self.stream_transport = None
+        self.endpoints.pop(self._stream_socket, None)
+        self.stop()
+
+    def __del__(self):
+        if self.stream_transport != None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self.stop)
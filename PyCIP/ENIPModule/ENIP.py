@@ -1,16 +1,24 @@
 #from multiprocessing import Queue
 from queue import Queue
+import logging
 import socket
-from threading import Thread
+import struct
+from threading import Thread, Lock
 #from multiprocessing import Process as Thread
 import time
 from PyCIP.Tools.signaling import Signaler
 from .ENIPDataStructures import *
+from .ENIPStream import EncapsulationStreamBuffer, EncapsulationSendQueue, DatagramReceiveBuffer
+from .ENIPPool import FramePool
+from .ENIPSequence import SequenceTracker, sequenced_address, SEQUENCED_ADDRESS
 from PyCIP.Tools import exceptions, networking
 
+logger = logging.getLogger(__name__)
+
 class ENIP_Originator():
 
-    def __init__(self, target_ip=None, target_port=44818):
+    def __init__(self, target_ip=None, target_port=44818, kernel_timestamps=False, pooled=False, udp_rcvbuf=1 << 21,
+                 track_sequence=True):
 
         self.target = target_ip
         self.port   = target_port
@@ -19,16 +27,49 @@ class ENIP_Originator():
 
         self.stream_connection = None
         self.datagram_connection = None
-        self.class2_3_out_queue = Queue(50)
+        # endpoint_metadata per socket, looked up once at connect time
+        self.endpoints = {}
+        # stamp class 0/1 datagrams in the kernel (SO_TIMESTAMPNS) for jitter measurements
+        self.kernel_timestamps = kernel_timestamps
+        # pooled recycles the objects of received frames once TransportPacket.release() is called
+        self.pool = FramePool() if pooled else None
+
+        # class 0/1 receive, every pending datagram is drained per wakeup
+        self.udp_rcvbuf = udp_rcvbuf
+        self.datagram_buffer = DatagramReceiveBuffer()
+        # Connection_Identifier -> callable(TransportPacket), ahead of the messager
+        self.io_handlers = {}
+        self.io_unrouted = 0
+        self.io_malformed = 0
+        self.io_handler_errors = 0
+        # duplicate and late T->O frames are dropped before they are parsed, SequenceTracker per connection
+        self.track_sequence = track_sequence
+        self.io_sequences = {}
+        # shared port 2222 IOReceiver in place of a connected datagram socket, see attach_io_receiver
+        self.io_receiver = None
+        self.io_target = None
+        self.io_connections = set()
+        self.class2_3_out_queue = EncapsulationSendQueue()
         self.class0_1_out_queue = Queue(50)
 
         self.ignoring_sender_context = 1
         self.internal_sender_context = 0
         self.internal_buffer = []
         self.sender_context = self.ignoring_sender_context + 1
-        self.messager = Signaler()
+        self.messager = Signaler(pooled=pooled)
         self.connection_thread = None
 
+        # send_encap fills these in and writes the whole frame into one buffer
+        self._frame_lock = Lock()
+        self._rr_data_frame = (ENIPEncapsulationHeader(ENIPCommandCode.SendRRData, 0, 0, 0, 0, 0),
+                               SendRRData(Interface_handle=0, Timeout=0),
+                               DT.CPF_Items())
+        self._rr_data_frame[2].extend((DT.CPF_NullAddress(), DT.CPF_UnconnectedData()))
+        self._unit_data_frame = (ENIPEncapsulationHeader(ENIPCommandCode.SendUnitData, 0, 0, 0, 0, 0),
+                                 SendUnitData(Interface_handle=0, Timeout=0),
+                                 DT.CPF_Items())
+        self._unit_data_frame[2].extend((DT.CPF_ConnectedAddress(Connection_Identifier=0), DT.CPF_ConnectedData()))
+
         #self.TCP_rcv_buffer = bytearray()
         if target_ip != None:
             self.create_class_2_3(target_ip, target_port)
@@ -61,6 +102,7 @@ class ENIP_Originator():
         s.connect((self.target, target_port))
         s.setblocking(0)
         self.stream_connection = s
+        self._endpoint(s, 'tcp')
         self.start()
 
     def create_class_0_1(self, target_ip, target_port=2222):
@@ -69,48 +111,159 @@ class ENIP_Originator():
         s.settimeout(3)
         s.connect((self.target, target_port))
         s.setblocking(0)
+        self._configure_datagram_socket(s)
         self.datagram_connection = s
+        self._endpoint(s, 'udp')
         self.start()
 
-    def send_encap(self, data, send_id=None, receive_id=None):
-        CPF_Array = DT.CPF_Items()
+    def attach_io_receiver(self, receiver, target_ip, target_port=2222):
+        '''
+            take class 0/1 traffic through a shared IOReceiver rather than a
+            socket connected to the target, which never sees multicast T->O
+            frames. Connections are added with add_io_connection.
+        '''
+        self.io_receiver = receiver
+        self.io_target = (target_ip, target_port)
+        self.start()
 
-        if not isinstance(receive_id, int):
-            receive_id = self.ignoring_sender_context
+    def add_io_connection(self, TO_connection_id, group=None, rpi_us=None):
+        '''
+            receive TO_connection_id through the IOReceiver, group is the
+            multicast address of the forward open reply (ConnectionManager.TO_sockaddr)
+        '''
+        if self.io_receiver == None:
+            raise exceptions.IncorrectState("no IOReceiver attached")
+        if rpi_us != None:
+            self.track_io_sequence(TO_connection_id, rpi_us)
+        self.io_receiver.register(TO_connection_id, self._import_IO_rcv, group)
+        self.io_connections.add(int(TO_connection_id))
+
+    def remove_io_connection(self, TO_connection_id):
+        self.io_connections.discard(int(TO_connection_id))
+        self.io_sequences.pop(int(TO_connection_id), None)
+        if self.io_receiver != None:
+            self.io_receiver.unregister(TO_connection_id)
+
+    def _detach_io_receiver(self):
+        for connection_id in list(self.io_connections):
+            self.remove_io_connection(connection_id)
+        self.io_receiver = None
+
+    def _configure_datagram_socket(self, s):
+        if self.udp_rcvbuf:
+            try:
+                # the kernel caps this at net.core.rmem_max
+                s.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.udp_rcvbuf)
+            except OSError:
+                pass
+        if self.kernel_timestamps:
+            networking.enable_kernel_timestamps(s)
+
+    def register_io_handler(self, connection_id, handler, rpi_us=None):
+        '''
+            hand the T->O packets of connection_id straight to handler(packet) on the receive thread,
+            rpi_us is what the arrival jitter is measured against
+        '''
+        self.io_handlers[int(connection_id)] = handler
+        if rpi_us != None:
+            self.track_io_sequence(connection_id, rpi_us)
+
+    def unregister_io_handler(self, connection_id):
+        self.io_handlers.pop(int(connection_id), None)
+        self.io_sequences.pop(int(connection_id), None)
+
+    def track_io_sequence(self, connection_id, rpi_us=None):
+        '''
+            start sequence tracking of connection_id afresh, otherwise it starts with its first frame
+        '''
+        tracker = self.io_sequences[int(connection_id)] = SequenceTracker(rpi_us * 1000 if rpi_us else None)
+        return tracker
+
+    def io_sequence_stats(self, connection_id):
+        tracker = self.io_sequences.get(int(connection_id))
+        return tracker.stats() if tracker != None else None
+
+    def io_stats(self):
+        '''
+            class 0/1 receive counters, kernel_drops is None where the kernel does not tell.
+            With an IOReceiver attached the socket and buffer counters are those
+            of the receiver, shared with every originator attached to it
+        '''
+        trackers = list(self.io_sequences.values())
+        stats = {'unrouted': self.io_unrouted, 'malformed': self.io_malformed, 'handler_errors': self.io_handler_errors,
+                 'lost': sum(t.lost for t in trackers), 'duplicate': sum(t.duplicate for t in trackers),
+                 'late': sum(t.late for t in trackers)}
+        if self.io_receiver != None:
+            receiver = self.io_receiver.stats()
+            stats.update(received=receiver['received'], truncated=receiver['truncated'], behind=receiver['behind'],
+                         kernel_drops=receiver['kernel_drops'])
+            stats['unrouted'] += receiver['unrouted']
+            stats['malformed'] += receiver['malformed']
+            stats['handler_errors'] += receiver['handler_errors']
+            return stats
+        buffer = self.datagram_buffer
+        s = self.datagram_connection
+        stats.update(received=buffer.received, truncated=buffer.truncated, behind=buffer.behind,
+                     kernel_drops=networking.socket_drops(s) if s != None else None)
+        return stats
 
-        if send_id != None:
-            cmd_code = ENIPCommandCode.SendUnitData
-            command_specific = SendUnitData(Interface_handle=0, Timeout=0)
-            CPF_Array.append(DT.CPF_ConnectedAddress(Connection_Identifier=send_id))
-            CPF_Array.append(DT.CPF_ConnectedData(Length=len(data)))
-            context = receive_id
-        else:
-            cmd_code = ENIPCommandCode.SendRRData
-            command_specific = SendRRData(Interface_handle=0, Timeout=0)
-            CPF_Array.append(DT.CPF_NullAddress())
-            CPF_Array.append(DT.CPF_UnconnectedData(Length=len(data)))
-            context = receive_id
-        command_specific_bytes = command_specific.export_data()
-        CPF_bytes = CPF_Array.export_data()
+    def _new(self, cls, *args):
+        if self.pool == None:
+            return cls(*args)
+        return self.pool.get(cls, *args)
 
+    def _endpoint(self, s, proto):
+        endpoint = self.endpoints.get(s)
+        if endpoint == None:
+            endpoint = self.endpoints[s] = endpoint_metadata(s, proto)
+        return endpoint
 
-        encap_header = ENIPEncapsulationHeader( cmd_code,
-                                                len(command_specific_bytes) + len(CPF_bytes) + len(data),
-                                                self.session_handle,
-                                                0,
-                                                context,
-                                                0,
-                                                )
-        encap_header_bytes = encap_header.export_data()
+    def send_encap(self, data, send_id=None, receive_id=None):
+        if not isinstance(receive_id, int):
+            receive_id = self.ignoring_sender_context
+        context = receive_id
 
-        self._send_encap(encap_header_bytes + command_specific_bytes + CPF_bytes + data)
+        with self._frame_lock:
+            if send_id != None:
+                encap_header, command_specific, CPF_Array = self._unit_data_frame
+                CPF_Array[0].Connection_Identifier(send_id)
+            else:
+                encap_header, command_specific, CPF_Array = self._rr_data_frame
+            CPF_Array[1].Length(len(data))
+            length = command_specific.sizeof() + CPF_Array.sizeof() + len(data)
+            encap_header.Length(length)
+            encap_header.Session_Handle(self.session_handle)
+            encap_header.Sender_Context(context)
+
+            # a new buffer per frame, queued frames are still referenced until flushed
+            frame = bytearray(encap_header.sizeof() + length)
+            offset = encap_header.export_into(frame)
+            offset = command_specific.export_into(frame, offset)
+            offset = CPF_Array.export_into(frame, offset)
+        frame[offset:] = data
+
+        self._send_encap(frame)
 
         if context == self.ignoring_sender_context:
             return None
         return context
 
-    def _send_encap(self, packet):
-        self.class2_3_out_queue.put(packet)
+    def _send_encap(self, *packet_parts):
+        self.class2_3_out_queue.put(*packet_parts)
+
+    def _send_IO(self, packet):
+        # class 0/1 frames are paced by the IOScheduler, they go out right away
+        if self.io_receiver != None:
+            return self.io_receiver.send(packet, self.io_target)
+        s = self.datagram_connection
+        if s == None:
+            return False
+        try:
+            s.send(packet)
+        except (BlockingIOError, InterruptedError):
+            # the next production carries newer data anyway
+            return False
+        return True
 
     def register_session(self, target_ip=None):
         if target_ip != None:
@@ -125,7 +278,7 @@ class ENIP_Originator():
                                                self.internal_sender_context,
                                                0,
                                                )
-        self._send_encap(encap_header.export_data() + command_specific_bytes)
+        self._send_encap(encap_header.export_data(), command_specific_bytes)
 
         time_sleep = 5/1000
         timeout = 5.0
@@ -214,44 +367,35 @@ class ENIP_Originator():
                 s.close()
             except:
                 pass
+        self._detach_io_receiver()
+        self.endpoints.clear()
         return None
 
     def _class2_3_send_rcv(self):
         s = self.stream_connection
         if s != None:
-            buffer = self.TCP_rcv_buffers.get(s, bytearray())
+            buffer = self.TCP_rcv_buffers.get(s)
+            if buffer == None:
+                buffer = self.TCP_rcv_buffers[s] = EncapsulationStreamBuffer()
             # receive
             try:
-                buffer += s.recv(65535)
+                buffer.recv_into(s)
             except BlockingIOError:
                 pass
 
-            if len(buffer):
-                # all data from tcp stream will be encapsulated
-                self._import_encapsulated_rcv(buffer, s)
+            # all data from tcp stream will be encapsulated
+            for frame in buffer.frames():
+                self._import_encapsulated_rcv(frame, s)
 
-            # send
-            while not self.class2_3_out_queue.empty():
-                try:
-                    packet = self.class2_3_out_queue.get()
-                except:
-                    pass
-                else:
-                    s.send(packet)
+            # send everything queued in one gathered write
+            self.class2_3_out_queue.flush(s)
 
     def _class0_1_send_rcv(self):
 
         s = self.datagram_connection
         if s != None:
-                # receive
-                try:
-                    datagram_packet = s.recv(65535)
-                except BlockingIOError:
-                    pass
-
-                if len(datagram_packet):
-                    # all data from tcp stream will be encapsulated
-                    self._import_IO_rcv(datagram_packet, s)
+                # receive everything pending, not one datagram per loop
+                self._drain_datagrams(s)
 
                 # send
                 while not self.class0_1_out_queue.empty():
@@ -262,8 +406,19 @@ class ENIP_Originator():
                     else:
                         s.send(packet)
 
+    def _drain_datagrams(self, s):
+        def handler(datagram, kernel_time):
+            # a failing io handler must not end the thread that also carries the explicit traffic
+            try:
+                self._import_IO_rcv(datagram, s, kernel_time)
+            except Exception:
+                self.io_handler_errors += 1
+                logger.exception("class 0/1 handler failed")
+        return self.datagram_buffer.drain(s, handler, self.kernel_timestamps)
+
     def _ENIP_context_packet_mgmt(self):
-        for packet in  self.internal_buffer:
+        while self.internal_buffer:
+            packet = self.internal_buffer.pop(0)
 
             if packet.encapsulation_header.Command == ENIPCommandCode.RegisterSession and self.session_handle == None:
                 self.session_handle = packet.encapsulation_header.Session_Handle
@@ -272,30 +427,28 @@ class ENIP_Originator():
                 self.manage_connection = False
 
     def _import_encapsulated_rcv(self, packet, socket):
-        transport = trans_metadata(socket, 'tcp')
+        # packet is one complete frame as cut by EncapsulationStreamBuffer, data is left as a view of it
+        transport = self._new(trans_metadata, self._endpoint(socket, 'tcp'), None)
 
-        header    = ENIPEncapsulationHeader()
+        header    = self._new(ENIPEncapsulationHeader)
         offset    = header.import_data(packet)
         packet_length = header.Length + header.sizeof()
-        if offset < 0 or packet_length  > len(packet):
-            return -1
 
         parsed_cmd_spc = None
         CPF_Array = None
 
         if offset < packet_length:
-            parsed_cmd_spc = CommandSpecificParser().import_data(packet, header.Command, response=True, offset=offset)
+            parsed_cmd_spc = CommandSpecificParser().import_data(packet, header.Command, response=True, offset=offset,
+                                                                 pool=self.pool)
             offset += parsed_cmd_spc.sizeof()
         if offset < packet_length:
-            CPF_Array = DT.CPF_Items()
+            CPF_Array = self._new(DT.CPF_Items)
+            CPF_Array.item_pool = self.pool
             offset += CPF_Array.import_data(packet, offset)
 
-        parsed_packet = DT.TransportPacket(  transport,
-                                             header,
-                                             parsed_cmd_spc,
-                                             CPF_Array,
-                                             data=packet[offset:packet_length]
-                                            )
+        parsed_packet = self._new(DT.TransportPacket, transport, header, parsed_cmd_spc, CPF_Array,
+                                  packet[offset:packet_length])
+        parsed_packet.pool = self.pool
 
         if header.Command == ENIPCommandCode.SendUnitData:
             rsp_identifier = CPF_Array[0].Connection_Identifier
@@ -304,7 +457,7 @@ class ENIP_Originator():
 
         parsed_packet.response_id = rsp_identifier
         if header.Command in (ENIPCommandCode.SendUnitData, ENIPCommandCode.SendRRData):
-            self.messager.send_message(rsp_identifier, parsed_packet)
+            self._dispatch(rsp_identifier, parsed_packet)
 
         elif header.Command in (ENIPCommandCode.RegisterSession, ENIPCommandCode.UnRegisterSession,
                                 ENIPCommandCode.NOP, ENIPCommandCode.ListIdentity, ENIPCommandCode.ListServices):
@@ -312,42 +465,98 @@ class ENIP_Originator():
         else:
             print('unsupported ENIP command')
 
-        del packet[:header.Length + header.sizeof()]
+        return packet_length
 
-    def _import_IO_rcv(self, packet, socket):
-        transport = trans_metadata(socket, 'udp')
+    def _import_IO_rcv(self, packet, socket, kernel_time=None):
+        packet = memoryview(packet)
         packet_length = len(packet)
-        if packet_length <= 6:
+        if packet_length < sequenced_address.size:
+            self.io_malformed += 1
             return None
 
-        CPF_Array = DT.CPF_Items()
-        offset = CPF_Array.import_data(packet)
-
-        parsed_packet = DT.TransportPacket(  transport,
-                                             None,
-                                             None,
-                                             CPF_Array,
-                                             data=packet[offset:packet_length]
-                                        )
-
-        if len(CPF_Array) and  CPF_Array[0].Type_ID == CPF_Codes.SequencedAddress:
-            rsp_identifier = CPF_Array[0].Connection_Identifier
-        else:
+        # routing and sequence checks only need the leading sequenced address item
+        _, type_id, _, rsp_identifier, sequence = sequenced_address.unpack_from(packet)
+        if type_id != SEQUENCED_ADDRESS:
+            self.io_malformed += 1
+            return None
+        handler = self.io_handlers.get(rsp_identifier)
+        if handler == None and not self._routed(rsp_identifier):
+            self.io_unrouted += 1
+            return None
+        if self.track_sequence:
+            tracker = self.io_sequences.get(rsp_identifier)
+            if tracker == None:
+                tracker = self.io_sequences[rsp_identifier] = SequenceTracker()
+            if not tracker.accept(sequence, kernel_time if kernel_time != None else time.monotonic_ns()):
+                return None
+
+        transport = self._new(trans_metadata, self._endpoint(socket, 'udp'), kernel_time)
+        CPF_Array = self._new(DT.CPF_Items)
+        CPF_Array.item_pool = self.pool
+        try:
+            offset = CPF_Array.import_data(packet)
+        except (KeyError, IndexError, ValueError, struct.error):
+            # an unknown or cut short item after the sequenced address
+            offset = packet_length + 1
+        if offset > packet_length:
+            self.io_malformed += 1
             return None
 
+        parsed_packet = self._new(DT.TransportPacket, transport, None, None, CPF_Array, packet[offset:packet_length])
+        parsed_packet.pool = self.pool
         parsed_packet.response_id = rsp_identifier
+        if handler != None:
+            handler(parsed_packet)
+        else:
+            self._dispatch(rsp_identifier, parsed_packet)
+
+    def _routed(self, rsp_identifier):
+        return bool(self.messager.signal_subscriber_table.get(rsp_identifier))
+
+    def _dispatch(self, rsp_identifier, parsed_packet):
         self.messager.send_message(rsp_identifier, parsed_packet)
 
     def __del__(self):
         self.unregister_session()
 
-class trans_metadata():
+class endpoint_metadata():
+    '''
+        addresses of a connected socket, shared by every packet received on it
+    '''
+    __slots__ = ('host', 'peer', 'protocall')
 
     def __init__(self, socket, proto):
         self.host = socket.getsockname()
-        self.peer = socket.getpeername()
+        try:
+            self.peer = socket.getpeername()
+        except OSError:
+            # an IOReceiver socket takes datagrams from any target
+            self.peer = None
         self.protocall = proto
-        self.recevied_time = time.time()
+
+class trans_metadata():
+    '''
+        recevied_time is time.monotonic_ns() when the packet was parsed,
+        kernel_time the SO_TIMESTAMPNS stamp in ns since the epoch or None
+    '''
+    __slots__ = ('endpoint', 'recevied_time', 'kernel_time')
+
+    def __init__(self, endpoint, kernel_time=None):
+        self.endpoint = endpoint
+        self.recevied_time = time.monotonic_ns()
+        self.kernel_time = kernel_time
+
+    @property
+    def host(self):
+        return self.endpoint.host
+
+    @property
+    def peer(self):
+        return self.endpoint.peer
+
+    @property
+    def protocall(self):
+        return self.endpoint.protocall
 
 
 
@@ -33,6 +33,7 @@ class CPF_Codes(IntEnum):
 
 
 class CommandSpecific_Rsp(DT.BaseStructureAutoKeys):
+    _fixed_layout = True
     command = None
 
 class NOP_CS(CommandSpecific_Rsp):
@@ -73,15 +74,16 @@ class CommandSpecificParser():
     parsers_rsp = {parser.command:parser for parser in CommandSpecific_Rsp.__subclasses__()}
 
     @classmethod
-    def import_data(cls, data, command, response=False, offset=0):
+    def import_data(cls, data, command, response=False, offset=0, pool=None):
         if response:
-            data_parser = cls.parsers_rsp[command]()
+            data_parser = cls.parsers_rsp[command]() if pool == None else pool.get(cls.parsers_rsp[command])
         else:
             pass
         data_parser.import_data(data, offset)
         return data_parser
 
 class ENIPEncapsulationHeader(DT.BaseStructureAutoKeys):
+    _fixed_layout = True
 
     def __init__(self, Command=None, Length=None, Session_Handle=None, Status=None, Sender_Context=None, Options=0) :
 
@@ -93,6 +95,7 @@ class ENIPEncapsulationHeader(DT.BaseStructureAutoKeys):
         self.Options        = DT.UDINT(Options)
 
 class SocketAddress(DT.BaseStructureAutoKeys):
+    _fixed_layout = True
 
     def __init__(self):
         self.sin_family = DT.INT(endian='big')
@@ -101,6 +104,7 @@ class SocketAddress(DT.BaseStructureAutoKeys):
         self.sin_zero = DT.ARRAY(DT.USINT, 8)
 
 class TargetItems(DT.BaseStructureAutoKeys):
+    _fixed_layout = True
 
     def __init__(self):
         self.Item_ID        = DT.UINT()
@@ -118,6 +122,7 @@ class TargetItems(DT.BaseStructureAutoKeys):
 
 
 class ListIdentityRsp(DT.BaseStructureAutoKeys):
+    _fixed_layout = True
 
     def __init__(self):
         self.Item_Count = DT.UINT()
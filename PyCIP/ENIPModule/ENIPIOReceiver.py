@@ -0,0 +1,179 @@
+import logging
+import select
+import socket
+from threading import Thread, Lock, RLock
+from .ENIPStream import DatagramReceiveBuffer
+from .ENIPSequence import sequenced_address, SEQUENCED_ADDRESS
+from PyCIP.Tools import networking
+
+logger = logging.getLogger(__name__)
+
+
+class IOReceiver():
+    '''
+        One unconnected UDP socket on port 2222 taking the T->O frames of
+        every implicit connection on an interface, unicast or multicast.
+        Frames are routed by the Connection_Identifier of their sequenced
+        address item, nothing else is decoded before the handler is called.
+
+        handlers are called as handler(datagram, socket, kernel_time) on the
+        receive thread, datagram is a view of the receive buffer. Areas of the
+        DatagramReceiveBuffer are never reused, so the view stays valid after
+        the call and may be kept or passed to other threads, it pins its area
+        for as long as it is held. ENIP_Originator.attach_io_receiver
+        registers its _import_IO_rcv, which does just that.
+
+        Linux only delivers multicast to sockets bound to the wildcard address,
+        keep host='0.0.0.0' to consume multicast and choose the interface the
+        groups are joined on with multicast_interface.
+    '''
+    _shared = {}
+    _shared_lock = Lock()
+
+    def __init__(self, host='0.0.0.0', port=2222, multicast_interface=None, udp_rcvbuf=1 << 22,
+                 kernel_timestamps=False, poll_s=0.1):
+        self.host = host
+        self.port = port
+        self.multicast_interface = multicast_interface if multicast_interface != None else host
+        self.kernel_timestamps = kernel_timestamps
+        self.poll_s = poll_s
+
+        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if udp_rcvbuf:
+            try:
+                s.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, udp_rcvbuf)
+            except OSError:
+                pass
+        s.bind((host, port))
+        s.setblocking(0)
+        if kernel_timestamps:
+            self.kernel_timestamps = networking.enable_kernel_timestamps(s)
+        self.socket = s
+
+        # Connection_Identifier -> handler, and the group each was registered with
+        self.handlers = {}
+        self.connection_groups = {}
+        # multicast group -> number of connections consuming it
+        self.groups = {}
+        self.buffer = DatagramReceiveBuffer()
+        self.unrouted = 0
+        self.malformed = 0
+        self.handler_errors = 0
+
+        self.active = False
+        self.thread = None
+        self._lock = RLock()
+
+    @classmethod
+    def shared(cls, host='0.0.0.0', port=2222, **kwargs):
+        '''
+            the receiver of host and port, created and started on first use
+        '''
+        with cls._shared_lock:
+            receiver = cls._shared.get((host, port))
+            if receiver == None:
+                receiver = cls._shared[(host, port)] = cls(host, port, **kwargs)
+                receiver.start()
+        return receiver
+
+    def register(self, connection_id, handler, group=None):
+        '''
+            route connection_id to handler, joining the multicast group (an ip
+            string, e.g. from ConnectionManager.TO_sockaddr) if one is given
+        '''
+        connection_id = int(connection_id)
+        with self._lock:
+            self.unregister(connection_id)
+            if group != None and socket.inet_aton(group)[0] & 0xF0 == 0xE0:
+                if group not in self.groups:
+                    self.socket.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, self._membership(group))
+                    self.groups[group] = 0
+                self.groups[group] += 1
+                self.connection_groups[connection_id] = group
+            self.handlers[connection_id] = handler
+
+    def unregister(self, connection_id):
+        connection_id = int(connection_id)
+        with self._lock:
+            self.handlers.pop(connection_id, None)
+            group = self.connection_groups.pop(connection_id, None)
+            if group != None:
+                self.groups[group] -= 1
+                if not self.groups[group]:
+                    # the last consumer of the group is gone
+                    del self.groups[group]
+                    try:
+                        self.socket.setsockopt(socket.IPPROTO_IP, socket.IP_DROP_MEMBERSHIP, self._membership(group))
+                    except OSError:
+                        pass
+
+    def _membership(self, group):
+        return socket.inet_aton(group) + socket.inet_aton(self.multicast_interface)
+
+    def send(self, packet, address):
+        '''
+            O->T frames go out from port 2222 as well
+        '''
+        try:
+            self.socket.sendto(packet, address)
+        except (BlockingIOError, InterruptedError):
+            return False
+        return True
+
+    def stats(self):
+        buffer = self.buffer
+        return {'connections': len(self.handlers), 'groups': len(self.groups),
+                'received': buffer.received, 'truncated': buffer.truncated, 'behind': buffer.behind,
+                'unrouted': self.unrouted, 'malformed': self.malformed, 'handler_errors': self.handler_errors,
+                'kernel_drops': networking.socket_drops(self.socket)}
+
+    def start(self):
+        self.active = True
+        if self.thread == None or not self.thread.is_alive():
+            self.thread = Thread(target=self._run, name="io_receiver", daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        self.active = False
+
+    def close(self):
+        self.stop()
+        if self.thread != None:
+            self.thread.join()
+        with self._shared_lock:
+            if self._shared.get((self.host, self.port)) is self:
+                del self._shared[(self.host, self.port)]
+        for connection_id in list(self.handlers):
+            self.unregister(connection_id)
+        self.socket.close()
+
+    def _run(self):
+        s = self.socket
+        while self.active:
+            readable, _, _ = select.select((s,), (), (), self.poll_s)
+            if readable:
+                try:
+                    self.buffer.drain(s, self._route, self.kernel_timestamps)
+                except OSError:
+                    # e.g. an ICMP error reported on the socket, the next datagram is still good
+                    pass
+
+    def _route(self, datagram, kernel_time):
+        if len(datagram) < sequenced_address.size:
+            self.malformed += 1
+            return
+        _, type_id, _, connection_id, _ = sequenced_address.unpack_from(datagram)
+        if type_id != SEQUENCED_ADDRESS:
+            self.malformed += 1
+            return
+        handler = self.handlers.get(connection_id)
+        if handler == None:
+            self.unrouted += 1
+            return
+        try:
+            handler(datagram, self.socket, kernel_time)
+        except Exception:
+            # one connection's handler must not stop the receiver for all the others
+            self.handler_errors += 1
+            logger.exception("io handler of connection %08X failed", connection_id)
@@ -0,0 +1,28 @@
+from PyCIP.Tools.pooling import FreeList
+
+
+class FramePool(FreeList):
+    '''
+        Free lists for what an originator parses out of every received frame:
+        the encapsulation header, the command specific reply, the CPF items,
+        the receive metadata and the TransportPacket itself. They come back
+        when the consumer calls TransportPacket.release(), packets never
+        released are simply left to the garbage collector.
+    '''
+
+    def release(self, packet):
+        if packet.pool is not self:
+            return
+        packet.pool = None
+        for part in (packet.encapsulation_header, packet.command_specific, packet.transport_meta_data):
+            if part != None:
+                self.put(part)
+        CPF = packet.CPF
+        if CPF != None:
+            for item in CPF:
+                self.put(item)
+            CPF.clear()
+            self.put(CPF)
+        # drop the payload view so the receive buffer is not kept alive
+        packet.__init__()
+        self.put(packet)
@@ -0,0 +1,314 @@
+import selectors
+import socket
+import heapq
+import itertools
+import logging
+import time
+from collections import deque
+from threading import Thread, Lock, get_ident
+from PyCIP.ENIPModule.ENIP import ENIP_Originator
+from .ENIPDataStructures import *
+from .ENIPStream import EncapsulationStreamBuffer, EncapsulationSendQueue
+from PyCIP.Tools import exceptions
+
+logger = logging.getLogger(__name__)
+
+class ENIPReactor():
+    '''
+        One thread multiplexing the stream and datagram sockets of many ENIP
+        sessions with a selector. Frames are routed to their session by socket
+        and checked against the session handle, so the thread count does not
+        grow with the number of targets.
+
+        Anything touching the selector runs on the reactor thread, other threads
+        hand work over with call_soon. A Basic_CIP on a ReactorSession handles
+        its replies on the reactor thread as well, CIP_Managers add no threads.
+    '''
+
+    def __init__(self, keep_alive_rate_s=60):
+        self.keep_alive_rate_s = keep_alive_rate_s
+        self.selector = selectors.DefaultSelector()
+        self.sessions = {}
+        self.sender_context = 1
+        self.active = False
+        self.thread = None
+        self.cpu_time = 0.0
+
+        self._context_lock = Lock()
+        self._calls = deque()
+        # heap of (due, order, interval_s, callback) of call_every
+        self._timers = []
+        self._timer_order = itertools.count()
+        self._send_ready = deque()
+        self._woken = False
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(0)
+        self._wake_w.setblocking(0)
+        self.selector.register(self._wake_r, selectors.EVENT_READ, None)
+
+    def start(self):
+        self.active = True
+        if self.thread == None or not self.thread.is_alive():
+            self.thread = Thread(target=self._run, name="enip_reactor", daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        self.active = False
+        self._wake()
+
+    def session(self, target_ip, target_port=44818, **kwargs):
+        return ReactorSession(self, target_ip, target_port, **kwargs)
+
+    def get_next_sender_context(self):
+        # contexts are shared by all sessions so responses never collide in the signaler tables
+        with self._context_lock:
+            if self.sender_context >= 0xFFFFFFFF:
+                self.sender_context = 1
+            self.sender_context += 1
+            return self.sender_context
+
+    def call_soon(self, callback, *args):
+        self._calls.append((callback, args))
+        self._wake()
+
+    def call_every(self, interval_s, callback):
+        '''
+            run callback on the reactor thread about every interval_s until it returns False
+        '''
+        self.call_soon(self._add_timer, time.monotonic() + interval_s, interval_s, callback)
+
+    def _add_timer(self, due, interval_s, callback):
+        heapq.heappush(self._timers, (due, next(self._timer_order), interval_s, callback))
+
+    def send_ready(self, session):
+        self._send_ready.append(session)
+        self._wake()
+
+    def _wake(self):
+        if not self._woken and self.thread != None and self.thread.ident != get_ident():
+            self._woken = True
+            try:
+                self._wake_w.send(b'\0')
+            except OSError:
+                pass
+
+    def _add_socket(self, s, session):
+        self.sessions[s] = session
+        self.selector.register(s, selectors.EVENT_READ, session)
+
+    def _remove_socket(self, s):
+        self.sessions.pop(s, None)
+        try:
+            self.selector.unregister(s)
+        except (KeyError, ValueError):
+            pass
+        try:
+            s.close()
+        except:
+            pass
+
+    def _close_session(self, session):
+        self._flush(session)
+        session.manage_connection = False
+        session.session_handle = None
+        for s in (session.stream_connection, session.datagram_connection):
+            if s != None:
+                self._remove_socket(s)
+        session.endpoints.clear()
+
+    def _run(self):
+        next_keep_alive = time.time() + self.keep_alive_rate_s * 0.5
+        while self.active:
+            while self._calls:
+                callback, args = self._calls.popleft()
+                try:
+                    callback(*args)
+                except Exception:
+                    logger.exception("reactor call failed")
+
+            if self._timers:
+                self._run_timers()
+
+            # keep alive the connections from timing out
+            if time.time() > next_keep_alive:
+                next_keep_alive = time.time() + self.keep_alive_rate_s * 0.9
+                for session in set(self.sessions.values()):
+                    if session.session_handle != None:
+                        session.NOP()
+
+            while self._send_ready:
+                self._flush(self._send_ready.popleft())
+
+            self.cpu_time = time.thread_time()
+            timeout = max(0.0, next_keep_alive - time.time())
+            if self._timers:
+                timeout = min(timeout, max(0.0, self._timers[0][0] - time.monotonic()))
+            for key, events in self.selector.select(timeout):
+                session = key.data
+                if session == None:
+                    self._drain_wake()
+                    continue
+                try:
+                    self._service(session, key.fileobj, events)
+                except Exception:
+                    # a bad frame or a failing callback only costs its own session
+                    logger.exception("closing session to %s", session.target)
+                    self._close_session(session)
+
+        for s in list(self.sessions):
+            self._remove_socket(s)
+
+    def _run_timers(self):
+        timers = self._timers
+        now = time.monotonic()
+        while timers and timers[0][0] <= now:
+            _, _, interval_s, callback = heapq.heappop(timers)
+            try:
+                keep = callback() is not False
+            except Exception:
+                logger.exception("periodic reactor call failed")
+                keep = False
+            if keep:
+                self._add_timer(now + interval_s, interval_s, callback)
+
+    def _service(self, session, s, events):
+        if events & selectors.EVENT_WRITE:
+            self._flush(session)
+        if events & selectors.EVENT_READ:
+            if s is session.stream_connection:
+                self._read_stream(session, s)
+            else:
+                self._read_datagram(session, s)
+
+    def _drain_wake(self):
+        try:
+            while self._wake_r.recv(4096):
+                pass
+        except BlockingIOError:
+            pass
+        # cleared only after draining so a wake byte sent meanwhile is never lost
+        self._woken = False
+
+    def _read_stream(self, session, s):
+        buffer = session.TCP_rcv_buffer
+        try:
+            received = buffer.recv_into(s)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            received = 0
+        if not received:
+            self._close_session(session)
+            return
+
+        for frame in buffer.frames():
+            # drop frames that belong to a different session handle
+            handle = int.from_bytes(frame[4:8], 'little')
+            if session.session_handle != None and handle != session.session_handle:
+                continue
+            session._import_encapsulated_rcv(frame, s)
+
+        if session.internal_buffer:
+            session._ENIP_context_packet_mgmt()
+            if not session.manage_connection:
+                self._close_session(session)
+
+    def _read_datagram(self, session, s):
+        try:
+            session._drain_datagrams(s)
+        except OSError:
+            pass
+
+    def _flush(self, session):
+        s = session.stream_connection
+        queue = session.class2_3_out_queue
+        if s == None or s not in self.sessions:
+            queue.clear()
+            return
+        try:
+            flushed = queue.flush(s)
+        except OSError:
+            queue.clear()
+            self._close_session(session)
+            return
+        events = selectors.EVENT_READ if flushed else selectors.EVENT_READ | selectors.EVENT_WRITE
+        # only wait on EVENT_WRITE while a partial write is outstanding
+        if self.selector.get_key(s).events != events:
+            self.selector.modify(s, events, session)
+
+
+class ReactorSession(ENIP_Originator):
+    '''
+        ENIP_Originator whose sockets are serviced by a shared ENIPReactor
+        rather than by its own Enip_layer thread.
+    '''
+
+    def __init__(self, reactor, target_ip=None, target_port=44818, kernel_timestamps=False, pooled=False,
+                 udp_rcvbuf=1 << 21, track_sequence=True):
+        self.reactor = reactor
+        super().__init__(None, target_port, kernel_timestamps, pooled, udp_rcvbuf, track_sequence)
+        self.class2_3_out_queue = EncapsulationSendQueue()
+        self.TCP_rcv_buffer = EncapsulationStreamBuffer()
+        self.manage_connection = False
+        # optional callable receiving TransportPackets directly on the reactor thread
+        self.packet_handler = None
+        if target_ip != None:
+            self.create_class_2_3(target_ip, target_port)
+
+    def get_next_sender_context(self):
+        return self.reactor.get_next_sender_context()
+
+    def start(self):
+        self.manage_connection = True
+        self.reactor.start()
+
+    def stop(self):
+        self.manage_connection = False
+        self._detach_io_receiver()
+        self.reactor.call_soon(self.reactor._close_session, self)
+
+    def unregister_session(self):
+        # the reactor flushes queued packets before closing, no need to wait here
+        if not self.manage_connection:
+            return
+        encap_header = ENIPEncapsulationHeader(ENIPCommandCode.UnRegisterSession, 0, 0, 0, 0, 0)
+        self._send_encap(encap_header.export_data())
+        self.stop()
+
+    def create_class_2_3(self, target_ip, target_port=44818):
+        if self.target != None:
+            raise exceptions.IncorrectState("IP address already set, use another layer object for different targets")
+        self.target = target_ip
+        s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        s.settimeout(3)
+        s.connect((self.target, target_port))
+        s.setblocking(0)
+        s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.stream_connection = s
+        self._endpoint(s, 'tcp')
+        self.start()
+        self.reactor.call_soon(self.reactor._add_socket, s, self)
+
+    def create_class_0_1(self, target_ip, target_port=2222):
+        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        s.settimeout(3)
+        s.connect((target_ip, target_port))
+        s.setblocking(0)
+        self._configure_datagram_socket(s)
+        self.datagram_connection = s
+        self._endpoint(s, 'udp')
+        self.start()
+        self.reactor.call_soon(self.reactor._add_socket, s, self)
+
+    def _send_encap(self, *packet_parts):
+        self.class2_3_out_queue.put(*packet_parts)
+        self.reactor.send_ready(self)
+
+    def _routed(self, rsp_identifier):
+        return self.packet_handler != None or super()._routed(rsp_identifier)
+
+    def _dispatch(self, rsp_identifier, parsed_packet):
+        if self.packet_handler != None:
+            self.packet_handler(parsed_packet)
+        else:
+            super()._dispatch(rsp_identifier, parsed_packet)
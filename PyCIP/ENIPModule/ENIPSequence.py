@@ -0,0 +1,78 @@
+import struct
+from PyCIP.DataTypesModule.CPF import CPF_Codes
+
+# Item_count, then type, length, Connection_Identifier and Encapsulation_Sequence_Number
+# of the sequenced address item leading every class 0/1 frame
+sequenced_address = struct.Struct('<HHHII')
+SEQUENCED_ADDRESS = int(CPF_Codes.SequencedAddress)
+
+
+class SequenceTracker():
+    '''
+        Encapsulation_Sequence_Number of one T->O connection. accept says
+        whether a frame is newer than the last one taken, duplicates and
+        frames older than that (late) are to be dropped unparsed.
+
+        lost counts the numbers skipped over, a late frame of such a gap is
+        counted as late as well. A step back of more than window is taken as
+        the target restarting its numbering rather than a late frame.
+
+        jitter_ns is the RFC 3550 running estimate of the deviation of the
+        arrival interval from the RPI, or from the mean interval when the
+        RPI is not known. Times are whatever the caller passes, kernel or
+        monotonic ns.
+    '''
+    __slots__ = ('sequence', 'received', 'lost', 'duplicate', 'late', 'restarts',
+                 'rpi_ns', 'window', 'last_time', 'interval_ns', 'jitter_ns', 'max_interval_ns')
+
+    def __init__(self, rpi_ns=None, window=1024):
+        self.rpi_ns = rpi_ns
+        self.window = window
+        self.reset()
+
+    def reset(self):
+        self.sequence = None
+        self.received = self.lost = self.duplicate = self.late = self.restarts = 0
+        self.last_time = None
+        self.interval_ns = self.jitter_ns = self.max_interval_ns = 0
+
+    def accept(self, sequence, now):
+        last = self.sequence
+        if last == None:
+            self.sequence = sequence
+            self.last_time = now
+            self.received = 1
+            return True
+
+        gap = (sequence - last) & 0xFFFFFFFF
+        if gap == 0:
+            self.duplicate += 1
+            return False
+        if gap & 0x80000000:
+            if 0x100000000 - gap <= self.window:
+                self.late += 1
+                return False
+            self.restarts += 1
+            gap = 1
+        else:
+            self.lost += gap - 1
+
+        self.sequence = sequence
+        self.received += 1
+        # the interval of one production when frames were lost in between
+        interval = (now - self.last_time) // gap
+        self.last_time = now
+        if interval > self.max_interval_ns:
+            self.max_interval_ns = interval
+        if self.interval_ns:
+            self.interval_ns += (interval - self.interval_ns) >> 4
+        else:
+            self.interval_ns = interval
+        expected = self.rpi_ns if self.rpi_ns else self.interval_ns
+        self.jitter_ns += (abs(interval - expected) - self.jitter_ns) >> 4
+        return True
+
+    def stats(self):
+        return {'received': self.received, 'lost': self.lost, 'duplicate': self.duplicate, 'late': self.late,
+                'restarts': self.restarts, 'interval_us': self.interval_ns / 1000,
+                'jitter_us': self.jitter_ns / 1000, 'max_interval_us': self.max_interval_ns / 1000}
@@ -0,0 +1,218 @@
+import os
+import socket
+from collections import deque
+from itertools import islice
+from PyCIP.Tools import networking
+
+_has_sendmsg = hasattr(socket.socket, 'sendmsg')
+# makes recv_into report the full size of a datagram that did not fit (Linux)
+_MSG_TRUNC = getattr(socket, 'MSG_TRUNC', 0)
+
+
+class EncapsulationStreamBuffer():
+    '''
+        Reassembly buffer for the encapsulated TCP stream.
+
+        Data is received straight into a preallocated bytearray with recv_into,
+        frame boundaries are found from the Length field of the 24 byte
+        encapsulation header and every complete frame is handed out as a
+        memoryview in one pass. Only a trailing partial frame is ever moved.
+
+        Frames up to copy_limit bytes, nearly every reply, are copied out into
+        their own bytes so packets held on to never pin the buffer and it is
+        reused for the next receive. Larger frames are handed out as views of
+        the buffer, which then belongs to them, the next receive goes into a
+        fresh buffer.
+    '''
+    header_size = 24
+    max_frame_size = 24 + 0xFFFF
+    copy_limit = 4096
+
+    def __init__(self, size=2 * (24 + 0xFFFF)):
+        self.size = max(size, 2 * self.max_frame_size)
+        self._buffer = bytearray(self.size)
+        self._view = memoryview(self._buffer)
+        self._start = 0
+        self._end = 0
+        self._handed_out = False
+
+    def __len__(self):
+        return self._end - self._start
+
+    def recv_into(self, s):
+        '''
+            receive from socket s, returns number of bytes received (0 when closed)
+        '''
+        self._make_room()
+        nbytes = s.recv_into(self._view[self._end:])
+        self._end += nbytes
+        return nbytes
+
+    def get_buffer(self, sizehint=-1):
+        # asyncio.BufferedProtocol interface
+        self._make_room()
+        return self._view[self._end:]
+
+    def buffer_updated(self, nbytes):
+        self._end += nbytes
+
+    def frames(self):
+        '''
+            returns a list of every complete frame currently buffered
+        '''
+        frames = []
+        view = self._view
+        start = self._start
+        end = self._end
+        copy_limit = self.copy_limit
+        while end - start >= 24:
+            frame_end = start + 24 + (view[start + 2] | view[start + 3] << 8)
+            if frame_end > end:
+                break
+            if frame_end - start <= copy_limit:
+                frames.append(memoryview(bytes(view[start:frame_end])))
+            else:
+                frames.append(view[start:frame_end])
+                self._handed_out = True
+            start = frame_end
+        self._start = start
+        return frames
+
+    def _make_room(self):
+        if self._handed_out:
+            # a large frame may still be referenced, leave the old buffer to it
+            pending = self._end - self._start
+            buffer = bytearray(self.size)
+            buffer[:pending] = self._view[self._start:self._end]
+            self._buffer = buffer
+            self._view = memoryview(buffer)
+            self._start = 0
+            self._end = pending
+            self._handed_out = False
+        elif self._start == self._end:
+            self._start = self._end = 0
+        elif self.size - self._end < self.max_frame_size:
+            # move the partial frame to the front, at most one frame is ever copied
+            pending = self._end - self._start
+            self._buffer[:pending] = self._view[self._start:self._end]
+            self._start = 0
+            self._end = pending
+
+
+class DatagramReceiveBuffer():
+    '''
+        Receive area for class 0/1 datagrams. drain reads every datagram
+        pending on the socket with recv_into, one after the other into a
+        preallocated bytearray, and hands each to the handler as a memoryview.
+        As with the stream buffer the area then belongs to the packets, a new
+        one is started once there is no room left for another datagram. An
+        area is never written again, a view handed out stays valid and keeps
+        its area alive until it is released.
+
+        A drain stops after max_batch datagrams so a flooded socket can not
+        starve everything else, behind counts the drains cut short.
+    '''
+
+    def __init__(self, size=1 << 20, max_datagram=0xFFFF, max_batch=1024):
+        self.max_datagram = max_datagram
+        self.size = max(size, 2 * max_datagram)
+        self.max_batch = max_batch
+        self.received = 0
+        self.truncated = 0
+        self.behind = 0
+        self._new_area()
+
+    def _new_area(self):
+        self._view = memoryview(bytearray(self.size))
+        self._end = 0
+
+    def drain(self, s, handler, timestamps=False):
+        '''
+            calls handler(datagram, kernel_time) for every pending datagram,
+            returns how many were received. OSError other than would block is left to the caller
+        '''
+        max_datagram = self.max_datagram
+        kernel_time = None
+        count = 0
+        while count < self.max_batch:
+            if self.size - self._end < max_datagram:
+                self._new_area()
+            start = self._end
+            area = self._view[start:start + max_datagram]
+            try:
+                if timestamps:
+                    nbytes, kernel_time, flags = networking.recv_into_timestamped(s, area)
+                    if flags & _MSG_TRUNC:
+                        nbytes = max_datagram + 1
+                else:
+                    nbytes = s.recv_into(area, max_datagram, _MSG_TRUNC)
+            except (BlockingIOError, InterruptedError):
+                break
+            count += 1
+            if nbytes > max_datagram:
+                self.truncated += 1
+                continue
+            self._end = start + nbytes
+            handler(self._view[start:self._end], kernel_time)
+        else:
+            self.behind += 1
+        self.received += count
+        return count
+
+
+class EncapsulationSendQueue():
+    '''
+        Outgoing queue keeping every frame as its separate parts (header,
+        command specific, CPF, data). flush writes as much of the queue as
+        the socket accepts with one sendmsg (writev) call and remembers how
+        far a partial write got.
+
+        put may be called from any thread, flush only from the socket owner.
+    '''
+    try:
+        max_iov = os.sysconf('SC_IOV_MAX')
+    except (AttributeError, ValueError, OSError):
+        max_iov = 1024
+
+    def __init__(self):
+        self._parts = deque()
+
+    def __len__(self):
+        return len(self._parts)
+
+    def empty(self):
+        return not self._parts
+
+    def clear(self):
+        self._parts.clear()
+
+    def put(self, *frame_parts):
+        # extend with a tuple is atomic, parts of concurrent frames never interleave
+        self._parts.extend(tuple([part for part in frame_parts if len(part)]))
+
+    def flush(self, s):
+        '''
+            send queued parts, returns True once the queue is empty and False
+            if the socket would block. OSError is left to the caller.
+        '''
+        parts = self._parts
+        while parts:
+            iov = list(islice(parts, 0, self.max_iov))
+            try:
+                if _has_sendmsg:
+                    sent = s.sendmsg(iov)
+                else:
+                    sent = s.send(b''.join(iov))
+            except (BlockingIOError, InterruptedError):
+                return False
+
+            for part in iov:
+                size = len(part)
+                if sent >= size:
+                    sent -= size
+                    parts.popleft()
+                    continue
+                # partial write, keep the unsent tail of this part at the front
+                parts[0] = memoryview(part)[sent:]
+                return False
+        return True
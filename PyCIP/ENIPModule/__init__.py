@@ -1,2 +1,5 @@
 from PyCIP.ENIPModule.ENIP import ENIP_Originator, parse_list_identity
+from PyCIP.ENIPModule.AsyncENIP import AsyncENIPOriginator
+from PyCIP.ENIPModule.ENIPReactor import ENIPReactor, ReactorSession
+from PyCIP.ENIPModule.ENIPIOReceiver import IOReceiver
 import PyCIP.ENIPModule.ENIPDataStructures
\ No newline at end of file
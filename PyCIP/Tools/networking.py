@@ -1,7 +1,72 @@
+import os
 import socket
+import struct
+import sys
+
+# not exported by the socket module, SCM_TIMESTAMPNS shares the value
+SO_TIMESTAMPNS = getattr(socket, 'SO_TIMESTAMPNS', 35 if sys.platform.startswith('linux') else None)
+_timespec = struct.Struct('@ll')
+_timestamp_space = socket.CMSG_SPACE(_timespec.size) if hasattr(socket, 'CMSG_SPACE') else 0
 
 def list_networks(ipv4_only=False):
     ifc = socket.getaddrinfo(socket.gethostname(), None)
     if ipv4_only:
         return [i[4][0] for i in ifc]
-    return [i[4][0] for i in ifc if i[0] == socket.AF_INET]
\ No newline at end of file
+    return [i[4][0] for i in ifc if i[0] == socket.AF_INET]
+
+def enable_kernel_timestamps(s):
+    '''
+        have the kernel stamp every datagram received on s (SO_TIMESTAMPNS),
+        returns False where that is not supported
+    '''
+    if SO_TIMESTAMPNS == None or not _timestamp_space:
+        return False
+    try:
+        s.setsockopt(socket.SOL_SOCKET, SO_TIMESTAMPNS, 1)
+    except OSError:
+        return False
+    return True
+
+def recv_timestamped(s, bufsize=65535):
+    '''
+        one datagram and the kernel receive time in ns since the epoch,
+        the time is None when the datagram was not stamped
+    '''
+    data, ancdata, _, _ = s.recvmsg(bufsize, _timestamp_space)
+    for level, kind, cdata in ancdata:
+        if level == socket.SOL_SOCKET and kind == SO_TIMESTAMPNS:
+            seconds, nanoseconds = _timespec.unpack_from(cdata)
+            return data, seconds * 1000000000 + nanoseconds
+    return data, None
+
+def recv_into_timestamped(s, buffer, nbytes=0):
+    '''
+        recv_into that also returns the kernel receive time (or None) and the
+        message flags, MSG_TRUNC is set when the datagram did not fit
+    '''
+    if nbytes:
+        buffer = buffer[:nbytes]
+    received, ancdata, flags, _ = s.recvmsg_into([buffer], _timestamp_space)
+    for level, kind, cdata in ancdata:
+        if level == socket.SOL_SOCKET and kind == SO_TIMESTAMPNS:
+            seconds, nanoseconds = _timespec.unpack_from(cdata)
+            return received, seconds * 1000000000 + nanoseconds, flags
+    return received, None, flags
+
+def socket_drops(s):
+    '''
+        datagrams the kernel dropped for s because its receive buffer was full,
+        read from /proc/net/udp on Linux, None where that is not available
+    '''
+    try:
+        inode = str(os.fstat(s.fileno()).st_ino)
+        for table in ('/proc/net/udp', '/proc/net/udp6'):
+            with open(table) as f:
+                next(f)
+                for line in f:
+                    fields = line.split()
+                    if fields[9] == inode:
+                        return int(fields[-1])
+    except (OSError, ValueError, IndexError, StopIteration):
+        pass
+    return None
@@ -0,0 +1,43 @@
+from collections import deque
+
+
+class FreeList():
+    '''
+        Bounded free lists of released objects, one per class. get hands back a
+        released object of the class, or a new one when there is none, put keeps
+        up to size objects per class and leaves the rest to the garbage collector.
+
+        Released objects are only re-initialised when get is given args, parsed
+        structures keep their fields and are overwritten by import_data.
+        deque append and pop are atomic, get and put may run on different threads.
+    '''
+
+    def __init__(self, size=64):
+        self.size = size
+        self.created = 0
+        self.reused = 0
+        self._lists = {}
+
+    def get(self, cls, *args):
+        try:
+            obj = self._lists[cls].pop()
+        except (KeyError, IndexError):
+            self.created += 1
+            return cls(*args)
+        self.reused += 1
+        if args:
+            obj.__init__(*args)
+        return obj
+
+    def put(self, obj):
+        free = self._lists.get(type(obj))
+        if free == None:
+            free = self._lists.setdefault(type(obj), deque(maxlen=self.size))
+        free.append(obj)
+
+    def clear(self):
+        self._lists.clear()
+
+    def stats(self):
+        return {'created': self.created, 'reused': self.reused,
+                'free': sum(len(free) for free in self._lists.values())}
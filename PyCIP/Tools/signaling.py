@@ -1,14 +1,21 @@
 #from multiprocessing import Queue
 from queue import Queue, Empty
+from PyCIP.Tools.pooling import FreeList
+
+# MessageStructs handed back with release, reused by the next send_message of a pooled signaler
+_free_messages = FreeList(256)
 
 class Signaler():
     signal_subscriber_table = {}
     instance_id = 1
 
-    def __init__(self):
+    def __init__(self, handler=None, pooled=False):
         self.id = self.instance_id
         self.instance_id += 1
-        self.message_queue = Queue()
+        # pooled recycles the MessageStructs of single reader messages once released
+        self.pooled = pooled
+        # with a handler messages are passed to it on the sending thread rather than queued
+        self.message_queue = Queue() if handler == None else _Delivery(handler)
 
     def register(self, signal_id):
         if signal_id not in self.signal_subscriber_table:
@@ -24,23 +31,41 @@ class Signaler():
             del self.signal_subscriber_table[signal_id][index]
 
     def send_message(self, signal_id, message):
-        message_s = MessageStruct(signal_id, self.id, message)
-        for sub in self.signal_subscriber_table[signal_id]:
+        subscribers = self.signal_subscriber_table[signal_id]
+        if self.pooled and len(subscribers) == 1:
+            message_s = _free_messages.get(MessageStruct, signal_id, self.id, message, True)
+        else:
+            message_s = MessageStruct(signal_id, self.id, message)
+        for sub in subscribers:
             sub.put(message_s)
 
+    def release(self, message_s):
+        release_message(message_s)
+
     def get_message(self,time_out=None):
         try:
             return self.message_queue.get(True, time_out)
         except Empty:
             return None
 
+class _Delivery():
+    '''
+        stands in for the subscriber Queue of a Signaler with a handler
+    '''
+    __slots__ = ('put',)
+
+    def __init__(self, handler):
+        self.put = handler
+
+
 class SignalerM2M():
     signal_message_table = {}
     instance_id = 1
 
-    def __init__(self):
+    def __init__(self, pooled=False):
         self.id = self.instance_id
         self.instance_id += 1
+        self.pooled = pooled
 
     def register(self, signal_id):
         if signal_id not in self.signal_message_table:
@@ -51,9 +76,15 @@ class SignalerM2M():
 
     def send_message(self, signal_id, message):
         signal_id = int(signal_id)
-        message_s = MessageStruct(signal_id, self.id, message)
+        if self.pooled:
+            message_s = _free_messages.get(MessageStruct, signal_id, self.id, message, True)
+        else:
+            message_s = MessageStruct(signal_id, self.id, message)
         self.signal_message_table[signal_id].put(message_s)
 
+    def release(self, message_s):
+        release_message(message_s)
+
     def get_message(self, signal_id, time_out=None):
         try:
             return self.signal_message_table[signal_id].get(True, time_out)
@@ -62,10 +93,25 @@ class SignalerM2M():
 
 
 class MessageStruct():
-    def __init__(self, signal_id, sender_id, message):
+    __slots__ = ('signal_id', 'sender_id', 'message', 'recyclable')
+
+    def __init__(self, signal_id, sender_id, message, recyclable=False):
         self.signal_id = signal_id
         self.sender_id = sender_id
         self.message   = message
+        # only set when the message went to a single reader
+        self.recyclable = recyclable
+
+
+def release_message(message_s):
+    '''
+        hand a MessageStruct back once its message has been taken out,
+        messages delivered to several subscribers are left alone
+    '''
+    if message_s != None and message_s.recyclable:
+        message_s.recyclable = False
+        message_s.message = None
+        _free_messages.put(message_s)
 
 
 
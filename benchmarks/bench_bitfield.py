@@ -0,0 +1,72 @@
+'''
+    Import and export of a bit packed status word (the Identity object status
+    layout) with the per class shifts and masks of BaseBitFieldStruct against
+    the field by field loop it replaced.
+
+    run from the repository root:
+        python -m benchmarks.bench_bitfield
+'''
+import math
+import timeit
+from PyCIP.DataTypesModule.SpecialDataTypes import BaseBitFieldStruct, BaseBitField
+
+NUMBER = 100000
+
+
+class StatusWord(BaseBitFieldStruct):
+    _fixed_layout = True
+    # most significant bits first, the last field starts at bit 0
+    def __init__(self):
+        self.Extended_Device_Status_2 = BaseBitField(4)
+        self.Major_Unrecoverable_Fault = BaseBitField(1)
+        self.Major_Recoverable_Fault = BaseBitField(1)
+        self.Minor_Unrecoverable_Fault = BaseBitField(1)
+        self.Minor_Recoverable_Fault = BaseBitField(1)
+        self.Extended_Device_Status = BaseBitField(4)
+        self.Reserved_2 = BaseBitField(1)
+        self.Configured = BaseBitField(1)
+        self.Reserved_1 = BaseBitField(1)
+        self.Owned = BaseBitField(1)
+
+
+class LoopStatusWord(StatusWord):
+
+    def import_data(self, bytes, offset=0):
+        length = len(bytes)
+        start_offset = offset
+        bit_offset = 0
+        for parser in reversed(self):
+            bit_offset += parser.import_data(bytes, offset, bit_offset)
+            offset += bit_offset // 8
+            bit_offset = bit_offset % 8
+            if length <= offset:
+                break
+        return offset + math.ceil(bit_offset/8.0) - start_offset
+
+    def export_data(self):
+        output = int()
+        for parser in reversed(self):
+            val = parser.export_data()
+            output <<= parser.bit_sizeof()
+            output |= val
+        return output.to_bytes(self.sizeof(), 'little')
+
+    def sizeof(self):
+        size = 0
+        for item in self:
+            size += item.bit_sizeof()
+        return size // 8 + (1 if size % 8 else 0)
+
+
+if __name__ == '__main__':
+    # fields that fit within their byte, the old loop misreads fields crossing a byte boundary
+    word = bytes([0x35, 0x0A])
+    loop, compiled = LoopStatusWord(), StatusWord()
+    assert loop.import_data(word) == compiled.import_data(word) == 2
+    assert [field() for field in loop] == [field() for field in compiled]
+    assert bytes(compiled.export_data()) == word
+
+    for name, status in (('field loop', loop), ('compiled masks', compiled)):
+        parse = timeit.timeit(lambda: status.import_data(word), number=NUMBER) / NUMBER
+        build = timeit.timeit(status.export_data, number=NUMBER) / NUMBER
+        print("%-15s import %5.2f us  export %5.2f us" % (name, parse * 1e6, build * 1e6))
@@ -0,0 +1,103 @@
+'''
+    Import and export cost of the DLR_Object master struct (DLR v3 gateway
+    layout, 77 bytes) with the compiled CIPStructurePlan against the field
+    by field interpreter it replaced.
+
+    run from the repository root:
+        python -m benchmarks.bench_dlr_struct
+'''
+import timeit
+from PyCIP.CIPModule.DLR_class import DLR_Object
+from PyCIP.DataTypesModule.DataParsers import CIPDataStructure, CIPDataTypes
+
+NUMBER = 20000
+
+
+class InterpretedStructure(CIPDataStructure):
+    '''
+        the definition walked on every call, as before plans were compiled
+    '''
+
+    def import_data(self, bytes, offset=0):
+        start_offset = offset
+        for key, val in self.structure.items():
+            try:
+                if isinstance(val, str):
+                    val = CIPDataTypes[val]
+                if val.__class__ == type:
+                    val = val()
+                self.data[key] = val.import_data(bytes, offset)
+                offset += val.byte_size
+            except (AttributeError, KeyError):
+                sub_struct = val
+                if isinstance(val[0], str):
+                    size = self.data[val[0]]
+                    sub_struct = [(i, val[1]) for i in range(size)]
+                elif isinstance(val[0], int):
+                    sub_struct = [(i, val[1]) for i in range(val[0])]
+                if isinstance(sub_struct, (list, tuple)):
+                    self.data[key] = InterpretedStructure(*sub_struct)
+                    offset += self.data[key].import_data(bytes, offset).byte_size
+        self.byte_size = offset - start_offset
+        return self
+
+    def export_data(self):
+        data_out = bytearray()
+        for key, val in self.structure.items():
+            if isinstance(val, str):
+                val = CIPDataTypes[val]
+            try:
+                data_out += self.data[key].export_data()
+                continue
+            except AttributeError:
+                pass
+            data_out += val.export_data(self.data[key])
+        self.byte_size = len(data_out)
+        return data_out
+
+
+class NotSupported():
+    # reply of a target without a DLR object
+    class CIP():
+        General_Status = 0x08
+
+
+class NoTransport():
+
+    def get_attr_single(self, *args):
+        return NotSupported()
+
+    def get_attr_all(self, *args):
+        return NotSupported()
+
+
+def master_definition(data_len=77):
+    dlr = DLR_Object(NoTransport())
+    structure = dlr.master_struct.get_struct()
+    return [structure[i - 1] for i in dlr.dict_of_versions[data_len]]
+
+
+if __name__ == '__main__':
+    definition = master_definition()
+    payload = bytes(range(1, 78))
+
+    interpreted = InterpretedStructure(*definition)
+    compiled = CIPDataStructure(*definition)
+    lazy = CIPDataStructure(*definition)
+    lazy.lazy = True
+    assert bytes(interpreted.import_data(payload).export_data()) == payload
+    assert bytes(compiled.import_data(payload).export_data()) == payload
+    assert lazy.import_data(payload).print() == compiled.print()
+
+    timings = {}
+    for name, structure in (('interpreted', interpreted), ('compiled', compiled)):
+        parse = timeit.timeit(lambda: structure.import_data(payload), number=NUMBER) / NUMBER
+        build = timeit.timeit(structure.export_data, number=NUMBER) / NUMBER
+        timings[name] = (parse, build)
+    lazy_parse = timeit.timeit(lambda: lazy.import_data(payload).Capability_Flags, number=NUMBER) / NUMBER
+
+    (interpreted_parse, interpreted_build), (compiled_parse, compiled_build) = timings['interpreted'], timings['compiled']
+    print("DLR master struct  import %6.2f -> %5.2f us (x%.1f)   export %6.2f -> %5.2f us (x%.1f)" %
+          (interpreted_parse * 1e6, compiled_parse * 1e6, interpreted_parse / compiled_parse,
+           interpreted_build * 1e6, compiled_build * 1e6, interpreted_build / compiled_build))
+    print("lazy import + one field %5.2f us" % (lazy_parse * 1e6))
@@ -0,0 +1,49 @@
+'''
+    Memory held per parsed frame, measured with tracemalloc over 100k
+    SendRRData replies run through the normal receive path and kept alive.
+
+    run from the repository root:
+        python -m benchmarks.bench_frame_memory [frames]
+'''
+import socket
+import struct
+import sys
+import tracemalloc
+from PyCIP.ENIPModule.ENIP import ENIP_Originator
+
+
+class CollectingOriginator(ENIP_Originator):
+
+    def __init__(self):
+        super().__init__()
+        self.packets = []
+
+    def _dispatch(self, rsp_identifier, parsed_packet):
+        self.packets.append(parsed_packet)
+
+    def __del__(self):
+        pass
+
+
+def reply_frame(context):
+    payload = bytes([0x8e, 0, 0, 0]) + b'\x01\x02\x03\x04'
+    body = struct.pack('<IHHHHHH', 0, 0, 2, 0, 0, 0xB2, len(payload)) + payload
+    return struct.pack('<HHIIQI', 0x6f, len(body), 0x1234, 0, context, 0) + body
+
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    frames = [memoryview(reply_frame(i)) for i in range(count)]
+    originator = CollectingOriginator()
+    s, peer = socket.socketpair()
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for frame in frames:
+        originator._import_encapsulated_rcv(frame, s)
+    after = tracemalloc.take_snapshot()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    held = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    print("%d frames  %.0f bytes held per frame  peak %.1f MiB" % (count, held / count, peak / 2**20))
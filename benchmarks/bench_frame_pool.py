@@ -0,0 +1,69 @@
+'''
+    Sustained class 1 implicit I/O through _import_IO_rcv and the Signaler,
+    with and without the pooled originator. The consumer releases every
+    message and packet once read, as an I/O handler would.
+
+    frame objects created per datagram are counted with the FramePool, a pool
+    of size 0 keeps nothing and so counts every allocation of the unpooled
+    path. The garbage collector runs per generation are shown as well.
+
+    run from the repository root:
+        python -m benchmarks.bench_frame_pool [datagrams]
+'''
+import gc
+import socket
+import struct
+import sys
+import time
+from PyCIP.ENIPModule.ENIP import ENIP_Originator
+from PyCIP.Tools.signaling import Signaler
+
+CONNECTION_ID = 0x55
+
+
+class Originator(ENIP_Originator):
+
+    def __del__(self):
+        pass
+
+
+def io_datagram(sequence):
+    data = struct.pack('<H', sequence & 0xFFFF) + bytes(30)
+    return (struct.pack('<HHHII', 2, 0x8002, 8, CONNECTION_ID, sequence) +
+            struct.pack('<HH', 0xB1, len(data)) + data)
+
+
+def run(pooled, datagrams, pool_size=64):
+    # the 256 frames are replayed, sequence tracking would drop them as late
+    originator = Originator(pooled=pooled, track_sequence=False)
+    if pooled:
+        originator.pool.size = pool_size
+    consumer = Signaler()
+    consumer.register(CONNECTION_ID)
+    a, b = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+    frames = [io_datagram(i) for i in range(256)]
+    collections = [stats['collections'] for stats in gc.get_stats()]
+    start = time.perf_counter()
+    for i in range(datagrams):
+        originator._import_IO_rcv(frames[i & 0xFF], a)
+        message = consumer.get_message()
+        packet = message.message
+        consumer.release(message)
+        packet.release()
+    seconds = time.perf_counter() - start
+    collections = [stats['collections'] - before for stats, before in zip(gc.get_stats(), collections)]
+    consumer.unregister(CONNECTION_ID)
+    a.close()
+    b.close()
+    return seconds, collections, originator.pool.stats() if pooled else None
+
+
+if __name__ == '__main__':
+    datagrams = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    created = run(True, datagrams // 10, pool_size=0)[2]['created'] / (datagrams // 10)
+    for name, pooled in (('allocating', False), ('pooled', True)):
+        seconds, collections, stats = run(pooled, datagrams)
+        if pooled:
+            created = stats['created'] / datagrams
+        print("%-10s %6.2f us per datagram  %7.4f frame objects created per datagram  gc runs gen0/1/2 %d %d %d" %
+              (name, seconds / datagrams * 1e6, created, collections[0], collections[1], collections[2]))
@@ -0,0 +1,41 @@
+'''
+    Per-parse cost of the 24 byte encapsulation header with and without the
+    compiled struct.Struct codec.
+
+    run from the repository root:
+        python -m benchmarks.bench_header_codec
+'''
+import timeit
+from PyCIP.ENIPModule.ENIPDataStructures import ENIPEncapsulationHeader, ENIPCommandCode
+from PyCIP.DataTypesModule import CPF_ConnectedAddress
+
+NUMBER = 100000
+
+
+class GenericHeader(ENIPEncapsulationHeader):
+    _fixed_layout = False
+
+
+class GenericConnectedAddress(CPF_ConnectedAddress):
+    _fixed_layout = False
+
+
+def bench(name, generic, compiled):
+    frame = bytes(compiled.export_data())
+    assert bytes(generic.export_data()) == frame
+
+    results = []
+    for structure in (generic, compiled):
+        parse = timeit.timeit(lambda: structure.import_data(frame), number=NUMBER) / NUMBER
+        build = timeit.timeit(structure.export_data, number=NUMBER) / NUMBER
+        results.append((parse, build))
+    (generic_parse, generic_build), (compiled_parse, compiled_build) = results
+    print("%-24s import %6.2f -> %5.2f us (x%.1f)   export %6.2f -> %5.2f us (x%.1f)" %
+          (name, generic_parse * 1e6, compiled_parse * 1e6, generic_parse / compiled_parse,
+           generic_build * 1e6, compiled_build * 1e6, generic_build / compiled_build))
+
+
+if __name__ == '__main__':
+    values = (ENIPCommandCode.SendRRData, 40, 0x1234, 0, 77, 0)
+    bench('ENIPEncapsulationHeader', GenericHeader(*values), ENIPEncapsulationHeader(*values))
+    bench('CPF_ConnectedAddress', GenericConnectedAddress(Connection_Identifier=5), CPF_ConnectedAddress(Connection_Identifier=5))
@@ -0,0 +1,76 @@
+'''
+    Frames and CPU of slow changing outputs produced cyclically against
+    change of state. An application thread writes the outputs of every
+    connection each scan (10 ms), changing them with a small probability.
+
+    cyclic connections produce at the scan rate, change of state ones when
+    the data changed (inhibit 10 ms) and as a heartbeat every 250 ms.
+
+    run from the repository root:
+        python -m benchmarks.bench_io_cos [connections] [change_probability] [seconds]
+'''
+import random
+import socket
+import sys
+import time
+from PyCIP.CIPModule.implicit_io import IOConnection, IOScheduler
+from PyCIP.DataTypesModule import ProductionTrigger
+
+SCAN_US = 10000
+HEARTBEAT_US = 250000
+
+
+class UDPSink():
+    # stands in for the originator, nothing reads the receiving socket
+
+    def __init__(self):
+        self.receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.receiver.bind(('127.0.0.1', 0))
+        self.sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sender.connect(self.receiver.getsockname())
+        self.sender.setblocking(0)
+
+    def _send_IO(self, packet):
+        try:
+            self.sender.send(packet)
+        except BlockingIOError:
+            pass
+
+
+def run(production_trigger, count, probability, seconds):
+    sink = UDPSink()
+    scheduler = IOScheduler(spin_ns=0)
+    rpi_us = SCAN_US if production_trigger == ProductionTrigger.Cyclic else HEARTBEAT_US
+    start = time.monotonic_ns()
+    connections = [scheduler.add(IOConnection(sink, 0x1000 + i, rpi_us, 32, production_trigger=production_trigger,
+                                              inhibit_us=SCAN_US),
+                                 start + i * SCAN_US * 1000 // count)
+                   for i in range(count)]
+    outputs = [bytearray(32) for _ in connections]
+    rng = random.Random(1)
+    changes = 0
+    cpu = time.process_time()
+    scheduler.start()
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        for connection, output in zip(connections, outputs):
+            if rng.random() < probability:
+                output[0] = (output[0] + 1) & 0xFF
+                changes += 1
+            connection.set_data(output)
+        time.sleep(SCAN_US / 1e6)
+    scheduler.stop()
+    cpu = time.process_time() - cpu
+    return sum(c.sent for c in connections), changes, cpu
+
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    probability = float(sys.argv[2]) if len(sys.argv) > 2 else 0.02
+    seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 5.0
+
+    for name, production_trigger in (('cyclic', ProductionTrigger.Cyclic),
+                                     ('change of state', ProductionTrigger.ChangeOfState)):
+        sent, changes, cpu = run(production_trigger, count, probability, seconds)
+        print("%-15s %7d frames (%6.0f/s) for %5d changes   cpu %.0f%%" %
+              (name, sent, sent / seconds, changes, 100 * cpu / seconds))
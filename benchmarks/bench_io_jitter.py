@@ -0,0 +1,90 @@
+'''
+    Production jitter of the IOScheduler running class 1 connections at a
+    1 ms RPI (100 connections by default), sending to a local UDP sink.
+
+    the scheduler busy waits the last spin_us before each deadline (200 by
+    default, 0 only sleeps as IOScheduler does unless asked).
+
+    jitter is the deviation of each interval between two productions of a
+    connection from its RPI, lateness the time from deadline to send as
+    counted by the scheduler.
+
+    run from the repository root:
+        python -m benchmarks.bench_io_jitter [connections] [rpi_us] [seconds] [spin_us]
+'''
+import socket
+import sys
+import time
+from PyCIP.CIPModule.implicit_io import IOConnection, IOScheduler
+
+
+class UDPSink():
+    # stands in for the originator, _send_IO is all an IOConnection needs.
+    # Nothing reads the receiving socket, the kernel drops what does not fit
+
+    def __init__(self):
+        self.receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.receiver.bind(('127.0.0.1', 0))
+        self.sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sender.connect(self.receiver.getsockname())
+        self.sender.setblocking(0)
+        self.dropped = 0
+
+    def _send_IO(self, packet):
+        try:
+            self.sender.send(packet)
+        except BlockingIOError:
+            self.dropped += 1
+
+
+class TimedConnection(IOConnection):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.send_times = []
+
+    def produce(self):
+        self.send_times.append(time.monotonic_ns())
+        super().produce()
+
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    rpi_us = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 5.0
+    spin_us = int(sys.argv[4]) if len(sys.argv) > 4 else 200
+
+    sink = UDPSink()
+    scheduler = IOScheduler(spin_ns=spin_us * 1000)
+    start = time.monotonic_ns() + 10000000
+    # spread the connections across the RPI as a scanner would
+    connections = [scheduler.add(TimedConnection(sink, 0x1000 + i, rpi_us, 32), start + i * rpi_us * 1000 // count)
+                   for i in range(count)]
+    cpu = time.process_time()
+    scheduler.start()
+    time.sleep(seconds)
+    scheduler.stop()
+    cpu = time.process_time() - cpu
+
+    rpi_ns = rpi_us * 1000
+    deviations = []
+    for connection in connections:
+        times = connection.send_times
+        deviations += [abs(b - a - rpi_ns) for a, b in zip(times, times[1:])]
+    deviations.sort()
+    sent = sum(c.sent for c in connections)
+    overruns = sum(c.overruns for c in connections)
+    late_mean = sum(c.late_total_ns for c in connections) / max(sent, 1) / 1000
+    late_max = max(c.late_max_ns for c in connections) / 1000
+
+    print("%d connections at %d us RPI for %.1f s: %d frames sent (%.0f%% of schedule), %d overruns, %d dropped" %
+          (count, rpi_us, seconds, sent, 100.0 * sent / (count * seconds * 1e6 / rpi_us), overruns, sink.dropped))
+    print("interval jitter  mean %6.1f us  p50 %6.1f us  p99 %7.1f us  max %8.1f us" %
+          (sum(deviations) / max(len(deviations), 1) / 1000, percentile(deviations, 0.5) / 1000,
+           percentile(deviations, 0.99) / 1000, deviations[-1] / 1000 if deviations else 0))
+    print("lateness         mean %6.1f us  max %8.1f us   scheduler cpu %.0f%%" %
+          (late_mean, late_max, 100 * cpu / seconds))
@@ -0,0 +1,80 @@
+'''
+    class 1 T->O frames through _import_IO_rcv and the Signaler with and
+    without sequence tracking, on a stream where a share of the frames are
+    duplicates or arrive late (a frame reordered behind its successor).
+
+    with tracking those are dropped before anything is parsed, without they
+    reach the consumer like any other frame.
+
+    run from the repository root:
+        python -m benchmarks.bench_io_sequence [datagrams] [percent_duplicate_or_late]
+'''
+import random
+import socket
+import struct
+import sys
+import time
+from PyCIP.ENIPModule.ENIP import ENIP_Originator
+from PyCIP.Tools.signaling import Signaler
+
+CONNECTION_ID = 0x55
+
+
+class Originator(ENIP_Originator):
+
+    def __del__(self):
+        pass
+
+
+def io_datagram(sequence):
+    data = struct.pack('<H', sequence & 0xFFFF) + bytes(30)
+    return (struct.pack('<HHHII', 2, 0x8002, 8, CONNECTION_ID, sequence) +
+            struct.pack('<HH', 0xB1, len(data)) + data)
+
+
+def stream(datagrams, percent):
+    rng = random.Random(1)
+    sequences = []
+    sequence = 0
+    while len(sequences) < datagrams:
+        sequence += 1
+        roll = rng.random() * 100
+        if roll < percent / 2:
+            sequences += [sequence, sequence]
+        elif roll < percent:
+            # overtaken by the next frame
+            sequences += [sequence + 1, sequence]
+            sequence += 1
+        else:
+            sequences.append(sequence)
+    return [io_datagram(s) for s in sequences[:datagrams]]
+
+
+def run(track_sequence, frames):
+    originator = Originator(track_sequence=track_sequence)
+    consumer = Signaler()
+    consumer.register(CONNECTION_ID)
+    a, b = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+    delivered = 0
+    start = time.perf_counter()
+    for frame in frames:
+        originator._import_IO_rcv(frame, a)
+        message = consumer.get_message(0)
+        if message != None:
+            delivered += 1
+            consumer.release(message)
+    seconds = time.perf_counter() - start
+    consumer.unregister(CONNECTION_ID)
+    a.close()
+    b.close()
+    return seconds, delivered, originator.io_stats()
+
+
+if __name__ == '__main__':
+    datagrams = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    percent = float(sys.argv[2]) if len(sys.argv) > 2 else 20.0
+    frames = stream(datagrams, percent)
+    for name, track_sequence in (('untracked', False), ('tracked', True)):
+        seconds, delivered, stats = run(track_sequence, frames)
+        print("%-9s %6.2f us per datagram  %6d delivered  lost %d duplicate %d late %d" %
+              (name, seconds / datagrams * 1e6, delivered, stats['lost'], stats['duplicate'], stats['late']))
@@ -0,0 +1,89 @@
+'''
+    sizeof() of 1,000 parsed ListIdentity replies, with SHORTSTRING sizes
+    tracked as they are decoded against re-exporting the string on every
+    sizeof() call. The replies are parsed before the timing, construction
+    and import are not part of it.
+
+    Structure sizeof() stays a sum over the fields, only the string fields
+    get cheaper.
+
+    run from the repository root:
+        python -m benchmarks.bench_list_identity [replies]
+'''
+import struct
+import sys
+import timeit
+from PyCIP import DataTypesModule as DT
+from PyCIP.ENIPModule.ENIPDataStructures import ENIPEncapsulationHeader, ListIdentityRsp, TargetItems
+
+REPEAT = 20
+
+
+class ExportingSHORTSTRING(DT.SHORTSTRING):
+    __slots__ = ()
+
+    def sizeof(self):
+        # as before, encode the string just to learn its length
+        self.export_data()
+        return self._byte_size
+
+
+class ExportingTargetItems(TargetItems):
+
+    def __init__(self):
+        super().__init__()
+        self.Product_Name = ExportingSHORTSTRING()
+
+
+class ExportingListIdentityRsp(ListIdentityRsp):
+
+    def __init__(self):
+        self.Item_Count = DT.UINT()
+        self.Target_Items = DT.ARRAY(ExportingTargetItems, self.Item_Count)
+
+
+def reply_frame(serial):
+    name = ('1756-EN2TR/C %08X' % serial).encode('iso-8859-1')
+    identity = (struct.pack('<H', 1) + struct.pack('>hHI', 2, 44818, 0xC0A80000 + serial % 250) + bytes(8) +
+                struct.pack('<HHHBBHI', 1, 12, 0xA6, 11, 2, 0x0030, serial) +
+                bytes([len(name)]) + name + bytes([3]))
+    body = struct.pack('<HHH', 1, 0x0C, len(identity)) + identity
+    return struct.pack('<HHIIQI', 0x63, len(body), 0, 0, 0, 0) + body
+
+
+def parse_replies(frames, reply_type):
+    replies = []
+    for frame in frames:
+        header = ENIPEncapsulationHeader()
+        offset = header.import_data(frame)
+        reply = reply_type()
+        reply.import_data(frame, offset)
+        replies.append((header, reply))
+    return replies
+
+
+def size_replies(replies):
+    sizes = 0
+    for header, reply in replies:
+        sizes += header.sizeof() + reply.sizeof()
+    return sizes
+
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    frames = [memoryview(reply_frame(i)) for i in range(count)]
+    total = sum(len(frame) for frame in frames)
+    for name, reply_type in (('re-exporting sizeof', ExportingListIdentityRsp), ('tracked sizeof', ListIdentityRsp)):
+        replies = parse_replies(frames, reply_type)
+        assert size_replies(replies) == total
+        seconds = min(timeit.repeat(lambda: size_replies(replies), number=1, repeat=REPEAT))
+        print("%-20s %d replies in %6.2f ms  %5.2f us per reply" % (name, count, seconds * 1e3, seconds / count * 1e6))
+
+    size_calls = 100000
+    name = DT.SHORTSTRING()
+    name.import_data(frames[0], 24 + 6 + 33)
+    exporting = ExportingSHORTSTRING()
+    exporting.import_data(frames[0], 24 + 6 + 33)
+    for label, string in (('re-exporting', exporting), ('tracked', name)):
+        seconds = timeit.timeit(string.sizeof, number=size_calls) / size_calls
+        print("SHORTSTRING.sizeof %-13s %5.3f us" % (label, seconds * 1e6))
@@ -0,0 +1,67 @@
+'''
+    Per packet cost of the receive metadata on a connected UDP socket,
+    getsockname/getpeername on every packet against the endpoint looked up
+    once per socket, and the kernel SO_TIMESTAMPNS receive path.
+
+    run from the repository root:
+        python -m benchmarks.bench_rcv_metadata
+'''
+import socket
+import time
+import timeit
+from PyCIP.ENIPModule.ENIP import ENIP_Originator, trans_metadata
+from PyCIP.Tools import networking
+
+NUMBER = 100000
+
+
+class SyscallMetadata():
+    # as before, both addresses asked for on every packet
+    __slots__ = ('host', 'peer', 'protocall', 'recevied_time')
+
+    def __init__(self, socket, proto):
+        self.host = socket.getsockname()
+        self.peer = socket.getpeername()
+        self.protocall = proto
+        self.recevied_time = time.time()
+
+
+class Originator(ENIP_Originator):
+
+    def __del__(self):
+        pass
+
+
+def udp_pair():
+    a = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    b = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    a.bind(('127.0.0.1', 0))
+    b.bind(('127.0.0.1', 0))
+    a.connect(b.getsockname())
+    b.connect(a.getsockname())
+    return a, b
+
+
+if __name__ == '__main__':
+    originator = Originator()
+    a, b = udp_pair()
+    per_packet = timeit.timeit(lambda: SyscallMetadata(a, 'udp'), number=NUMBER) / NUMBER
+    cached = timeit.timeit(lambda: trans_metadata(originator._endpoint(a, 'udp')), number=NUMBER) / NUMBER
+    print("receive metadata  syscalls per packet %5.2f us  endpoint per socket %5.2f us" %
+          (per_packet * 1e6, cached * 1e6))
+
+    payload = bytes(64)
+    count = 2000
+    stamped = networking.enable_kernel_timestamps(a)
+    plain_time = stamped_time = 0.0
+    for _ in range(count):
+        b.send(payload)
+        start = time.perf_counter()
+        a.recv(65535)
+        plain_time += time.perf_counter() - start
+        b.send(payload)
+        start = time.perf_counter()
+        data, kernel_time = networking.recv_timestamped(a)
+        stamped_time += time.perf_counter() - start
+    print("recv %5.2f us  recvmsg with SO_TIMESTAMPNS %5.2f us (kernel stamps %s)" %
+          (plain_time / count * 1e6, stamped_time / count * 1e6, 'on' if kernel_time else 'off'))
@@ -0,0 +1,90 @@
+'''
+    How many ENIP sessions can one reactor thread serve at a fixed request rate.
+    'enip' hands the raw replies to a packet_handler, 'cip' puts a CIP_Manager
+    on every session and sends through Basic_CIP.submit_explicit, whose
+    replies are decoded on the reactor thread as well.
+
+    run from the repository root:
+        python -m benchmarks.bench_reactor_sessions [sessions ...]
+'''
+import sys
+import threading
+import time
+from benchmarks import sim_target
+from PyCIP.ENIPModule import ENIPReactor
+from PyCIP.CIPModule.CIP import CIP_Manager, explicit_request
+from PyCIP.DataTypesModule import *
+
+RATE_PER_SESSION = 10       # requests per second per session
+DURATION = 5.0
+
+
+def run(session_count, port, cip=False):
+    reactor = ENIPReactor()
+    sessions = [reactor.session('127.0.0.1', port) for _ in range(session_count)]
+    for session in sessions:
+        session.register_session()
+
+    responses = [0]
+    def handler(packet):
+        responses[0] += 1
+    def done(future):
+        if future.result() != None:
+            responses[0] += 1
+
+    path = EPATH()
+    path.append(LogicalSegment(LogicalType.ClassID, LogicalFormat.bit_8, 1))
+    path.append(LogicalSegment(LogicalType.InstanceID, LogicalFormat.bit_8, 1))
+    path.append(LogicalSegment(LogicalType.AttributeID, LogicalFormat.bit_8, 1))
+
+    if cip:
+        layers = [CIP_Manager(session).primary_connection for session in sessions]
+        def send(index):
+            layers[index].submit_explicit(CIPServiceCode.get_att_single, path).add_done_callback(done)
+    else:
+        request = explicit_request(CIPServiceCode.get_att_single, path)
+        for session in sessions:
+            session.packet_handler = handler
+        def send(index):
+            sessions[index].send_encap(request, None, sessions[index].get_next_sender_context())
+
+    # pace requests in 10 ms ticks spread across all sessions
+    tick = 0.01
+    per_tick = session_count * RATE_PER_SESSION * tick
+    sent = 0
+    credit = 0.0
+    index = 0
+    start_cpu = reactor.cpu_time
+    start = time.perf_counter()
+    next_tick = start
+    while time.perf_counter() - start < DURATION:
+        credit += per_tick
+        while credit >= 1:
+            send(index)
+            index = (index + 1) % session_count
+            sent += 1
+            credit -= 1
+        next_tick += tick
+        time.sleep(max(0, next_tick - time.perf_counter()))
+    time.sleep(0.5)
+    elapsed = time.perf_counter() - start
+    cpu = reactor.cpu_time - start_cpu
+    threads = threading.active_count()
+
+    for session in sessions:
+        session.unregister_session()
+    reactor.stop()
+    utilisation = cpu / elapsed
+    capacity = session_count / utilisation if utilisation else float('inf')
+    print("%-4s %6d sessions  %4d threads  sent %7d  received %7d  reactor cpu %5.1f%%  ~%d sessions/core @ %d req/s" %
+          ('cip' if cip else 'enip', session_count, threads, sent, responses[0], 100 * utilisation, capacity,
+           RATE_PER_SESSION))
+
+
+if __name__ == '__main__':
+    counts = [int(x) for x in sys.argv[1:]] or [100, 500, 1000]
+    process, port = sim_target.start()
+    for count in counts:
+        run(count, port)
+        run(count, port, cip=True)
+    process.terminate()
@@ -0,0 +1,47 @@
+'''
+    Decoding the Message Router reply prefix of a UCMM and a connected reply
+    without additional status, the single unpack_from fast path against the
+    generic field by field import followed by sizeof().
+
+    run from the repository root:
+        python -m benchmarks.bench_reply_prefix
+'''
+import struct
+import timeit
+from PyCIP.CIPModule.CIP import MessageRouterResponseStruct, MessageRouterResponseStruct_UCMM
+from PyCIP.DataTypesModule import BaseStructureAutoKeys
+
+NUMBER = 100000
+
+
+class GenericUCMM(MessageRouterResponseStruct_UCMM):
+    import_data = BaseStructureAutoKeys.import_data
+
+
+class GenericConnected(MessageRouterResponseStruct):
+    import_data = BaseStructureAutoKeys.import_data
+
+
+def generic(reply, data):
+    reply.import_data(data)
+    return data[reply.sizeof():]
+
+
+def fast(reply, data):
+    return data[reply.import_data(data):]
+
+
+if __name__ == '__main__':
+    payload = bytes(range(16))
+    replies = (('UCMM', GenericUCMM(), MessageRouterResponseStruct_UCMM(),
+                memoryview(bytes([0x8e, 0, 0, 0]) + payload)),
+               ('connected', GenericConnected(), MessageRouterResponseStruct(),
+                memoryview(struct.pack('<HBBBB', 7, 0x8e, 0, 0, 0) + payload)))
+
+    for name, slow_reply, fast_reply, data in replies:
+        assert bytes(generic(slow_reply, data)) == bytes(fast(fast_reply, data)) == payload
+        assert [v() for v in slow_reply.Reply_Service] == [v() for v in fast_reply.Reply_Service]
+        slow = timeit.timeit(lambda: generic(slow_reply, data), number=NUMBER) / NUMBER
+        quick = timeit.timeit(lambda: fast(fast_reply, data), number=NUMBER) / NUMBER
+        print("%-10s reply prefix  generic %5.2f us  fast path %5.2f us (x%.1f)" %
+              (name, slow * 1e6, quick * 1e6, slow / quick))
@@ -0,0 +1,91 @@
+'''
+    Allocations and time per outgoing SendRRData request, building the frame
+    part by part with export_data against writing it into one buffer with
+    export_into.
+
+    allocations are the memory blocks still held per frame while it waits in
+    the send queue, counted with tracemalloc.
+
+    run from the repository root:
+        python -m benchmarks.bench_send_alloc [frames]
+'''
+import sys
+import timeit
+import tracemalloc
+from PyCIP.CIPModule.CIP import explicit_request
+from PyCIP.DataTypesModule import compile_path, CPF_Items, CPF_NullAddress, CPF_UnconnectedData
+from PyCIP.ENIPModule.ENIP import ENIP_Originator
+from PyCIP.ENIPModule.ENIPDataStructures import ENIPEncapsulationHeader, ENIPCommandCode, SendRRData
+
+
+class QueueOnly(ENIP_Originator):
+
+    def __init__(self):
+        super().__init__()
+        self.session_handle = 0x1234
+
+    def __del__(self):
+        pass
+
+
+class PartsOriginator(QueueOnly):
+    '''
+        send_encap as it was, every part exported on its own
+    '''
+
+    def send_encap(self, data, send_id=None, receive_id=None):
+        CPF_Array = CPF_Items()
+        CPF_Array.append(CPF_NullAddress())
+        CPF_Array.append(CPF_UnconnectedData(Length=len(data)))
+        command_specific_bytes = SendRRData(Interface_handle=0, Timeout=0).export_data()
+        CPF_bytes = CPF_Array.export_data()
+        encap_header = ENIPEncapsulationHeader(ENIPCommandCode.SendRRData,
+                                               len(command_specific_bytes) + len(CPF_bytes) + len(data),
+                                               self.session_handle, 0, receive_id, 0)
+        self._send_encap(encap_header.export_data(), command_specific_bytes, CPF_bytes, data)
+        return receive_id
+
+
+def parts_request(service, path, data=None):
+    request = bytearray()
+    request.append(service)
+    path_bytes = path.export_data()
+    request.append(len(path_bytes) // 2)
+    request += path_bytes
+    if data is not None:
+        request += data
+    return request
+
+
+def blocks_per_frame(originator, build_request, count):
+    path = compile_path(1, 1, 7)
+    originator.class2_3_out_queue.clear()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for context in range(count):
+        originator.send_encap(build_request(0x0e, path), None, context + 2)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    originator.class2_3_out_queue.clear()
+    held = sum(stat.count_diff for stat in after.compare_to(before, 'filename'))
+    return held / count
+
+
+def time_per_frame(originator, build_request, count):
+    path = compile_path(1, 1, 7)
+    queue = originator.class2_3_out_queue
+
+    def send():
+        originator.send_encap(build_request(0x0e, path), None, 2)
+        queue.clear()
+    return timeit.timeit(send, number=count) / count
+
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    parts, single = PartsOriginator(), QueueOnly()
+    for name, originator, build_request in (('export_data parts', parts, parts_request),
+                                            ('export_into frame', single, explicit_request)):
+        blocks = blocks_per_frame(originator, build_request, count)
+        seconds = time_per_frame(originator, build_request, count)
+        print("%-18s %4.1f blocks held per queued frame  %5.2f us per request" % (name, blocks, seconds * 1e6))
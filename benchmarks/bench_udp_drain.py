@@ -0,0 +1,98 @@
+'''
+    T->O datagrams of many class 1 connections (100 at a 2 ms RPI by default)
+    received by an ENIP_Originator, reading one datagram per loop iteration as
+    before against draining everything pending per wakeup into the
+    DatagramReceiveBuffer with a larger SO_RCVBUF.
+
+    an IOScheduler thread in the same process plays the targets, so on few
+    cores the producer competes with the receive loop. The kernel drops are
+    read back from /proc/net/udp (Linux only).
+
+    run from the repository root:
+        python -m benchmarks.bench_udp_drain [connections] [rpi_us] [seconds]
+'''
+import socket
+import sys
+import time
+from PyCIP.CIPModule.implicit_io import IOConnection, IOScheduler
+from PyCIP.ENIPModule.ENIP import ENIP_Originator
+
+
+class Targets():
+    # _send_IO for the producing connections, one socket standing in for every target
+
+    def __init__(self):
+        self.s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.s.bind(('127.0.0.1', 0))
+        self.s.setblocking(0)
+
+    def _send_IO(self, packet):
+        try:
+            self.s.send(packet)
+        except BlockingIOError:
+            pass
+
+
+class Originator(ENIP_Originator):
+
+    def _class2_3_send_rcv(self):
+        pass
+
+    def __del__(self):
+        pass
+
+
+class OneDatagramOriginator(Originator):
+    '''
+        _class0_1_send_rcv as it was, a single recv per 1 ms loop and the default SO_RCVBUF
+    '''
+
+    def _class0_1_send_rcv(self):
+        s = self.datagram_connection
+        try:
+            datagram_packet = s.recv(65535)
+        except BlockingIOError:
+            return
+        self.datagram_buffer.received += 1
+        self._import_IO_rcv(datagram_packet, s)
+
+
+def run(originator_type, count, rpi_us, seconds, **kwargs):
+    targets = Targets()
+    originator = originator_type(**kwargs)
+    originator.create_class_0_1('127.0.0.1', targets.s.getsockname()[1])
+    targets.s.connect(originator.datagram_connection.getsockname())
+
+    received = [0]
+    def handler(packet):
+        received[0] += 1
+    scheduler = IOScheduler(spin_ns=0)
+    start = time.monotonic_ns()
+    connections = []
+    for i in range(count):
+        originator.register_io_handler(0x2000 + i, handler)
+        connections.append(scheduler.add(IOConnection(targets, 0x2000 + i, rpi_us, 32, run_idle_header=False),
+                                         start + i * rpi_us * 1000 // count))
+    scheduler.start()
+    time.sleep(seconds)
+    scheduler.stop()
+    time.sleep(0.2)
+    stats = originator.io_stats()
+    stats['handled'] = received[0]
+    stats['sent'] = sum(c.sent for c in connections)
+    originator.stop()
+    targets.s.close()
+    return stats
+
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    rpi_us = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 3.0
+
+    for name, originator_type, kwargs in (('one per loop', OneDatagramOriginator, {'udp_rcvbuf': 0}),
+                                          ('drain', Originator, {})):
+        stats = run(originator_type, count, rpi_us, seconds, **kwargs)
+        print("%-13s sent %7d  handled %7d  kernel drops %7s  behind %d  truncated %d  unrouted %d" %
+              (name, stats['sent'], stats['handled'], stats['kernel_drops'], stats['behind'],
+               stats['truncated'], stats['unrouted']))
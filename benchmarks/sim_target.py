@@ -0,0 +1,83 @@
+'''
+    Minimal simulated EtherNet/IP target used by the benchmarks.
+
+    Answers RegisterSession, SendRRData and SendUnitData with a successful
+    Message Router reply carrying a 4 byte payload. Runs in its own process so
+    its CPU use is kept apart from the originator being measured.
+'''
+import multiprocessing
+import selectors
+import socket
+import struct
+
+HEADER = struct.Struct('<HHIIQI')
+PAYLOAD = b'\x01\x02\x03\x04'
+
+
+def reply_for(frame):
+    cmd, length, session, status, context, options = HEADER.unpack_from(frame, 0)
+    if cmd == 0x65:
+        return HEADER.pack(0x65, 4, 0x1234, 0, context, 0) + struct.pack('<HH', 1, 0)
+    if cmd == 0x6f:
+        # command specific (6) + item count (2) + null address item (4)
+        item_type, item_length = struct.unpack_from('<HH', frame, 36)
+        service = frame[40]
+        payload = bytes([service | 0x80, 0, 0, 0]) + PAYLOAD
+        body = struct.pack('<IHHHHHH', 0, 0, 2, 0, 0, 0xB2, len(payload)) + payload
+        return HEADER.pack(0x6f, len(body), session, 0, context, 0) + body
+    if cmd == 0x70:
+        # command specific (6) + item count (2) + connected address item (8)
+        # the originator puts its T->O connection id in the sender context
+        connection_id = context & 0xFFFFFFFF
+        sequence = frame[44:46]
+        service = frame[46]
+        payload = sequence + bytes([service | 0x80, 0, 0, 0]) + PAYLOAD
+        body = struct.pack('<IHHHHIHH', 0, 0, 2, 0xA1, 4, connection_id, 0xB1, len(payload)) + payload
+        return HEADER.pack(0x70, len(body), session, 0, context, 0) + body
+    return b''
+
+
+def serve_forever(listener):
+    selector = selectors.DefaultSelector()
+    selector.register(listener, selectors.EVENT_READ)
+    buffers = {}
+    while True:
+        for key, _ in selector.select():
+            s = key.fileobj
+            if s is listener:
+                c, _ = listener.accept()
+                c.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                buffers[c] = bytearray()
+                selector.register(c, selectors.EVENT_READ)
+                continue
+            try:
+                data = s.recv(65535)
+            except ConnectionError:
+                data = b''
+            if not data:
+                selector.unregister(s)
+                s.close()
+                continue
+            buffer = buffers[s]
+            buffer += data
+            out = bytearray()
+            while len(buffer) >= 24:
+                frame_length = int.from_bytes(buffer[2:4], 'little') + 24
+                if len(buffer) < frame_length:
+                    break
+                out += reply_for(bytes(buffer[:frame_length]))
+                del buffer[:frame_length]
+            if out:
+                s.sendall(out)
+
+
+def start(host='127.0.0.1'):
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listener.bind((host, 0))
+    listener.listen(4096)
+    process = multiprocessing.Process(target=serve_forever, args=(listener,), daemon=True)
+    process.start()
+    port = listener.getsockname()[1]
+    listener.close()
+    return process, port
@@ -0,0 +1,98 @@
+import socket
+import struct
+import threading
+import time
+import unittest
+from PyCIP.CIPModule.implicit_io import IOConnection
+from PyCIP.ENIPModule import IOReceiver, ENIP_Originator
+from PyCIP.ENIPModule.ENIPSequence import sequenced_address, SEQUENCED_ADDRESS
+
+CONNECTION_ID = 0x4001
+
+
+class Originator(ENIP_Originator):
+
+    def _class2_3_send_rcv(self):
+        pass
+
+    def __del__(self):
+        pass
+
+
+class Sender():
+
+    def __init__(self, address):
+        self.s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.s.bind(('127.0.0.1', 0))
+        self.s.connect(address)
+
+    def _send_IO(self, packet):
+        self.s.send(packet)
+
+    def send_unknown_item(self):
+        # a good sequenced address item followed by an item type no one knows
+        self.s.send(sequenced_address.pack(2, SEQUENCED_ADDRESS, 8, CONNECTION_ID, 1) + struct.pack('<HH', 0x1234, 0))
+
+
+class MalformedTrailingItem():
+
+    def setUp(self):
+        self.received = threading.Event()
+        self.originator = Originator(track_sequence=False)
+        self.originator.register_io_handler(CONNECTION_ID, lambda packet: self.received.set())
+
+    def tearDown(self):
+        self.originator.stop()
+        self.sender.s.close()
+
+    def test_later_frame_delivered(self):
+        self.sender.send_unknown_item()
+        IOConnection(self.sender, CONNECTION_ID, 1000, 8).produce()
+        self.assertTrue(self.received.wait(2))
+        self.assertEqual(self.originator.io_stats()['malformed'], 1)
+
+    def test_failing_handler(self):
+        def handler(packet):
+            self.received.set()
+            raise RuntimeError("handler failed")
+        self.originator.register_io_handler(CONNECTION_ID, handler)
+        connection = IOConnection(self.sender, CONNECTION_ID, 1000, 8)
+        connection.produce()
+        self.assertTrue(self.received.wait(2))
+        self.received.clear()
+        connection.produce()
+        self.assertTrue(self.received.wait(2))
+        # the handler sets the event before raising, give the count a moment to follow
+        deadline = time.monotonic() + 2
+        while self.originator.io_stats()['handler_errors'] < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.originator.io_stats()['handler_errors'], 2)
+
+
+class ThroughIOReceiver(MalformedTrailingItem, unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.receiver = IOReceiver('127.0.0.1', 0)
+        self.receiver.start()
+        address = self.receiver.socket.getsockname()
+        self.originator.attach_io_receiver(self.receiver, *address)
+        self.originator.add_io_connection(CONNECTION_ID)
+        self.sender = Sender(address)
+
+    def tearDown(self):
+        super().tearDown()
+        self.receiver.close()
+
+
+class ThroughOriginatorSocket(MalformedTrailingItem, unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.sender = Sender(('127.0.0.1', 0))
+        self.originator.create_class_0_1(*self.sender.s.getsockname())
+        self.sender.s.connect(self.originator.datagram_connection.getsockname())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import socket
+import time
+import unittest
+from PyCIP.CIPModule.implicit_io import IOConnection, IOScheduler
+
+
+class Transport():
+
+    def __init__(self, port):
+        self.s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.s.connect(('127.0.0.1', port))
+
+    def _send_IO(self, packet):
+        self.s.send(packet)
+        return True
+
+
+class RefusedTarget(unittest.TestCase):
+
+    def test_other_connections_keep_producing(self):
+        # nothing listens on the closed port, its sends raise ConnectionRefusedError
+        closed = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        closed.bind(('127.0.0.1', 0))
+        closed_port = closed.getsockname()[1]
+        closed.close()
+        target = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        target.bind(('127.0.0.1', 0))
+
+        refused_transport = Transport(closed_port)
+        healthy_transport = Transport(target.getsockname()[1])
+        scheduler = IOScheduler()
+        refused = scheduler.add(IOConnection(refused_transport, 1, 2000, 8))
+        healthy = scheduler.add(IOConnection(healthy_transport, 2, 2000, 8))
+        scheduler.start()
+        time.sleep(0.3)
+        scheduler.stop()
+        scheduler.thread.join(1)
+        for s in (refused_transport.s, healthy_transport.s, target):
+            s.close()
+
+        self.assertGreater(refused.send_errors, 0)
+        self.assertGreater(healthy.sent, 50)
+        self.assertEqual(healthy.send_errors, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import struct
+import unittest
+import PyCIP.DataTypesModule as DT
+from PyCIP.ENIPModule.ENIPDataStructures import ListIdentityRsp
+
+
+class Counted(DT.BaseStructureAutoKeys):
+    lazy = True
+
+    def __init__(self):
+        self.N = DT.UINT()
+        self.A = DT.ARRAY(DT.UINT, self.N)
+
+
+def list_identity_reply(count=2, name=b'Test device'):
+    item = (struct.pack('<H', 1) + struct.pack('>hHI', 2, 44818, 0x0A000001) + bytes(8) +
+            struct.pack('<HHHBBHI', 1, 12, 55, 2, 3, 0x30, 1234) + bytes([len(name)]) + name + b'\x03')
+    return struct.pack('<H', count) + (struct.pack('<HH', 0x0C, len(item)) + item) * count
+
+
+class LengthPrefixedArray(unittest.TestCase):
+    data = struct.pack('<HHHH', 3, 10, 20, 30)
+
+    def test_array_first(self):
+        structure = Counted()
+        self.assertEqual(structure.import_data(self.data), len(self.data))
+        self.assertEqual([value() for value in structure.A], [10, 20, 30])
+        self.assertEqual(structure.N(), 3)
+
+    def test_prefix_first(self):
+        structure = Counted()
+        self.assertEqual(structure.import_data(self.data), len(self.data))
+        self.assertEqual(structure.N(), 3)
+        self.assertEqual([value() for value in structure.A], [10, 20, 30])
+        self.assertEqual(structure.sizeof(), len(self.data))
+
+
+class LazyListIdentity(unittest.TestCase):
+
+    def import_lazy(self):
+        data = list_identity_reply()
+        reply = ListIdentityRsp()
+        reply.lazy = True
+        self.assertEqual(reply.import_data(data), len(data))
+        return reply
+
+    def test_items_first(self):
+        reply = self.import_lazy()
+        self.assertEqual([str(item.Product_Name) for item in reply.Target_Items], ['Test device'] * 2)
+        self.assertEqual(reply.Item_Count(), 2)
+
+    def test_count_first(self):
+        reply = self.import_lazy()
+        self.assertEqual(reply.Item_Count(), 2)
+        self.assertEqual(str(reply.Target_Items[1].Socket_Address.sin_addr), '10.0.0.1')
+
+
+if __name__ == '__main__':
+    unittest.main()
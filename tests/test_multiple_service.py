@@ -0,0 +1,52 @@
+import unittest
+from concurrent.futures import Future
+from PyCIP.CIPModule.CIP import CIP_Manager, explicit_request
+from PyCIP.CIPModule.connection_manager_class import ConnectionManager
+
+# port 2 to 192.168.1.20, then the backplane slot 0
+ROUTE = [bytes([0x12, 15]) + b'192.168.001.020' + bytes(1), bytes([0x01, 0x00])]
+
+
+class Recorder():
+    # stands in for Basic_CIP, records the size of every message router request
+
+    def __init__(self):
+        self.sizes = []
+
+    def submit_explicit(self, service, EPath, data=None, time_out=5):
+        self.sizes.append(len(explicit_request(service, EPath, data)))
+        future = Future()
+        future.set_result(None)
+        return future
+
+
+def manager():
+    cip = CIP_Manager.__new__(CIP_Manager)
+    cip.e_connected_connection = None
+    cip.primary_connection = Recorder()
+    cip.connection_manager = ConnectionManager(cip.primary_connection)
+    return cip
+
+
+class BatchSize(unittest.TestCase):
+    attributes = [(1, 1, attribute) for attribute in range(1, 201)]
+
+    def test_routed_batches_fit(self):
+        cip = manager()
+        self.assertEqual(cip.get_attrs(self.attributes, route=ROUTE), [None] * len(self.attributes))
+        sizes = cip.primary_connection.sizes
+        self.assertGreater(len(sizes), 1)
+        self.assertLessEqual(max(sizes), 504)
+        # every batch but the last is full, one more request would not have fitted
+        self.assertGreater(min(sizes[:-1]), 504 - 10)
+
+    def test_unrouted_batches_fit(self):
+        cip = manager()
+        cip.get_attrs(self.attributes)
+        sizes = cip.primary_connection.sizes
+        self.assertLessEqual(max(sizes), 504)
+        self.assertGreater(min(sizes[:-1]), 504 - 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+from PyCIP.CIPModule.attribute_cache import AttributeCache
+from PyCIP.CIPModule.CIP import MessageRouterResponseStruct_UCMM
+from PyCIP.DataTypesModule.DataTypes import TransportPacket
+from PyCIP.ENIPModule.ENIPPool import FramePool
+from PyCIP.Tools.signaling import Signaler, SignalerM2M
+
+SIGNAL_ID = 0x7F000001
+
+
+class MessageRecycling(unittest.TestCase):
+
+    def deliver_twice(self, pooled):
+        sender, reader = Signaler(pooled=pooled), Signaler()
+        reader.register(SIGNAL_ID)
+        try:
+            sender.send_message(SIGNAL_ID, 'first')
+            first = reader.get_message(1)
+            reader.release(first)
+            sender.send_message(SIGNAL_ID, 'second')
+            second = reader.get_message(1)
+        finally:
+            reader.unregister(SIGNAL_ID)
+        return first, second
+
+    def test_kept_without_pooled(self):
+        first, second = self.deliver_twice(False)
+        self.assertIsNot(first, second)
+        self.assertEqual(first.message, 'first')
+
+    def test_reused_when_pooled(self):
+        first, second = self.deliver_twice(True)
+        self.assertIs(first, second)
+
+    def test_m2m_kept_without_pooled(self):
+        messenger = SignalerM2M()
+        messenger.register(SIGNAL_ID)
+        try:
+            messenger.send_message(SIGNAL_ID, 'first')
+            first = messenger.get_message(SIGNAL_ID, 1)
+            messenger.release(first)
+            messenger.send_message(SIGNAL_ID, 'second')
+            self.assertIsNot(messenger.get_message(SIGNAL_ID, 1), first)
+            self.assertEqual(first.message, 'first')
+        finally:
+            messenger.unregister(SIGNAL_ID)
+
+
+class CachedPacket(unittest.TestCase):
+
+    def test_release_keeps_cached_packet(self):
+        pool = FramePool()
+        packet = pool.get(TransportPacket)
+        packet.pool = pool
+        packet.CIP = MessageRouterResponseStruct_UCMM()
+        packet.CIP.General_Status(0)
+        packet.data = b'\x01\x02'
+        cache = AttributeCache()
+        key = cache.key(1, 1, 1)
+        self.assertIs(cache.get(key, lambda: packet), packet)
+        packet.release()
+        cached = cache.get(key, lambda: None)
+        self.assertIs(cached, packet)
+        self.assertEqual(cached.data, b'\x01\x02')
+        self.assertIsNotNone(cached.CIP)
+        self.assertEqual(pool.stats()['free'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+import PyCIP.DataTypesModule as DT
+
+
+class StringEncoding(unittest.TestCase):
+
+    def test_uint_length_prefix(self):
+        # STRING is a UINT character count, the characters and a pad byte to an even length
+        self.assertEqual(bytes(DT.STRING().export_data('abc')), b'\x03\x00abc\x00')
+        self.assertEqual(bytes(DT.STRING().export_data('ab')), b'\x02\x00ab')
+
+    def test_long_string_round_trip(self):
+        value = 'x' * 300
+        data = bytes(DT.STRING().export_data(value))
+        self.assertEqual(data[:2], (300).to_bytes(2, 'little'))
+        string = DT.STRING()
+        self.assertEqual(string.import_data(data), len(data))
+        self.assertEqual(string(), value)
+
+    def test_shortstring_usint_prefix(self):
+        self.assertEqual(bytes(DT.SHORTSTRING().export_data('abc')), b'\x03abc')
+
+
+class TrackedSize(unittest.TestCase):
+
+    def test_sizeof_follows_value(self):
+        for string_type in (DT.STRING, DT.SHORTSTRING):
+            string = string_type()
+            string('abc')
+            self.assertEqual(string.sizeof(), len(string.export_data()))
+            string.export_data('a much longer string')
+            self.assertEqual(string.sizeof(), len(string.export_data()))
+            string('abcdef')
+            self.assertEqual(string.sizeof(), len(string.export_data()))
+
+
+if __name__ == '__main__':
+    unittest.main()
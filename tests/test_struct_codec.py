@@ -0,0 +1,39 @@
+import unittest
+import PyCIP.DataTypesModule as DT
+from PyCIP.ENIPModule.ENIPDataStructures import ENIPEncapsulationHeader
+
+
+class Pair(DT.BaseStructureAutoKeys):
+    # the endian is chosen per instance, one compiled codec can not serve them all
+
+    def __init__(self, endian='little'):
+        self.A = DT.UINT(endian=endian)
+        self.B = DT.UINT(endian=endian)
+
+
+class VaryingFields(unittest.TestCase):
+
+    def test_endian_per_instance(self):
+        big = Pair('big')
+        big.import_data(bytes([0, 1, 0, 2]))
+        self.assertEqual((big.A(), big.B()), (1, 2))
+        little = Pair()
+        little.import_data(bytes([1, 0, 2, 0]))
+        self.assertEqual((little.A(), little.B()), (1, 2))
+        self.assertEqual(bytes(little.export_data()), bytes([1, 0, 2, 0]))
+
+
+class FixedLayout(unittest.TestCase):
+
+    def test_header_round_trip(self):
+        header = ENIPEncapsulationHeader(0x6F, 40, 0x1234, 0, 77, 0)
+        frame = bytes(header.export_data())
+        self.assertEqual(len(frame), 24)
+        self.assertIsNotNone(header._codec())
+        parsed = ENIPEncapsulationHeader()
+        self.assertEqual(parsed.import_data(frame), 24)
+        self.assertEqual((parsed.Command(), parsed.Session_Handle(), parsed.Sender_Context()), (0x6F, 0x1234, 77))
+
+
+if __name__ == '__main__':
+    unittest.main()
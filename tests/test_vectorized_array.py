@@ -0,0 +1,63 @@
+import struct
+import unittest
+import pytest
+import PyCIP.DataTypesModule as DT
+from PyCIP.DataTypesModule.BaseDataParsers import BaseData
+
+pytest.importorskip("numpy")
+
+
+class REAL(BaseData):
+    __slots__ = ()
+    _byte_size = 4
+    _signed = 1
+    _dtype = 'f'
+
+
+class WriteThrough(unittest.TestCase):
+
+    def setUp(self):
+        self.array = DT.ARRAY(DT.UINT, 3, vectorized=True)
+        self.array.import_data(struct.pack('<HHH', 1, 2, 3))
+        self.assertIsNotNone(self.array.ndarray)
+
+    def test_index(self):
+        self.array[0](99)
+        self.array[-1](7)
+        self.assertEqual(self.array.ndarray.tolist(), [99, 2, 7])
+        self.assertEqual(bytes(self.array.export_data()), struct.pack('<HHH', 99, 2, 7))
+
+    def test_iteration(self):
+        for element in self.array:
+            element(element() * 10)
+        self.assertEqual([element() for element in self.array], [10, 20, 30])
+
+    def test_slice(self):
+        for element in self.array[1:]:
+            element(0)
+        self.assertEqual(self.array.ndarray.tolist(), [1, 0, 0])
+
+    def test_set_element(self):
+        self.array[1] = DT.UINT(40)
+        self.array[2] = 50
+        self.assertEqual(self.array.ndarray.tolist(), [1, 40, 50])
+
+    def test_index_out_of_range(self):
+        with self.assertRaises(IndexError):
+            self.array[3]
+
+
+class FloatElements(unittest.TestCase):
+
+    def test_set_keeps_fraction(self):
+        array = DT.ARRAY(REAL, 2, vectorized=True)
+        array.import_data(struct.pack('<ff', 1.5, 2.5))
+        self.assertEqual(array[1](), 2.5)
+        array[0] = 0.25
+        array[1](3.75)
+        self.assertEqual(array.ndarray.tolist(), [0.25, 3.75])
+        self.assertEqual(bytes(array.export_data()), struct.pack('<ff', 0.25, 3.75))
+
+
+if __name__ == '__main__':
+    unittest.main()